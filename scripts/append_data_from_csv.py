@@ -1,83 +1,49 @@
-import sqlite3
-import pandas as pd
 from pathlib import Path
+import argparse
+import sys
 
-CSV_PATH = Path("data/tickets_jan_2026.csv")
-DB_PATH = Path("data/tickets.db")
-
-REQUIRED_COLS = [
-    "texto",
-    "categoria",
-    "origem",
-    "data_criacao",
-    "status",
-    "prioridade",
-    "cliente_id",
-]
-
-def main():
-    if not DB_PATH.exists():
-        raise FileNotFoundError(f"Banco não encontrado em {DB_PATH}.")
-    if not CSV_PATH.exists():
-        raise FileNotFoundError(f"CSV não encontrado em {CSV_PATH}")
-
-    # 1) Lê CSV
-    df = pd.read_csv(CSV_PATH, delimiter=";", encoding="utf-8")
-
-    missing = [c for c in REQUIRED_COLS if c not in df.columns]
-    if missing:
-        raise ValueError(f"CSV sem colunas obrigatórias: {missing}")
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
 
-    print(f"📥 CSV carregado: {len(df)} linhas")
+from ticket_ai.data.ingest import DEFAULT_CHUNKSIZE, ingest_csv
 
-    # 2) Normalização mínima
-    df["texto"] = df["texto"].fillna("").astype(str).str.strip()
-    df["categoria"] = df["categoria"].fillna("").astype(str).str.strip().str.lower()
-
-    # remove registros “vazios”
-    before_nonempty = len(df)
-    df = df[(df["texto"].str.len() > 0) & (df["categoria"].str.len() > 0)].copy()
-    removed_empty = before_nonempty - len(df)
-    if removed_empty:
-        print(f"🧹 Removidos vazios (texto/categoria): {removed_empty}")
-
-    # 3) Deduplicação interna do CSV (texto+categoria)
-    before_dedup_csv = len(df)
-    df = df.drop_duplicates(subset=["texto", "categoria"]).copy()
-    removed_dup_csv = before_dedup_csv - len(df)
-    print(f"🧹 Dedup no CSV (texto+categoria): {before_dedup_csv} -> {len(df)} (removidos {removed_dup_csv})")
-
-    # 4) Deduplicação contra o banco (texto+categoria)
-    with sqlite3.connect(DB_PATH) as conn:
-        existing = pd.read_sql_query(
-            "SELECT texto, categoria FROM tickets",
-            conn,
-        )
-        existing["texto"] = existing["texto"].fillna("").astype(str).str.strip()
-        existing["categoria"] = existing["categoria"].fillna("").astype(str).str.strip().str.lower()
-
-        merged = df.merge(
-            existing,
-            on=["texto", "categoria"],
-            how="left",
-            indicator=True,
-        )
+CSV_PATH = Path("data/tickets_jan_2026.csv")
+DB_PATH = Path("data/tickets.db")
 
-        to_insert = merged[merged["_merge"] == "left_only"][REQUIRED_COLS]
-        already_in_db = int((merged["_merge"] != "left_only").sum())
 
-        if already_in_db:
-            print(f"🧯 Já existiam no DB (texto+categoria): {already_in_db}")
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Anexa tickets de um CSV ao banco (dedup por hash normalizado, reexecutável).")
+    parser.add_argument("csv", type=Path, nargs="?", default=CSV_PATH)
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    return parser.parse_args()
 
-        if to_insert.empty:
-            print("ℹ️ Nada novo para inserir (tudo já existia).")
-            return
 
-        # 5) Insere o que é novo
-        to_insert.to_sql("tickets", conn, if_exists="append", index=False)
-        conn.commit()
+def main():
+    args = parse_args()
+    if not args.db.exists():
+        raise FileNotFoundError(f"Banco não encontrado em {args.db}.")
+    if not args.csv.exists():
+        raise FileNotFoundError(f"CSV não encontrado em {args.csv}")
+
+    # Streaming em chunks + ON CONFLICT DO NOTHING no índice único de content_hash:
+    # não lê o histórico do banco para deduplicar
+    report = ingest_csv(args.csv, db_path=args.db, chunksize=args.chunksize)
+
+    print(f"📥 CSV lido: {report.read_rows} linhas ({report.elapsed_s:.2f}s)")
+    if report.invalid_rows:
+        print(f"🧹 Removidos vazios (texto/categoria/origem): {report.invalid_rows}")
+    if report.duplicates:
+        print(f"🧯 Duplicatas ignoradas (CSV ou banco, texto+categoria): {report.duplicates}")
+
+    if report.inserted == 0:
+        print("ℹ️ Nada novo para inserir (tudo já existia).")
+        return
+    print(f"✅ Inseridos {report.inserted} novos tickets no banco.")
 
-    print(f"✅ Inseridos {len(to_insert)} novos tickets no banco.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,192 @@
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import numpy as np
+from ticket_ai.data import storage
+from ticket_ai.data.loader import TicketDataLoader
+from ticket_ai.data.quality import DataQualityChecker
+from ticket_ai.data.synthetic import SyntheticTicketGenerator
+from ticket_ai.monitoring.drift_monitoring import compare_baseline_vs_current
+from ticket_ai.monitoring.reference_profile import ReferenceProfile
+from ticket_ai.pipelines.instrumentation import StageTimer
+from ticket_ai.pipelines.train import train
+
+DEFAULT_OUTPUT_DIR = Path("benchmarks/results")
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _build_db(generator: SyntheticTicketGenerator, n_rows: int, db_path: Path, timer: StageTimer) -> None:
+    with timer.stage("generate_and_insert", rows=n_rows):
+        with storage.connection(db_path, mode="bulk", migrate=True) as conn:
+            for chunk in generator.iter_chunks(n_rows):
+                chunk.to_sql("tickets", conn, if_exists="append", index=False)
+
+
+def _bench_inference(model, texts: list[str], single_requests: int, batch_size: int) -> dict:
+    """Latência unitária (como no /predict) e throughput em lote."""
+    sample = texts[:single_requests]
+    latencies = []
+    for t in sample:
+        start = time.perf_counter()
+        model.predict([t])
+        model.predict_proba([t])
+        latencies.append(time.perf_counter() - start)
+    lat_ms = np.array(latencies) * 1000
+
+    batch = texts[:batch_size]
+    start = time.perf_counter()
+    model.predict(batch)
+    batch_s = time.perf_counter() - start
+
+    return {
+        "single_requests": len(sample),
+        "single_p50_ms": float(np.percentile(lat_ms, 50)),
+        "single_p99_ms": float(np.percentile(lat_ms, 99)),
+        "single_throughput_rps": float(len(sample) / (lat_ms.sum() / 1000)),
+        "batch_size": len(batch),
+        "batch_s": batch_s,
+        "batch_throughput_rows_per_s": float(len(batch) / batch_s) if batch_s > 0 else None,
+    }
+
+
+def run_scale(generator: SyntheticTicketGenerator, n_rows: int, args) -> dict:
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "tickets.db"
+        _build_db(generator, n_rows, db_path, timer)
+
+        # Prints do loader/quality ficam fora do relatório
+        with contextlib.redirect_stdout(io.StringIO()):
+            with timer.stage("load", rows=n_rows):
+                loader = TicketDataLoader(db_path=str(db_path))
+                df_raw = loader.load_raw_data()
+
+            with timer.stage("quality", rows=len(df_raw)):
+                DataQualityChecker(df_raw).run_all_checks()
+
+            # TicketFrame: limpo uma vez; treino/perfil/drift usam as colunas como estão
+            with timer.stage("prepare", rows=len(df_raw)):
+                df = loader.prepare_training_data(df_raw, min_samples_per_category=10, as_frame=True)
+
+            with timer.stage("load_training_pushdown", rows=n_rows):
+                loader.load_training_data(min_samples_per_category=10, pushdown=True)
+
+            result = {"rows": n_rows, "prepared_rows": int(len(df))}
+            if not args.skip_training:
+                model = train(df, timer=timer)
+                with timer.stage("profile", rows=len(df)):
+                    ReferenceProfile.from_frame(df, model)
+                with timer.stage("drift", rows=len(df)):
+                    compare_baseline_vs_current(df, df)
+                texts = df.texto.tolist()
+                with timer.stage("inference", rows=args.batch_size):
+                    result["inference"] = _bench_inference(
+                        model, texts, args.single_requests, args.batch_size)
+
+    result["stages"] = timer.stages
+    return result
+
+
+def compare(current: dict, baseline_path: Path, regression_pct: float) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    base_by_rows = {r["rows"]: r for r in baseline["results"]}
+
+    print("\n📊 Comparação com baseline:", baseline_path)
+    print(f"{'linhas':>10} {'estágio':<22}{'base (s)':>10}{'atual (s)':>11}{'Δ %':>9}")
+    for r in current["results"]:
+        base = base_by_rows.get(r["rows"])
+        if base is None:
+            continue
+        base_stages = {s["stage"]: s for s in base["stages"]}
+        for s in r["stages"]:
+            b = base_stages.get(s["stage"])
+            if b is None or not b["wall_s"]:
+                continue
+            delta = (s["wall_s"] - b["wall_s"]) / b["wall_s"] * 100
+            flag = "  ⚠️" if delta > regression_pct else ""
+            print(f"{r['rows']:>10} {s['stage']:<22}{b['wall_s']:>10.3f}{s['wall_s']:>11.3f}{delta:>8.1f}%{flag}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de treino e inferência com dados sintéticos escalados.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10],
+                        help="Múltiplos do volume do CSV de referência (ex.: 1 10 100).")
+    parser.add_argument("--source", type=Path, default=Path("data/tickets_sinteticos.csv"))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-training", action="store_true", help="Mede só load/quality/prepare.")
+    parser.add_argument("--single-requests", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--output", type=Path, default=None, help="Arquivo JSON de saída.")
+    parser.add_argument("--compare", type=Path, default=None, help="JSON de um run anterior para comparar.")
+    parser.add_argument("--regression-pct", type=float, default=20.0,
+                        help="Marca estágios mais lentos que o baseline acima deste percentual.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    generator = SyntheticTicketGenerator.from_csv(args.source, seed=args.seed)
+    n_ref = sum(len(v) for v in generator.lengths.values())
+
+    report = {
+        "meta": {
+            "timestamp_utc": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "source": str(args.source),
+            "reference_rows": n_ref,
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+
+    for scale in args.scales:
+        n_rows = int(n_ref * scale)
+        print(f"🏁 Escala {scale:g}× ({n_rows} linhas)...")
+        result = run_scale(generator, n_rows, args)
+        result["scale"] = scale
+        report["results"].append(result)
+
+        timer = StageTimer()
+        timer.stages = result["stages"]
+        timer.print_summary()
+        if "inference" in result:
+            inf = result["inference"]
+            print(
+                f"Inferência: p50={inf['single_p50_ms']:.2f}ms p99={inf['single_p99_ms']:.2f}ms "
+                f"| lote={inf['batch_throughput_rows_per_s']:.0f} linhas/s"
+            )
+
+    output = args.output or DEFAULT_OUTPUT_DIR / f"benchmark_{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n💾 Resultados salvos em: {output}")
+
+    if args.compare:
+        compare(report, args.compare, args.regression_pct)
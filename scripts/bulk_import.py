@@ -0,0 +1,85 @@
+from pathlib import Path
+import argparse
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ticket_ai.data import storage
+from ticket_ai.data.bulk_import import bulk_import, expand_paths
+from ticket_ai.data.ingest import DEFAULT_CHUNKSIZE
+
+DB_PATH = Path("data/tickets.db")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Importa vários CSVs (arquivos ou globs) em paralelo, com retomada por arquivo.")
+    parser.add_argument("files", nargs="+", help='Arquivos ou globs (ex.: "exports/tickets_*.csv").')
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Processos de parse (padrão: nº de CPUs).")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--force", action="store_true", help="Reprocessa arquivos já concluídos.")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="Recria os índices secundários só no fim (cargas grandes).")
+    parser.add_argument("--reset", action="store_true", help="Recria a tabela tickets antes de importar.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    paths = expand_paths(args.files)
+    print(f"📥 {len(paths)} arquivo(s) para importar em {args.db}")
+
+    if args.reset:
+        print("🗄 (Re)criando tabela tickets...")
+        args.db.parent.mkdir(parents=True, exist_ok=True)
+        with storage.connection(args.db, mode="bulk") as conn:
+            storage.reset_tickets(conn)
+
+    def _progress(report, result):
+        done = len(result.completed) + len(result.failed)
+        rate = result.rows_per_s or 0.0
+        print(
+            f"✅ [{done}/{len(paths) - len(result.skipped) - len(result.same_content)}] {report.source}: "
+            f"{report.read_rows} linhas, {report.inserted} inseridas, "
+            f"{report.duplicates} duplicadas, {report.invalid_rows} inválidas "
+            f"| acumulado {result.read_rows} linhas ({rate:,.0f} linhas/s)"
+        )
+
+    result = bulk_import(
+        paths,
+        db_path=args.db,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        force=args.force,
+        defer_indexes=args.defer_indexes,
+        on_file=_progress,
+    )
+
+    print("\n" + "=" * 60)
+    print("📦 BULK IMPORT")
+    print("=" * 60)
+    print(f"Arquivos importados: {len(result.completed)}")
+    print(f"Já concluídos (pulados): {len(result.skipped)}")
+    print(f"Conteúdo repetido:   {len(result.same_content)}")
+    print(f"Linhas lidas:        {result.read_rows}")
+    print(f"Inseridas:           {result.inserted}")
+    print(f"Duplicadas:          {result.duplicates}")
+    print(f"Tempo:               {result.elapsed_s:.2f}s")
+    if result.rows_per_s:
+        print(f"Throughput:          {result.rows_per_s:,.0f} linhas/s")
+    print("=" * 60)
+
+    for path, first in result.same_content.items():
+        print(f"⚠️ {path}: mesmo conteúdo de {first} (importado uma vez)")
+    if result.failed:
+        for path, error in result.failed.items():
+            print(f"❌ {path}: {error}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from pathlib import Path
+import argparse
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ticket_ai.data import storage
+from ticket_ai.data.loader import TicketDataLoader
+
+DB_PATH = Path("data/tickets.db")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Estatísticas materializadas por categoria (category_stats).")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--by-month", action="store_true", help="Quebra por categoria e mês.")
+    parser.add_argument("--verify", action="store_true",
+                        help="Compara com um GROUP BY completo e falha se houver divergência.")
+    parser.add_argument("--rebuild", action="store_true", help="Recalcula a tabela do zero.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    storage.ensure_schema(args.db)  # cria/atualiza category_stats (migração 5)
+    loader = TicketDataLoader(db_path=str(args.db))
+
+    if args.rebuild:
+        with storage.connection(args.db, mode="write") as conn:
+            storage.rebuild_category_stats(conn)
+        print("🔁 category_stats recalculada.")
+
+    if args.verify:
+        with storage.connection(args.db, mode="read") as conn:
+            diffs = storage.verify_category_stats(conn)
+        if diffs:
+            print(f"❌ {len(diffs)} linha(s) divergentes (rode com --rebuild):")
+            for row in diffs:
+                print("   ", row)
+            raise SystemExit(1)
+        print("✅ category_stats consistente com a tabela tickets.")
+        return
+
+    print(loader.get_category_stats(by_month=args.by_month).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
-from ticket_ai.data.quality import DataQualityChecker
+from ticket_ai.data.quality import DataQualityChecker, IncrementalQualityGate
 from ticket_ai.data.loader import TicketDataLoader
 from pathlib import Path
+import argparse
 import sys
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -19,19 +20,49 @@ EXPECTED_CATEGORIES = [
 ]
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Quality gate do dataset de tickets.")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Lê do snapshot Parquet (scripts/export_snapshot.py) em vez do SQLite.")
+    parser.add_argument("--full", action="store_true",
+                        help="Recheck completo do SQLite (ignora a marca d'água do último gate aprovado).")
+    parser.add_argument("--near-duplicates", type=float, nargs="?", const=0.8, default=None,
+                        metavar="LIMIAR",
+                        help="Inclui clusters de quase-duplicatas (MinHash/LSH, Jaccard ≥ LIMIAR; padrão 0.8).")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     print("🔎 Rodando quality check (dataset de tickets)...")
     print("=" * 60)
 
     loader = TicketDataLoader(db_path="data/tickets.db")
 
     # 1) RAW: gate antes de transformar
-    df_raw = loader.load_raw_data()
-    checker = DataQualityChecker(
-        df_raw,
-        expected_categories=EXPECTED_CATEGORIES,
-        min_text_len=10,
-    )
+    if args.snapshot:
+        df_raw = loader.load_snapshot()
+        checker = DataQualityChecker(
+            df_raw,
+            expected_categories=EXPECTED_CATEGORIES,
+            min_text_len=10,
+        )
+    else:
+        # Incremental: só as linhas acima da marca d'água, combinadas ao estado salvo
+        gate = IncrementalQualityGate(
+            loader,
+            expected_categories=EXPECTED_CATEGORIES,
+            min_text_len=10,
+        )
+        checker = gate.run(full=args.full)
+        gate.print_summary()
+    if args.near_duplicates is not None:
+        # Varre todo o banco (não é incremental): só texto/categoria/id
+        checker.detect_near_duplicates(
+            None if args.snapshot else loader.iter_chunks(
+                columns=["id", "texto", "categoria"], clean=False),
+            threshold=args.near_duplicates,
+        )
     checker.print_report()
 
     results = checker.run_all_checks()
@@ -40,7 +71,10 @@ def main():
             "❌ Quality gate falhou. Corrija os issues antes de continuar.")
 
     # 2) Preparação (limpeza/filtros) para seguir
-    loader.prepare_training_data(df_raw, min_samples_per_category=1)
+    if args.snapshot:
+        loader.prepare_training_data(df_raw, min_samples_per_category=1)
+    else:
+        loader.load_training_data(min_samples_per_category=1)
     print("✅ Quality gate passou. Dataset pronto para seguir.")
 
 
@@ -8,33 +8,52 @@ SRC_DIR = PROJECT_ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
+from joblib import load
 from ticket_ai.data.loader import TicketDataLoader
-from ticket_ai.monitoring.drift_monitoring import compare_baseline_vs_current
+from ticket_ai.monitoring.drift_monitoring import compare_baseline_vs_current, compare_profiles
+from ticket_ai.monitoring.reference_profile import DEFAULT_PROFILE_PATH, ReferenceProfile
+from ticket_ai.services.classifier import DEFAULT_MODEL_PATH
 
 
 def main():
     ref_path = Path("models/reference_data.parquet")
-    if not ref_path.exists():
-        raise SystemExit("❌ reference_data.parquet não encontrado. Rode o treino primeiro.")
-
-    df_ref = pd.read_parquet(ref_path)
+    use_profile = DEFAULT_PROFILE_PATH.exists() and DEFAULT_MODEL_PATH.exists()
+    if not use_profile and not ref_path.exists():
+        raise SystemExit("❌ Perfil/baseline de referência não encontrado. Rode o treino primeiro.")
 
     loader = TicketDataLoader(db_path="data/tickets.db")
     date_from = datetime(2026, 1, 1)
     date_to = datetime(2026, 1, 31, 23, 59, 59)
 
-    # RAW: direto do banco (recorte Jan/2026)
-    df_cur_raw = loader.load_raw_data(date_from=date_from, date_to=date_to)
-
-    # PREPARED: mesmo contrato do baseline (limpeza/normalização do loader)
+    # PREPARED em streaming (recorte Jan/2026): mesmo contrato do baseline
+    # (limpeza/normalização do loader), sem materializar o RAW.
     # min_samples_per_category=1 para observar distribuição (não filtrar demais no drift)
-    df_cur = loader.prepare_training_data(df_cur_raw, min_samples_per_category=1)
+    stats: dict = {}
+    df_cur = loader.load_training_data(
+        min_samples_per_category=1,
+        date_from=date_from,
+        date_to=date_to,
+        stats=stats,
+        pushdown=True,  # limpeza/dedup no SQLite: só linhas prontas chegam ao pandas
+        as_frame=True,  # já normalizado: perfil/sketch não recastam as colunas
+    )
 
-    raw_n = len(df_cur_raw)
+    raw_n = stats.get("raw_rows", 0)
     prep_n = len(df_cur)
     retention = (prep_n / raw_n * 100) if raw_n else 0.0
 
-    result = compare_baseline_vs_current(df_ref, df_cur)
+    if use_profile:
+        # Perfil compacto do treino (KBs) + perfil da janela atual com o mesmo modelo
+        ref = ReferenceProfile.load(DEFAULT_PROFILE_PATH)
+        model = load(DEFAULT_MODEL_PATH)
+        cur = ReferenceProfile.from_frame(df_cur, model)
+        feature_names = model.named_steps["tfidf"].get_feature_names_out()
+        result = compare_profiles(ref, cur, feature_names=feature_names)
+    else:
+        print("⚠️ Perfil de referência ausente (modelo antigo): lendo reference_data.parquet.")
+        # Só as colunas usadas no drift (projeção no Parquet)
+        df_ref = pd.read_parquet(ref_path, columns=["texto", "categoria"])
+        result = compare_baseline_vs_current(df_ref, df_cur)
 
     print("\n" + "=" * 60)
     print("📉 DRIFT CHECK (baseline 2025 vs Jan/2026)")
@@ -45,6 +64,16 @@ def main():
     print(f"Avg len Jan/2026:  {result['cur_avg_text_len']:.1f}")
     print(f"Delta len (%):     {result['avg_text_len_delta_pct']:.1f}%")
     print(f"PSI (categorias):  {result['psi_category']:.4f}")
+    print(f"PSI (tamanho):     {result['psi_text_len']:.4f}")
+    if use_profile:
+        print(f"JS vocabulário:    {result['vocab_js_divergence']:.4f}")
+        print(f"OOV baseline/atual: {result['ref_oov_rate']:.1%} / {result['cur_oov_rate']:.1%}")
+        if result["ref_confidence_quantiles"] and result["cur_confidence_quantiles"]:
+            print(f"Confiança p50 baseline/atual: "
+                  f"{result['ref_confidence_quantiles']['p50']:.2f} / {result['cur_confidence_quantiles']['p50']:.2f}")
+        shifts = ", ".join(
+            f"{s['term']} ({s['ref_doc_rate']:.1%}→{s['cur_doc_rate']:.1%})" for s in result["top_vocab_shifts"][:5])
+        print(f"Termos que mais mudaram: {shifts or '-'}")
     print("=" * 60)
 
     if result["psi_category"] > 0.2:
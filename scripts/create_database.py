@@ -1,7 +1,14 @@
-import sqlite3
-import pandas as pd
 from pathlib import Path
 import os
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import pandas as pd
+from ticket_ai.data import storage
 
 CSV_PATH = Path("data/tickets_sinteticos.csv")
 DB_PATH = Path("data/tickets.db")
@@ -32,26 +39,16 @@ def criar_banco_a_partir_csv() -> None:
 
     print("🗄 (Re)criando tabela tickets...")
 
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.execute("DROP TABLE IF EXISTS tickets")
-        cursor.execute(
-            """
-            CREATE TABLE tickets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                texto TEXT NOT NULL,
-                categoria TEXT NOT NULL,
-                origem TEXT NOT NULL,
-                data_criacao TEXT,
-                status TEXT,
-                prioridade TEXT,
-                cliente_id INTEGER
-            )
-            """
-        )
+    # Schema (tabela + índices) vem das migrações do módulo de storage
+    with storage.connection(DB_PATH, mode="bulk") as conn:
+        storage.reset_tickets(conn)
 
         print("📤 Inserindo dados no banco...")
-        df.to_sql("tickets", conn, if_exists="append", index=False)
+        df[REQUIRED_COLS].to_sql(
+            "tickets", conn, if_exists="append", index=False, chunksize=50_000)
+
+        # Hash normalizado (1ª ocorrência): base para a ingestão incremental sem duplicatas
+        storage.backfill_content_hash(conn)
 
     print(f"✅ Banco criado com {len(df)} registros.")
     print(f"📍 Localização: {DB_PATH}")
@@ -0,0 +1,87 @@
+from pathlib import Path
+import argparse
+import sys
+import time
+from datetime import datetime
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ticket_ai.monitoring.drift_monitoring import (
+    DEFAULT_REFERENCE_PATH,
+    PSI_ALERT_THRESHOLD,
+    load_baseline_sketch,
+)
+from ticket_ai.monitoring.drift_sweep import DEFAULT_WORKERS, GRANULARITIES, drift_sweep
+from ticket_ai.monitoring.reference_profile import DEFAULT_PROFILE_PATH
+
+DB_PATH = Path("data/tickets.db")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Série temporal de drift (PSI, tamanho, retenção) por janela, em uma agregação.")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--granularity", choices=sorted(GRANULARITIES), default="month")
+    parser.add_argument("--from", dest="date_from", type=datetime.fromisoformat, default=None,
+                        help="Início (ISO, ex.: 2025-01-01).")
+    parser.add_argument("--to", dest="date_to", type=datetime.fromisoformat, default=None,
+                        help="Fim inclusivo (ISO, ex.: 2025-12-31T23:59:59).")
+    parser.add_argument("--threshold", type=float, default=PSI_ALERT_THRESHOLD,
+                        help="PSI de categorias acima do qual a janela é sinalizada.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Fatias de data consultadas em paralelo.")
+    parser.add_argument("--output", type=Path, default=None, help="Salva a tabela em CSV.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.db.exists():
+        raise SystemExit(f"❌ Banco não encontrado: {args.db}")
+
+    reference = None
+    if DEFAULT_PROFILE_PATH.exists() or DEFAULT_REFERENCE_PATH.exists():
+        reference = load_baseline_sketch()
+        print("📦 Referência: baseline do treino.")
+    else:
+        print("⚠️ Baseline do treino não encontrado: referência = período varrido inteiro.")
+
+    start = time.perf_counter()
+    sweep = drift_sweep(
+        args.db,
+        reference=reference,
+        granularity=args.granularity,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        workers=args.workers,
+        psi_threshold=args.threshold,
+    )
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "=" * 60)
+    print(f"📉 DRIFT SWEEP ({args.granularity}, {len(sweep)} janelas em {elapsed:.2f}s)")
+    print("=" * 60)
+    if sweep.empty:
+        print("Nenhum ticket com data no intervalo.")
+        return
+    table = sweep.assign(alerta=sweep["alerta"].map({True: "⚠️", False: ""}))
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print("=" * 60)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        sweep.to_csv(args.output, index=False)
+        print(f"💾 Tabela salva em {args.output}")
+
+    flagged = sweep.loc[sweep["alerta"], "janela"].tolist()
+    if flagged:
+        print(f"⚠️  PSI > {args.threshold} em {len(flagged)} janela(s): {', '.join(flagged)}")
+    else:
+        print(f"✅ Nenhuma janela com PSI > {args.threshold}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from pathlib import Path
+import argparse
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ticket_ai.data.snapshot import DEFAULT_SNAPSHOT_DIR, export_snapshot
+
+DB_PATH = Path("data/tickets.db")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Exporta tickets novos (acima da marca d'água) para o snapshot Parquet particionado por mês.")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--output", type=Path, default=DEFAULT_SNAPSHOT_DIR)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--full", action="store_true", help="Descarta o snapshot e reexporta tudo.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.db.exists():
+        raise FileNotFoundError(f"Banco não encontrado em {args.db}.")
+
+    result = export_snapshot(args.db, args.output, chunksize=args.chunksize, full=args.full)
+    if result["exported_rows"] == 0:
+        print(f"ℹ️ Snapshot já atualizado (último id: {result['last_id']}).")
+        return
+    print(
+        f"✅ Exportadas {result['exported_rows']} linhas em {result['files_written']} arquivo(s) "
+        f"({result['elapsed_s']:.2f}s)"
+    )
+    print(f"📍 Snapshot: {args.output} (total {result['rows']} linhas, último id {result['last_id']})")
+
+
+if __name__ == "__main__":
+    main()
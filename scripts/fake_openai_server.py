@@ -0,0 +1,119 @@
+"""
+Servidor fake compatível com a API do OpenAI (chat.completions) para testes de carga.
+
+Simula latência, erros 5xx e rate limit (429) de forma configurável, sem custo
+nem dependência do provedor real. Uso:
+
+    uv run python scripts/fake_openai_server.py --port 8099 --latency-ms 800 --error-rate 0.02 --rate-limit-rate 0.05
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+FAKE_REPLY = "Olá! Recebemos sua mensagem e já estamos analisando. Em breve retornaremos com uma solução."
+
+
+def create_app(
+    latency_ms: float = 500.0,
+    latency_jitter_ms: float = 200.0,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    retry_after_s: float = 1.0,
+    max_concurrency: int = 0,
+    seed: int | None = None,
+) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "ok": 0, "errors_5xx": 0, "rate_limited": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def _error(status: int, message: str, err_type: str, headers: dict | None = None) -> JSONResponse:
+        return JSONResponse(
+            status_code=status,
+            content={"error": {"message": message, "type": err_type, "param": None, "code": None}},
+            headers=headers,
+        )
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+
+        # 429: rate limit aleatório ou por excesso de concorrência
+        over_capacity = max_concurrency and stats["in_flight"] >= max_concurrency
+        if over_capacity or rng.random() < rate_limit_rate:
+            stats["rate_limited"] += 1
+            return _error(429, "Rate limit reached (fake).", "rate_limit_error",
+                          headers={"retry-after": str(retry_after_s)})
+
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            delay = max(0.0, rng.gauss(latency_ms, latency_jitter_ms)) / 1000
+            await asyncio.sleep(delay)
+        finally:
+            stats["in_flight"] -= 1
+
+        if rng.random() < error_rate:
+            stats["errors_5xx"] += 1
+            return _error(500, "Internal error (fake).", "server_error")
+
+        stats["ok"] += 1
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": FAKE_REPLY},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 80, "completion_tokens": 40, "total_tokens": 120},
+        }
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "fake"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Servidor fake compatível com OpenAI (chat.completions).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fração de respostas 429.")
+    parser.add_argument("--retry-after-s", type=float, default=1.0)
+    parser.add_argument("--max-concurrency", type=int, default=0,
+                        help="Acima disso responde 429 (0 = sem limite).")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    app = create_app(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_s=args.retry_after_s,
+        max_concurrency=args.max_concurrency,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
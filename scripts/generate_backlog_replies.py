@@ -0,0 +1,114 @@
+from pathlib import Path
+import argparse
+import asyncio
+import os
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from ticket_ai.services.reply_backlog import (
+    DEFAULT_CLASSIFY_BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_WRITE_BATCH_SIZE,
+    BacklogReport,
+    count_unanswered,
+    generate_backlog,
+)
+from ticket_ai.services.reply_policy import DEFAULT_REPLY_POLICY_PATH
+
+DB_PATH = Path("data/tickets.db")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Gera respostas (offline) para tickets sem resposta no banco, com retomada.")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--limit", type=int, default=None, help="Máximo de tickets nesta execução.")
+    parser.add_argument("--status", default=None, help='Só tickets com este status (ex.: "aberto").')
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Chamadas simultâneas ao LLM (ignora TICKET_AI_LLM_MAX_CONCURRENCY).")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT,
+                        help="Chamadas/s ao LLM (0 = sem limite).")
+    parser.add_argument("--classify-batch", type=int, default=DEFAULT_CLASSIFY_BATCH_SIZE)
+    parser.add_argument("--write-batch", type=int, default=DEFAULT_WRITE_BATCH_SIZE,
+                        help="Respostas por checkpoint (uma transação).")
+    parser.add_argument("--reply-policy", default=DEFAULT_REPLY_POLICY_PATH,
+                        help='Política de respostas (template/cache, ex.: config/reply_policy.example.json); vazio envia tudo ao LLM.')
+    parser.add_argument("--count", action="store_true", help="Só mostra quantos tickets estão sem resposta.")
+    return parser.parse_args()
+
+
+def _progress(report: BacklogReport) -> None:
+    done = report.written + report.failed
+    restante = report.custo_restante_usd
+    print(
+        f"💾 [{done}/{report.pending_at_start}] {report.written} gravadas, {report.failed} falhas "
+        f"| {report.tickets_per_s or 0:.1f} tickets/s | custo US$ {report.custo_usd:.4f}"
+        + (f" (restante ~US$ {restante:.4f})" if restante is not None else "")
+    )
+
+
+def main():
+    args = parse_args()
+    if not args.db.exists():
+        raise SystemExit(f"❌ Banco não encontrado: {args.db}")
+
+    if args.count:
+        print(f"📭 Tickets sem resposta: {count_unanswered(args.db, args.status)}")
+        return
+    if not os.getenv("OPENAI_API_KEY"):
+        raise SystemExit("❌ OPENAI_API_KEY não configurada.")
+
+    from ticket_ai.services.classifier import DEFAULT_MODEL_PATH, TicketClassifier, model_version
+    from ticket_ai.services.reply_policy import load_reply_policy
+
+    print("🤖 Carregando modelo...")
+    classifier = TicketClassifier()
+    policy = load_reply_policy(args.reply_policy)
+    print(f"📋 Política de respostas: {args.reply_policy if policy is not None else 'desligada (tudo via LLM)'}")
+
+    try:
+        report = asyncio.run(generate_backlog(
+            args.db,
+            classifier,
+            policy=policy,
+            concurrency=args.concurrency,
+            rate_limit=args.rate_limit,
+            classify_batch_size=args.classify_batch,
+            write_batch_size=args.write_batch,
+            limit=args.limit,
+            status=args.status,
+            model_version=model_version(DEFAULT_MODEL_PATH),
+            on_checkpoint=_progress,
+        ))
+    except KeyboardInterrupt:
+        # As respostas já geradas foram gravadas no último checkpoint
+        pendentes = count_unanswered(args.db, args.status)
+        raise SystemExit(f"⏹ Interrompido: {pendentes} ticket(s) ainda sem resposta. "
+                         "Rode de novo para continuar de onde parou.")
+
+    print("\n" + "=" * 60)
+    print("📨 BACKLOG DE RESPOSTAS")
+    print("=" * 60)
+    print(f"Sem resposta no início: {report.pending_at_start}")
+    print(f"Classificados:          {report.classified}")
+    print(f"Gravados:               {report.written} em {report.checkpoints} checkpoint(s)")
+    print(f"Por origem:             {report.origens}")
+    print(f"Falhas do LLM:          {report.failed} (ficam para a próxima execução)")
+    print(f"Tempo:                  {report.elapsed_s:.2f}s")
+    if report.tickets_per_s:
+        print(f"Throughput:             {report.tickets_per_s:.1f} tickets/s")
+    print(f"Custo (LLM):            US$ {report.custo_usd:.4f}")
+    if report.custo_por_ticket_usd is not None:
+        print(f"Custo por ticket:       US$ {report.custo_por_ticket_usd:.6f}")
+    print("=" * 60)
+    if report.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import httpx
+import numpy as np
+import pandas as pd
+from ticket_ai.services.llm import resposta_fallback
+
+
+def _start(cmd: list[str], env: dict) -> subprocess.Popen:
+    return subprocess.Popen(cmd, cwd=PROJECT_ROOT, env=env)
+
+
+def _wait_ready(url: str, timeout_s: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"❌ Timeout aguardando {url}")
+
+
+def _load_texts(path: Path, n: int, seed: int) -> list[str]:
+    df = pd.read_csv(path, delimiter=";", encoding="utf-8", usecols=["texto"])
+    textos = df["texto"].dropna().astype(str).tolist()
+    random.Random(seed).shuffle(textos)
+    return textos[:n]
+
+
+async def run_open_loop(
+    api_url: str,
+    textos: list[str],
+    rate_rps: float,
+    duration_s: float,
+    timeout_s: float,
+    seed: int,
+) -> list[dict]:
+    """
+    Gerador open-loop: chegadas Poisson na taxa alvo, independentes das respostas.
+    A latência é medida a partir do instante *agendado* (evita coordinated omission).
+    """
+    rng = np.random.default_rng(seed)
+    n = max(1, int(rate_rps * duration_s))
+    arrivals = np.cumsum(rng.exponential(1.0 / rate_rps, size=n))
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    results: list[dict] = []
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=timeout_s, limits=limits) as client:
+        t0 = time.perf_counter()
+
+        async def one(i: int, scheduled: float) -> None:
+            delay = scheduled - (time.perf_counter() - t0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent = time.perf_counter() - t0
+            texto = textos[i % len(textos)]
+            record = {"scheduled_s": scheduled, "send_lag_s": sent - scheduled}
+            try:
+                resp = await client.post("/predict", json={"texto": texto})
+                record["status"] = resp.status_code
+                if resp.status_code == 200:
+                    data = resp.json()
+                    record["fallback"] = data["resposta"] == resposta_fallback(data["categoria"])
+            except httpx.HTTPError as e:
+                record["status"] = None
+                record["error"] = type(e).__name__
+            done = time.perf_counter() - t0
+            record["latency_s"] = done - scheduled
+            record["service_s"] = done - sent
+            record["done_s"] = done
+            results.append(record)
+
+        await asyncio.gather(*(one(i, float(t)) for i, t in enumerate(arrivals)))
+
+    return results
+
+
+def summarize(results: list[dict], duration_s: float) -> dict:
+    lat = np.array([r["latency_s"] for r in results]) * 1000
+    svc = np.array([r["service_s"] for r in results]) * 1000
+    ok = [r for r in results if r.get("status") == 200]
+    elapsed = max((r["done_s"] for r in results), default=duration_s)
+
+    def pct(a, q):
+        return float(np.percentile(a, q)) if len(a) else None
+
+    return {
+        "requests": len(results),
+        "ok": len(ok),
+        "error_rate": 1 - len(ok) / len(results) if results else None,
+        "fallback_rate": (sum(1 for r in ok if r.get("fallback")) / len(ok)) if ok else None,
+        "throughput_rps": len(ok) / elapsed if elapsed > 0 else None,
+        "latency_ms": {"p50": pct(lat, 50), "p90": pct(lat, 90), "p99": pct(lat, 99), "max": pct(lat, 100)},
+        "service_time_ms": {"p50": pct(svc, 50), "p99": pct(svc, 99)},
+        "status_counts": pd.Series([str(r.get("status")) for r in results]).value_counts().to_dict(),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Teste de carga do /predict com LLM fake local.")
+    parser.add_argument("--rate", type=float, default=20.0, help="Requisições/s (chegadas Poisson).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duração em segundos.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout por requisição (s).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--texts", type=Path, default=Path("data/tickets_sinteticos.csv"))
+
+    parser.add_argument("--api-url", default=None, help="Usa uma API já rodando (não sobe processos).")
+    parser.add_argument("--api-port", type=int, default=8088)
+    parser.add_argument("--api-workers", type=int, default=1)
+    parser.add_argument("--serving-mode", choices=["thread", "process"], default=None,
+                        help="TICKET_AI_SERVING_MODE da API (padrão: o da API, 'thread').")
+    parser.add_argument("--inference-workers", type=int, default=None,
+                        help="TICKET_AI_INFERENCE_WORKERS (processos de inferência por worker da API).")
+
+    parser.add_argument("--llm-port", type=int, default=8099)
+    parser.add_argument("--llm-latency-ms", type=float, default=500.0)
+    parser.add_argument("--llm-latency-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--llm-max-concurrency", type=int, default=0)
+
+    parser.add_argument("--max-retries", type=int, default=None, help="OPENAI_MAX_RETRIES da API.")
+    parser.add_argument("--backoff-base", type=float, default=None, help="OPENAI_RETRY_BACKOFF_BASE_SECONDS.")
+    parser.add_argument("--backoff-max", type=float, default=None, help="OPENAI_RETRY_BACKOFF_MAX_SECONDS.")
+    parser.add_argument("--sdk-max-retries", type=int, default=None, help="OPENAI_SDK_MAX_RETRIES (retries do SDK).")
+    parser.add_argument("--output", type=Path, default=None, help="Salva o relatório em JSON.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    procs: list[subprocess.Popen] = []
+    llm_url = f"http://127.0.0.1:{args.llm_port}"
+    api_url = args.api_url or f"http://127.0.0.1:{args.api_port}"
+
+    try:
+        if args.api_url is None:
+            if not Path("models/ticket_clf.joblib").exists():
+                raise SystemExit("❌ Modelo não encontrado. Rode o treino antes do teste de carga.")
+
+            env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+            procs.append(_start([
+                sys.executable, "scripts/fake_openai_server.py",
+                "--port", str(args.llm_port),
+                "--latency-ms", str(args.llm_latency_ms),
+                "--latency-jitter-ms", str(args.llm_latency_jitter_ms),
+                "--error-rate", str(args.llm_error_rate),
+                "--rate-limit-rate", str(args.llm_rate_limit_rate),
+                "--max-concurrency", str(args.llm_max_concurrency),
+                "--seed", str(args.seed),
+            ], env))
+            _wait_ready(f"{llm_url}/stats")
+
+            api_env = {
+                **env,
+                "OPENAI_API_KEY": "fake-key",
+                "OPENAI_BASE_URL": f"{llm_url}/v1",
+            }
+            for flag, var in (
+                (args.max_retries, "OPENAI_MAX_RETRIES"),
+                (args.backoff_base, "OPENAI_RETRY_BACKOFF_BASE_SECONDS"),
+                (args.backoff_max, "OPENAI_RETRY_BACKOFF_MAX_SECONDS"),
+                (args.sdk_max_retries, "OPENAI_SDK_MAX_RETRIES"),
+                (args.serving_mode, "TICKET_AI_SERVING_MODE"),
+                (args.inference_workers, "TICKET_AI_INFERENCE_WORKERS"),
+            ):
+                if flag is not None:
+                    api_env[var] = str(flag)
+
+            procs.append(_start([
+                sys.executable, "-m", "uvicorn", "ticket_ai.api.main:app",
+                "--port", str(args.api_port),
+                "--workers", str(args.api_workers),
+                "--log-level", "warning",
+            ], api_env))
+            _wait_ready(f"{api_url}/health/ready")
+
+        textos = _load_texts(args.texts, n=5_000, seed=args.seed)
+        print(f"🚀 Open-loop: {args.rate:g} req/s por {args.duration:g}s contra {api_url}")
+        results = asyncio.run(run_open_loop(
+            api_url, textos, args.rate, args.duration, args.timeout, args.seed))
+        summary = summarize(results, args.duration)
+
+        if args.api_url is None:
+            summary["llm_stats"] = httpx.get(f"{llm_url}/stats").json()
+        try:
+            # Fila/ocupação dos pools (um worker da API, quando há vários)
+            summary["serving"] = httpx.get(f"{api_url}/serving/status", timeout=5.0).json()
+        except httpx.HTTPError:
+            summary["serving"] = None
+
+        lat = summary["latency_ms"]
+        print("\n" + "=" * 60)
+        print("📈 RESULTADO DO TESTE DE CARGA")
+        print("=" * 60)
+        print(f"Requisições:     {summary['requests']} (ok: {summary['ok']})")
+        print(f"Throughput:      {summary['throughput_rps']:.1f} req/s")
+        print(f"Latência p50:    {lat['p50']:.1f} ms")
+        print(f"Latência p90:    {lat['p90']:.1f} ms")
+        print(f"Latência p99:    {lat['p99']:.1f} ms")
+        print(f"Taxa de erro:    {summary['error_rate'] * 100:.2f}%")
+        if summary["fallback_rate"] is not None:
+            print(f"Taxa fallback:   {summary['fallback_rate'] * 100:.2f}%")
+        if "llm_stats" in summary:
+            print(f"LLM fake:        {summary['llm_stats']}")
+        if summary["serving"]:
+            print(f"Serving ({summary['serving']['mode']}): inferência={summary['serving']['inference']}")
+            policy = summary["serving"].get("reply_policy")
+            if policy:
+                print(f"Respostas:       {policy['origens']} "
+                      f"(economia: {policy['latencia_economizada_s'] or 0:.1f}s, "
+                      f"US$ {policy['custo_economizado_usd']:.4f})")
+        print("=" * 60)
+
+        if args.output:
+            report = {
+                "timestamp_utc": datetime.now(timezone.utc).isoformat(),
+                "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+                "summary": summary,
+            }
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+            print(f"💾 Relatório salvo em: {args.output}")
+    finally:
+        for p in reversed(procs):
+            p.terminate()
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+
+if __name__ == "__main__":
+    main()
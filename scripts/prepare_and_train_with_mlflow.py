@@ -1,14 +1,25 @@
 from pathlib import Path
+from typing import Optional
+import argparse
 import sys
+import time
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SRC_DIR = PROJECT_ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from joblib import dump
-from ticket_ai.data.loader import TicketDataLoader
-from ticket_ai.data.quality import DataQualityChecker
+import mlflow
+from joblib import load
+from mlflow.entities import Metric
+from mlflow.tracking import MlflowClient
+from ticket_ai.data import storage
+from ticket_ai.data.loader import COLUMNS, TicketDataLoader
+from ticket_ai.data.quality import IncrementalQualityGate
+from ticket_ai.monitoring.reference_profile import ReferenceProfile
+from ticket_ai.pipelines.instrumentation import StageTimer
+from ticket_ai.pipelines.cache import ModelStore, fingerprint_config, fingerprint_dataframe
+from ticket_ai.pipelines.train import build_pipeline
 from ticket_ai.pipelines.train_with_mlflow import train_with_tracking
 
 
@@ -21,55 +32,120 @@ EXPECTED_CATEGORIES = [
     "logistica",
 ]
 
+MIN_SAMPLES_PER_CATEGORY = 10
+TRAIN_CONFIG = {
+    "experiment_name": "ticket-classification",
+    "test_size": 0.2,
+    "random_state": 42,
+    "enable_cross_validation": True,
+}
 
-def prepare_and_train_with_mlflow():
+
+def prepare_and_train_with_mlflow(
+    force: bool = False,
+    full_quality: bool = False,
+    near_dup_threshold: Optional[float] = None,
+):
     print("🔄 Iniciando pipeline de treinamento (com MLflow)...")
     print("=" * 60)
+    timer = StageTimer()
 
-    # 1) Carregar RAW (antes de limpeza)
+    storage.ensure_schema(Path("data/tickets.db"))  # migrações pendentes (escrita)
     loader = TicketDataLoader(db_path="data/tickets.db")
-    df_raw = loader.load_raw_data()
 
-    # 2) Gate de qualidade no RAW
-    checker = DataQualityChecker(
-        df_raw,
-        expected_categories=EXPECTED_CATEGORIES,
-        min_text_len=10,
-    )
-    checker.print_report()
-    results = checker.run_all_checks()
+    # 1) Gate de qualidade no RAW (antes de qualquer transformação)
+    # (incremental: só texto/categoria das linhas com id acima da marca d'água do último gate aprovado)
+    with timer.stage("quality") as stage:
+        gate = IncrementalQualityGate(
+            loader,
+            expected_categories=EXPECTED_CATEGORIES,
+            min_text_len=10,
+        )
+        checker = gate.run(full=full_quality)
+        stage["rows"] = gate.last_run["new_rows"]
+        gate.print_summary()
+        checker.print_report()
+        results = checker.run_all_checks()
     if not results["is_valid"]:
         raise ValueError("Dataset inválido. Corrija antes de treinar.")
 
-    # 3) Preparar dataset limpo (FULL) e derivar dataset de treino
-    df_prepared_full = loader.prepare_training_data(
-        df_raw,
-        min_samples_per_category=10,
-        return_full=True,  # ✅ baseline operacional com metadados
-    )
-    df_train = df_prepared_full[["texto", "categoria"]]
-
-    # 4) Treinar + tracking no MLflow
-    model = train_with_tracking(
-        df_train,
-        experiment_name="ticket-classification",
-        test_size=0.2,
-        random_state=42,
-        enable_cross_validation=True,
-    )
-
-    # 5) Salvar artefatos locais (consumo pela API)
+    # 2) Carregar já limpo em chunks (FULL: todas as colunas) e derivar dataset de treino;
+    # o RAW inteiro não é materializado
+    with timer.stage("load") as stage:
+        load_stats: dict = {}
+        df_prepared_full = loader.load_training_data(
+            min_samples_per_category=MIN_SAMPLES_PER_CATEGORY,
+            columns=COLUMNS,  # ✅ baseline operacional com metadados
+            stats=load_stats,
+            near_dup_threshold=near_dup_threshold,
+            as_frame=True,  # limpo uma vez: treino/perfil/drift usam as colunas como estão
+        )
+        stage["rows"] = load_stats.get("raw_rows", 0)
+    df_train = df_prepared_full.select()
+
+    # 3) Fingerprints (dados + config): evita retreino se nada mudou
+    with timer.stage("fingerprint", rows=len(df_prepared_full)):
+        data_fp = fingerprint_dataframe(df_prepared_full.df)
+        config_fp = fingerprint_config(
+            build_pipeline(),
+            trainer="train_with_tracking",
+            min_samples_per_category=MIN_SAMPLES_PER_CATEGORY,
+            **{k: v for k, v in TRAIN_CONFIG.items() if k != "experiment_name"},
+        )
+    print(f"\n🔑 Fingerprint dados:  {data_fp[:16]}")
+    print(f"🔑 Fingerprint config: {config_fp[:16]}")
+
+    store = ModelStore()
     model_dir = Path("models")
-    model_dir.mkdir(exist_ok=True)
-
-    model_path = model_dir / "ticket_clf.joblib"
-    dump(model, model_path)
-    print(f"\n💾 Modelo salvo em: {model_path}")
-
-    reference_path = model_dir / "reference_data.parquet"
-    df_prepared_full.to_parquet(reference_path, index=False)
-    print(f"📋 Baseline operacional salvo em: {reference_path}")
-
+    entry = None if force else store.get(data_fp, config_fp)
+
+    if entry is not None:
+        # 4a) Cache hit: reaproveita artefatos (sem novo run no MLflow)
+        paths = store.publish(entry, model_dir)
+        print(f"♻️ Dados e config inalterados; reutilizando artefato de {entry}")
+        print(f"💾 Modelo em: {paths['model']}")
+        model = load(paths["model"])
+    else:
+        # 4b) Treinar + tracking no MLflow
+        model = train_with_tracking(
+            df_train,
+            **TRAIN_CONFIG,
+            extra_params={"data_fingerprint": data_fp, "config_fingerprint": config_fp},
+            timer=timer,
+        )
+        run = mlflow.last_active_run()
+        run_id = run.info.run_id if run is not None else None
+
+        # 5) Perfil compacto de referência (drift lê KBs, não o dataset de treino)
+        with timer.stage("profile", rows=len(df_prepared_full)):
+            profile = ReferenceProfile.from_frame(df_prepared_full, model)
+
+        # 6) Salvar artefatos locais (store + caminhos consumidos pela API)
+        with timer.stage("save"):
+            entry = store.put(
+                data_fp,
+                config_fp,
+                model,
+                df_prepared_full.df,
+                metadata={"trainer": "train_with_tracking", "mlflow_run_id": run_id},
+                profile=profile,
+            )
+            paths = store.publish(entry, model_dir)
+
+        # Estágio pós-run também vai para o MLflow (um único log_batch)
+        if run_id is not None:
+            MlflowClient().log_batch(
+                run_id,
+                metrics=[
+                    Metric(key, value, int(time.time() * 1000), 0)
+                    for key, value in timer.as_metrics().items()
+                    if key.startswith(("stage_profile_", "stage_save_"))
+                ],
+            )
+        print(f"\n💾 Modelo salvo em: {paths['model']}")
+        print(f"📈 Perfil de referência (drift) salvo em: {paths['profile']}")
+
+    timer.print_summary()
     print("=" * 60)
     print("✅ Treinamento concluído com sucesso!")
     print("=" * 60)
@@ -77,4 +153,23 @@ def prepare_and_train_with_mlflow():
 
 
 if __name__ == "__main__":
-    prepare_and_train_with_mlflow()
+    parser = argparse.ArgumentParser(description="Treina o classificador com tracking no MLflow.")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Retreina mesmo se dados e config não mudaram.",
+    )
+    parser.add_argument(
+        "--full-quality",
+        action="store_true",
+        help="Refaz o quality gate em todo o banco (ignora a marca d'água).",
+    )
+    parser.add_argument(
+        "--near-dedup",
+        type=float,
+        default=None,
+        metavar="LIMIAR",
+        help="Remove quase-duplicatas (MinHash/LSH, Jaccard ≥ LIMIAR, ex.: 0.8) antes de treinar.",
+    )
+    args = parser.parse_args()
+    prepare_and_train_with_mlflow(force=args.force, full_quality=args.full_quality, near_dup_threshold=args.near_dedup)
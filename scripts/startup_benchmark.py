@@ -0,0 +1,130 @@
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+
+import httpx
+import numpy as np
+
+TEXTOS = [
+    "Quero cancelar minha assinatura do plano anual",
+    "Meu pedido não chegou e o prazo já venceu",
+    "Fui cobrado duas vezes na fatura do cartão",
+    "Não consigo acessar minha conta pelo aplicativo",
+]
+
+
+def _wait(url: str, start: float, timeout_s: float, interval_s: float = 0.01) -> float:
+    """Segundos desde `start` até `url` responder 200."""
+    deadline = start + timeout_s
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(interval_s)
+    raise SystemExit(f"❌ Timeout aguardando {url}")
+
+
+def run_once(args, env: dict) -> dict:
+    base = f"http://127.0.0.1:{args.port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "ticket_ai.api.main:app",
+         "--port", str(args.port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env,
+    )
+    try:
+        live_s = _wait(base + args.live_path, start, args.timeout)
+        ready_s = _wait(base + args.ready_path, start, args.timeout)
+
+        latencies = []
+        with httpx.Client(base_url=base, timeout=30.0) as client:
+            for i in range(args.requests):
+                t0 = time.perf_counter()
+                client.post("/predict", json={"texto": TEXTOS[i % len(TEXTOS)]}).raise_for_status()
+                latencies.append((time.perf_counter() - t0) * 1000)
+        return {
+            "live_s": live_s,
+            "ready_s": ready_s,
+            "first_request_ms": latencies[0],
+            "steady_p50_ms": float(np.median(latencies[1:])) if len(latencies) > 1 else None,
+        }
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Tempo até liveness/readiness da API e latência das primeiras requisições.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=21, help="Requisições /predict após ficar pronta.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--live-path", default="/health/live")
+    parser.add_argument("--ready-path", default="/health/ready",
+                        help="Use /health para versões sem readiness (só mede até o servidor aceitar conexões).")
+    parser.add_argument("--src", type=Path, default=SRC_DIR, help="Código a medir (ex.: outro checkout).")
+    parser.add_argument("--serving-mode", choices=["thread", "process"], default=None)
+    parser.add_argument("--warmup-requests", type=int, default=None, help="TICKET_AI_WARMUP_REQUESTS.")
+    parser.add_argument("--output", type=Path, default=None, help="Salva o relatório em JSON.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not (PROJECT_ROOT / "models/ticket_clf.joblib").exists():
+        raise SystemExit("❌ Modelo não encontrado. Rode o treino antes do benchmark de inicialização.")
+
+    # Sem chave do LLM: mede só o caminho do modelo (o fallback não chama o provedor)
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    env["PYTHONPATH"] = str(args.src.resolve())
+    for flag, var in ((args.serving_mode, "TICKET_AI_SERVING_MODE"),
+                      (args.warmup_requests, "TICKET_AI_WARMUP_REQUESTS")):
+        if flag is not None:
+            env[var] = str(flag)
+
+    runs = []
+    for i in range(args.runs):
+        runs.append(run_once(args, env))
+        r = runs[-1]
+        print(f"🏁 Run {i + 1}: live={r['live_s']:.2f}s ready={r['ready_s']:.2f}s "
+              f"1ª req={r['first_request_ms']:.1f}ms p50={r['steady_p50_ms']:.1f}ms")
+
+    summary = {key: float(np.median([r[key] for r in runs]))
+               for key in ("live_s", "ready_s", "first_request_ms", "steady_p50_ms")}
+    print("\n" + "=" * 60)
+    print("⏱️  INICIALIZAÇÃO (mediana de", len(runs), "runs)")
+    print("=" * 60)
+    print(f"Até liveness:       {summary['live_s']:.2f} s")
+    print(f"Até readiness:      {summary['ready_s']:.2f} s")
+    print(f"1ª requisição:      {summary['first_request_ms']:.1f} ms")
+    print(f"Requisições (p50):  {summary['steady_p50_ms']:.1f} ms")
+    print("=" * 60)
+
+    if args.output:
+        report = {
+            "timestamp_utc": datetime.now(timezone.utc).isoformat(),
+            "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+            "summary": summary,
+            "runs": runs,
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 Relatório salvo em: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
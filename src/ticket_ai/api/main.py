@@ -1,12 +1,34 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from datetime import datetime, timezone
+import asyncio
 import os
 import logging
-from contextlib import asynccontextmanager
+import threading
+import time
+from contextlib import asynccontextmanager, suppress
+from typing import TYPE_CHECKING
 
-from ticket_ai.schemas import PredictRequest, PredictResponse
-from ticket_ai.services.classifier import TicketClassifier
-from ticket_ai.services.llm import gerar_resposta, resposta_fallback
+from ticket_ai.schemas import (
+    CorrectionRequest,
+    CorrectionResponse,
+    PredictRequest,
+    PredictResponse,
+)
+from ticket_ai.api.profiling import ProfilingConfig, ProfilingMiddleware, capture, stage
+from ticket_ai.services.llm import (
+    gerar_resposta,
+    gerar_resposta_async,
+    llm_stats,
+    resposta_fallback,
+    usage_stats,
+)
+from ticket_ai.services.prediction_log import PredictionRecord
+
+if TYPE_CHECKING:
+    from ticket_ai.services.classifier import TicketClassifier
+    from ticket_ai.services.reply_policy import ReplyDecision
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,21 +38,208 @@ logger = logging.getLogger("ticket_ai_api")
 
 START_TIME = datetime.now(timezone.utc)
 
+# Etapas da inicialização rodam em threads que o cancelamento não interrompe:
+# recursos criados depois do teardown são fechados em vez de publicados
+_lifecycle_lock = threading.Lock()
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Inicialização e teardown do app."""
+
+def _online_learning_enabled() -> bool:
+    return os.getenv("TICKET_AI_ONLINE_LEARNING", "false").lower() in ("1", "true", "yes")
+
+
+def _publish_state(app: FastAPI, name: str, resource, close) -> bool:
+    """Publica `resource` em `app.state`, ou o fecha se o app já está em teardown."""
+    with _lifecycle_lock:
+        if not app.state.stopping:
+            setattr(app.state, name, resource)
+            return True
+    close(resource)
+    logger.info(f"⏹ '{name}' criado após o teardown; encerrado.")
+    return False
+
+
+# Módulos pesados (sklearn, pandas/pyarrow, SDK do LLM) são importados nestas
+# etapas, em threads paralelas, e não no import de `ticket_ai.api.main`
+def _load_model(app: FastAPI) -> None:
+    from ticket_ai.services.classifier import DEFAULT_MODEL_PATH, TicketClassifier, model_version
+    from ticket_ai.services.inference_pool import InferencePool, serving_mode
+
+    # Modo `process`: o modelo vive só nos processos do pool (não no processo da API)
+    app.state.serving_mode = serving_mode()
+    app.state.model_version = model_version(DEFAULT_MODEL_PATH)
     try:
-        app.state.clf = TicketClassifier()
-        logger.info("✅ Modelo carregado com sucesso.")
+        if app.state.serving_mode == "process":
+            if _publish_state(app, "inference_pool", InferencePool(), lambda pool: pool.shutdown()):
+                logger.info(f"✅ Modelo carregado em {app.state.inference_pool.workers} processo(s) de inferência.")
+        else:
+            app.state.clf = TicketClassifier()
+            logger.info("✅ Modelo carregado com sucesso.")
     except FileNotFoundError as e:
-        app.state.clf = None
         logger.error(f"❌ Modelo não encontrado: {e}")
     except Exception as e:
-        app.state.clf = None
         logger.exception(f"❌ Erro inesperado ao carregar modelo: {e}")
+
+
+def _load_drift(app: FastAPI) -> None:
+    from ticket_ai.monitoring.drift_monitoring import DEFAULT_REFERENCE_PATH, load_baseline_sketch
+    from ticket_ai.monitoring.reference_profile import DEFAULT_PROFILE_PATH
+    from ticket_ai.monitoring.sketches import SlidingWindowSketches
+
+    # Drift ao vivo: sketches por janela alimentados pelo /predict; o baseline
+    # vira sketch uma única vez aqui (nenhuma releitura por consulta)
+    app.state.drift = SlidingWindowSketches()
+    if DEFAULT_PROFILE_PATH.exists() or DEFAULT_REFERENCE_PATH.exists():
+        try:
+            app.state.drift_baseline = load_baseline_sketch(DEFAULT_REFERENCE_PATH)
+            logger.info("✅ Baseline de drift carregado.")
+        except Exception as e:
+            logger.exception(f"❌ Erro ao carregar baseline de drift: {e}")
+
+
+def _start_online(app: FastAPI) -> None:
+    # Modelo online (opcional): servido ao lado do batch, atualizado por correções
+    if not (_model_available() and _online_learning_enabled()):
+        return
+    try:
+        from ticket_ai.services.online import OnlineTicketClassifier, classes_from_model
+
+        pool = app.state.inference_pool
+        classes = pool.classes if pool is not None else classes_from_model(app.state.clf.model)
+        if classes:
+            online = OnlineTicketClassifier(classes=classes)
+            online.start()
+            if _publish_state(app, "online", online, lambda o: o.stop(True)):
+                logger.info("✅ Aprendizado online habilitado.")
+    except Exception as e:
+        logger.exception(f"❌ Erro ao iniciar aprendizado online: {e}")
+
+
+def _start_prediction_log(app: FastAPI) -> None:
+    # Log de predições write-behind (opcional): alimenta drift/retreino com tráfego real
+    from ticket_ai.services.prediction_log import PredictionLogSink, prediction_log_backend
+
+    try:
+        backend = prediction_log_backend()
+        if backend is None:
+            return
+        sink = PredictionLogSink(backend=backend)
+        sink.start()
+        if _publish_state(app, "prediction_log", sink, lambda s: s.stop(flush=True)):
+            logger.info(f"✅ Log de predições habilitado ({backend}).")
+    except Exception as e:
+        logger.exception(f"❌ Erro ao iniciar log de predições: {e}")
+
+
+def _load_reply_policy(app: FastAPI) -> None:
+    # Níveis de resposta (template / cache / LLM) por categoria e confiança
+    from ticket_ai.services.reply_policy import DEFAULT_REPLY_POLICY_PATH, load_reply_policy
+
+    try:
+        app.state.reply_policy = load_reply_policy(DEFAULT_REPLY_POLICY_PATH)
+        if app.state.reply_policy is not None:
+            logger.info(f"✅ Política de respostas carregada ({DEFAULT_REPLY_POLICY_PATH}).")
+    except Exception as e:
+        logger.exception(f"❌ Erro ao carregar política de respostas: {e}")
+
+
+def _warm_up_model(app: FastAPI) -> None:
+    from ticket_ai.services.classifier import DEFAULT_WARMUP_REQUESTS
+
+    target = app.state.inference_pool or app.state.clf
+    if target is not None and DEFAULT_WARMUP_REQUESTS > 0:
+        target.warm_up(DEFAULT_WARMUP_REQUESTS)
+
+
+def _import_llm_sdk(app: FastAPI) -> None:
+    if os.getenv("OPENAI_API_KEY"):
+        import openai  # noqa: F401  (~1s; em thread, junto com o modelo)
+
+
+async def _warm_up_llm(app: FastAPI) -> None:
+    """Cliente do LLM criado e conexão aberta antes do primeiro ticket (se configurado)."""
+    if not os.getenv("OPENAI_API_KEY"):
+        return
+    from ticket_ai.services import llm
+
+    if getattr(app.state, "serving_mode", None) == "process":
+        ok = await llm.warm_up_connection_async()
+    else:
+        ok = await asyncio.to_thread(llm.warm_up_connection)
+    if not ok:
+        logger.warning("⚠️ Conexão com o LLM não aquecida (provedor não respondeu).")
+
+
+async def _startup(app: FastAPI) -> None:
+    """
+    Inicialização em segundo plano: o servidor já responde `/health/live` enquanto
+    modelo, baseline de drift e SDK do LLM carregam em paralelo; depois vêm o
+    warm-up do classificador e da conexão com o LLM e só então `/health/ready`.
+    """
+    steps = app.state.startup["steps"]
+    started = time.perf_counter()
+
+    async def timed(name: str, step, *, in_thread: bool = True) -> None:
+        t0 = time.perf_counter()
+        try:
+            await (asyncio.to_thread(step, app) if in_thread else step(app))
+        finally:
+            steps[name] = round(time.perf_counter() - t0, 3)
+
+    await asyncio.gather(
+        timed("model", _load_model),
+        timed("drift", _load_drift),
+        timed("llm_import", _import_llm_sdk),
+        timed("prediction_log", _start_prediction_log),
+        timed("reply_policy", _load_reply_policy),
+    )
+    await asyncio.gather(
+        timed("online", _start_online),
+        timed("model_warmup", _warm_up_model),
+        timed("llm_warmup", _warm_up_llm, in_thread=False),
+    )
+    app.state.startup["ready_s"] = round(time.perf_counter() - started, 3)
+    app.state.ready = _model_available()
+    logger.info(f"🚀 Inicialização concluída em {app.state.startup['ready_s']}s: {steps}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicialização (em segundo plano, ver `_startup`) e teardown do app."""
+    app.state.serving_mode = None
+    app.state.clf = None
+    app.state.inference_pool = None
+    app.state.online = None
+    app.state.drift = None
+    app.state.drift_baseline = None
+    app.state.model_version = None
+    app.state.prediction_log = None
+    app.state.reply_policy = None
+    app.state.ready = False
+    app.state.stopping = False
+    app.state.startup = {"steps": {}, "ready_s": None}
+    task = asyncio.create_task(_startup(app))
+
     yield
 
+    with _lifecycle_lock:
+        app.state.stopping = True
+    if not task.done():
+        task.cancel()
+    with suppress(asyncio.CancelledError, Exception):
+        await task
+    if app.state.online is not None:
+        # Flush = treino síncrono: fora do event loop
+        await asyncio.to_thread(app.state.online.stop, True)
+    if app.state.inference_pool is not None:
+        app.state.inference_pool.shutdown()
+    if app.state.prediction_log is not None:
+        app.state.prediction_log.stop(flush=True)
+
+
+def _model_available() -> bool:
+    return (getattr(app.state, "clf", None) is not None
+            or getattr(app.state, "inference_pool", None) is not None)
+
 app = FastAPI(
     title="Ticket AI",
     description="API de classificação automática de tickets com geração de resposta via LLM.",
@@ -38,6 +247,11 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Profiling por requisição: só instalado quando habilitado (custo zero desligado)
+_profiling = ProfilingConfig.from_env()
+if _profiling.enabled:
+    app.add_middleware(ProfilingMiddleware, config=_profiling)
+
 @app.get("/")
 def root():
     return {
@@ -45,6 +259,8 @@ def root():
         "version": app.version,
         "docs": "/docs",
         "health": "/health",
+        "liveness": "/health/live",
+        "readiness": "/health/ready",
     }
 
 @app.get("/health")
@@ -53,8 +269,9 @@ def health_check():
     uptime = (now - START_TIME).total_seconds()
     llm_configured = bool(os.getenv("OPENAI_API_KEY"))
 
-    clf = getattr(app.state, "clf", None)
-    if clf is None:
+    model_loaded = _model_available()
+    online = getattr(app.state, "online", None)
+    if not model_loaded:
         status = "model_not_loaded"
     elif not llm_configured:
         status = "llm_not_configured"
@@ -64,70 +281,286 @@ def health_check():
     return {
         "status": status,
         "uptime_seconds": uptime,
-        "model_loaded": clf is not None,
+        "model_loaded": model_loaded,
         "llm_configured": llm_configured,
+        "online_model_version": online.version if online is not None else None,
+        "ready": bool(getattr(app.state, "ready", False)),
         "timestamp_utc": now.isoformat(),
     }
 
+@app.get("/health/live")
+def liveness():
+    """Processo de pé e atendendo (não depende do modelo): para restart do orquestrador."""
+    return {"status": "alive", "uptime_seconds": (datetime.now(timezone.utc) - START_TIME).total_seconds()}
+
+@app.get("/health/ready")
+def readiness():
+    """Modelo carregado e aquecido (e conexão com o LLM aberta, se configurado): pode receber tráfego."""
+    startup = getattr(app.state, "startup", {"steps": {}, "ready_s": None})
+    if getattr(app.state, "ready", False):
+        return {"status": "ready", **startup}
+    status = "starting" if startup["ready_s"] is None else "model_not_loaded"
+    return JSONResponse(status_code=503, content={"status": status, **startup})
+
+def _classify_local(clf: "TicketClassifier", texto: str) -> tuple[str, dict[str, float]]:
+    # 1) Classificação
+    categoria = clf.predict(texto)
+
+    # 2) Probabilidades (se disponível)
+    try:
+        probas = clf.predict_proba(texto)
+    except Exception:
+        # Não derruba request se probas falhar (modelo pode mudar no futuro)
+        probas = {}
+    return categoria, probas
+
+def _after_classification(texto: str, categoria: str, probas: dict[str, float]) -> tuple:
+    """Modelo online e sketches de drift: nenhum dos dois derruba o request."""
+    confidence = max(probas.values()) if probas else None
+
+    # 2b) Modelo online (se habilitado)
+    categoria_online = None
+    online = getattr(app.state, "online", None)
+    if online is not None:
+        try:
+            categoria_online = online.predict(texto)
+        except Exception:
+            categoria_online = None
+
+    # 2c) Sketches de drift (O(tamanho do texto))
+    drift = getattr(app.state, "drift", None)
+    if drift is not None:
+        try:
+            drift.observe(texto, categoria, confidence)
+        except Exception:
+            logger.exception("Falha ao atualizar sketches de drift.")
+    return confidence, categoria_online
+
+def _llm_failed(texto: str, categoria: str) -> str:
+    # Degradação graciosa (produção): não derruba a API por falha no provedor LLM
+    logger.warning(
+        "Falha no LLM; retornando fallback.",
+        extra={"categoria": categoria, "texto_length": len(texto)},
+    )
+    return resposta_fallback(categoria)
+
+def _decide_reply(texto: str, categoria: str, confidence) -> "ReplyDecision | None":
+    policy = getattr(app.state, "reply_policy", None)
+    if policy is None:
+        return None
+    try:
+        return policy.decide(texto, categoria, confidence)
+    except Exception:
+        logger.exception("Falha na política de respostas; seguindo com o LLM.")
+        return None
+
+def _reply_without_llm(texto: str, categoria: str, confidence) -> tuple:
+    """
+    Passo de decisão comum aos dois modos: (decisão, resposta, origem) por template,
+    cache ou fallback sem chave; resposta None significa que cabe ao LLM gerar.
+    """
+    decision = _decide_reply(texto, categoria, confidence)
+    if decision is not None and decision.resposta is not None:
+        return decision, decision.resposta, decision.tier
+    if not os.getenv("OPENAI_API_KEY"):
+        return decision, resposta_fallback(categoria), "fallback"
+    return decision, None, None
+
+def _record_reply(decision: "ReplyDecision | None", origem: str, resposta: str, seconds: float) -> None:
+    if decision is None:
+        return
+    try:
+        app.state.reply_policy.record(decision, origem, resposta, seconds)
+    except Exception:
+        logger.exception("Falha ao registrar métricas da política de respostas.")
+
+def _stages_ms(t0: float, t1: float, t2: float, t3: float) -> dict[str, float]:
+    return {"classify": (t1 - t0) * 1000, "online_drift": (t2 - t1) * 1000, "llm": (t3 - t2) * 1000}
+
+def _log_prediction(texto: str, categoria: str, probas: dict[str, float], origem: str,
+                    stages_ms: dict[str, float]) -> None:
+    sink = getattr(app.state, "prediction_log", None)
+    if sink is None:
+        return
+    try:
+        sink.submit(PredictionRecord(
+            ts=time.time(),
+            texto=texto,
+            categoria=categoria,
+            probas=probas,
+            model_version=getattr(app.state, "model_version", None),
+            resposta_origem=origem,
+            stages_ms=stages_ms,
+        ))
+    except Exception:
+        logger.exception("Falha ao enfileirar predição no log.")
+
+def _response(texto: str, categoria: str, confidence, resposta: str, origem: str,
+              categoria_online) -> PredictResponse:
+    # 4) Log do request (metadados seguros)
+    logger.info(
+        "Predição realizada",
+        extra={
+            "categoria": categoria,
+            "texto_length": len(texto),
+            "confidence": confidence,
+            "resposta_origem": origem,
+        },
+    )
+    return PredictResponse(
+        categoria=categoria,
+        resposta=resposta,
+        resposta_origem=origem,
+        categoria_online=categoria_online,
+    )
+
+def _unexpected_error(req: PredictRequest) -> HTTPException:
+    # ✅ Importante para debug: stacktrace completo (sem PII)
+    logger.exception(
+        "Erro inesperado no /predict",
+        extra={
+            "texto_length": len(req.texto) if getattr(req, "texto", None) else None,
+        },
+    )
+    return HTTPException(status_code=500, detail="Erro interno no servidor.")
+
+def _predict_in_thread(clf: "TicketClassifier", req: PredictRequest) -> PredictResponse:
+    try:
+        with capture():
+            t0 = time.perf_counter()
+            with stage("classify"):
+                categoria, probas = _classify_local(clf, req.texto)
+            t1 = time.perf_counter()
+            with stage("online_drift"):
+                confidence, categoria_online = _after_classification(req.texto, categoria, probas)
+            t2 = time.perf_counter()
+
+            # 3) Resposta (template, cache, LLM ou fallback)
+            with stage("llm"):
+                decision, resposta, origem = _reply_without_llm(req.texto, categoria, confidence)
+                if resposta is None:
+                    try:
+                        resposta, origem = gerar_resposta(req.texto, categoria), "llm"
+                    except RuntimeError:
+                        resposta, origem = _llm_failed(req.texto, categoria), "llm_error"
+            t3 = time.perf_counter()
+
+        _record_reply(decision, origem, resposta, t3 - t2)
+        _log_prediction(req.texto, categoria, probas, origem, _stages_ms(t0, t1, t2, t3))
+        return _response(req.texto, categoria, confidence, resposta, origem, categoria_online)
+    except Exception:
+        raise _unexpected_error(req)
+
 @app.post("/predict", response_model=PredictResponse)
-def predict(req: PredictRequest):
+async def predict(req: PredictRequest):
     clf = getattr(app.state, "clf", None)
-    if clf is None:
+    pool = getattr(app.state, "inference_pool", None)
+    if clf is None and pool is None:
         raise HTTPException(
             status_code=503,
             detail="Modelo não disponível. Execute o pipeline de treinamento.",
         )
 
-    llm_configured = bool(os.getenv("OPENAI_API_KEY"))
+    if pool is None:
+        # Modo `thread`: CPU e espera do LLM na mesma thread do threadpool
+        return await run_in_threadpool(_predict_in_thread, clf, req)
 
+    # Modo `process`: CPU no pool de processos; o event loop só aguarda I/O.
+    # (cProfile aqui mede a thread do event loop, incluindo outras corrotinas)
     try:
-        # 1) Classificação
-        categoria = clf.predict(req.texto)
-
-        # 2) Probabilidades (se disponível)
-        probas = {}
-        confidence = None
-        try:
-            probas = clf.predict_proba(req.texto)
-            confidence = max(probas.values()) if probas else None
-        except Exception:
-            # Não derruba request se probas falhar (modelo pode mudar no futuro)
-            probas = {}
-            confidence = None
+        with capture():
+            t0 = time.perf_counter()
+            with stage("classify"):
+                categoria, probas = await pool.classify(req.texto)
+            t1 = time.perf_counter()
+            with stage("online_drift"):
+                # Modelo online (CPU) e lock dos sketches: fora do event loop
+                confidence, categoria_online = await asyncio.to_thread(
+                    _after_classification, req.texto, categoria, probas)
+            t2 = time.perf_counter()
 
+            with stage("llm"):
+                decision, resposta, origem = _reply_without_llm(req.texto, categoria, confidence)
+                if resposta is None:
+                    try:
+                        resposta, origem = await gerar_resposta_async(req.texto, categoria), "llm"
+                    except RuntimeError:
+                        resposta, origem = _llm_failed(req.texto, categoria), "llm_error"
+            t3 = time.perf_counter()
 
-        # 3) Resposta (LLM ou fallback)
-        if not llm_configured:
-            resposta = resposta_fallback(categoria)
+        _record_reply(decision, origem, resposta, t3 - t2)
+        log_args = (req.texto, categoria, probas, origem, _stages_ms(t0, t1, t2, t3))
+        sink = getattr(app.state, "prediction_log", None)
+        if sink is not None and sink.may_block:
+            # backpressure `block` espera num Condition: não no event loop
+            await asyncio.to_thread(_log_prediction, *log_args)
         else:
-            try:
-                resposta = gerar_resposta(req.texto, categoria)
-            except RuntimeError:
-                # Degradação graciosa (produção): não derruba a API por falha no provedor LLM
-                logger.warning(
-                    "Falha no LLM; retornando fallback.",
-                    extra={"categoria": categoria, "texto_length": len(req.texto)},
-                )
-                resposta = resposta_fallback(categoria)
-
-        # 4) Log do request (metadados seguros)
-        logger.info(
-            "Predição realizada",
-            extra={
-                "categoria": categoria,
-                "texto_length": len(req.texto),
-                "confidence": confidence,
-            },
+            _log_prediction(*log_args)
+        return _response(req.texto, categoria, confidence, resposta, origem, categoria_online)
+    except Exception:
+        raise _unexpected_error(req)
+
+@app.post("/corrections", response_model=CorrectionResponse, status_code=202)
+def submit_correction(req: CorrectionRequest):
+    online = getattr(app.state, "online", None)
+    if online is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Aprendizado online desabilitado (TICKET_AI_ONLINE_LEARNING).",
         )
 
-        return PredictResponse(categoria=categoria, resposta=resposta)
+    try:
+        pendentes = online.submit(req.texto, req.categoria)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return CorrectionResponse(aceito=True, pendentes=pendentes)
 
-    except Exception:
-        # ✅ Importante para debug: stacktrace completo (sem PII)
-        logger.exception(
-            "Erro inesperado no /predict",
-            extra={
-                "texto_length": len(req.texto) if getattr(req, "texto", None) else None,
-            },
+@app.get("/online/status")
+def online_status():
+    online = getattr(app.state, "online", None)
+    if online is None:
+        return {"enabled": False}
+    return {"enabled": True, **online.status()}
+
+@app.get("/serving/status")
+def serving_status():
+    """
+    Modo de serving e ocupação dos pools (processos de inferência e chamadas ao LLM),
+    tokens/custo do LLM e níveis de resposta (template/cache/LLM) com o economizado.
+    """
+    pool = getattr(app.state, "inference_pool", None)
+    sink = getattr(app.state, "prediction_log", None)
+    policy = getattr(app.state, "reply_policy", None)
+    return {
+        "mode": getattr(app.state, "serving_mode", "thread"),
+        "inference": pool.stats() if pool is not None else None,
+        "llm": {**llm_stats(), "usage": usage_stats()},
+        "prediction_log": sink.status() if sink is not None else None,
+        "reply_policy": policy.status() if policy is not None else None,
+    }
+
+@app.get("/drift")
+def drift_report(window: str = "1h"):
+    """Drift da janela (ex.: 15m, 1h, 24h) vs baseline: O(categorias), sem reler tabelas."""
+    drift = getattr(app.state, "drift", None)
+    baseline = getattr(app.state, "drift_baseline", None)
+    if drift is None or baseline is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Baseline de drift não disponível. Execute o pipeline de treinamento.",
         )
-        raise HTTPException(status_code=500, detail="Erro interno no servidor.")
\ No newline at end of file
+
+    try:
+        current = drift.window(window)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    from ticket_ai.monitoring.drift_monitoring import PSI_ALERT_THRESHOLD, compare_sketches
+
+    result = compare_sketches(baseline, current)
+    return {
+        "window": window,
+        "drift_detected": current.rows > 0 and result["psi_category"] > PSI_ALERT_THRESHOLD,
+        **result,
+    }
@@ -0,0 +1,222 @@
+import cProfile
+import contextvars
+import heapq
+import os
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import FrozenSet, Iterator, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+CAPTURE_KINDS = ("cpu", "alloc")
+ALLOC_TOP_LINES = 30
+
+
+def _env_set(name: str) -> FrozenSet[str]:
+    return frozenset(v.strip() for v in os.getenv(name, "").split(",") if v.strip())
+
+
+@dataclass(frozen=True)
+class ProfilingConfig:
+    """
+    Profiling opt-in por requisição (desligado por padrão). Uma requisição entra
+    na amostra por sorteio (`sample_rate`) ou pelo header de debug vindo de um
+    cliente permitido; a resposta ganha `Server-Timing` com os estágios marcados
+    por `stage(...)`. `capture` ("cpu", "alloc") grava cProfile/tracemalloc e só
+    os `keep_slowest` perfis mais lentos ficam em `output_dir`.
+    """
+    sample_rate: float = 0.0
+    header: str = "x-debug-profile"
+    allowed_clients: FrozenSet[str] = frozenset()
+    capture: FrozenSet[str] = frozenset()
+    output_dir: Path = Path("profiles")
+    keep_slowest: int = 5
+
+    @classmethod
+    def from_env(cls) -> "ProfilingConfig":
+        capture = _env_set("TICKET_AI_PROFILE_CAPTURE")
+        unknown = capture - set(CAPTURE_KINDS)
+        if unknown:
+            raise ValueError(f"TICKET_AI_PROFILE_CAPTURE inválido: {sorted(unknown)}. Use: {CAPTURE_KINDS}")
+        return cls(
+            sample_rate=float(os.getenv("TICKET_AI_PROFILE_SAMPLE_RATE", "0")),
+            header=os.getenv("TICKET_AI_PROFILE_HEADER", "X-Debug-Profile").lower(),
+            allowed_clients=_env_set("TICKET_AI_PROFILE_ALLOWED_CLIENTS"),
+            capture=capture,
+            output_dir=Path(os.getenv("TICKET_AI_PROFILE_DIR", "profiles")),
+            keep_slowest=int(os.getenv("TICKET_AI_PROFILE_KEEP_SLOWEST", "5")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or bool(self.allowed_clients)
+
+
+@dataclass
+class RequestProfile:
+    """Estado de uma requisição amostrada (visível às threads via cópia de contexto)."""
+    capture: FrozenSet[str]
+    stages: List[Tuple[str, float]] = field(default_factory=list)
+    profiler: Optional[cProfile.Profile] = None
+    alloc_top: Optional[List[str]] = None
+
+
+_current: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "ticket_ai_request_profile", default=None)
+# cProfile e tracemalloc são globais ao processo: uma captura por vez
+_capture_lock = threading.Lock()
+
+
+class _Stage:
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self.profile, self.name = profile, name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profile.stages.append((self.name, time.perf_counter() - self.start))
+
+
+_NOOP = nullcontext()
+
+
+def stage(name: str):
+    """Marca um estágio para o `Server-Timing` (no-op fora de requisição amostrada)."""
+    profile = _current.get()
+    return _NOOP if profile is None else _Stage(profile, name)
+
+
+def capture():
+    """
+    Liga cProfile/tracemalloc na thread que executa o trabalho da requisição
+    (no modo `thread`, a do threadpool). Se outra captura estiver ativa, segue só
+    com os tempos por estágio.
+    """
+    profile = _current.get()
+    if profile is None or not profile.capture:
+        return _NOOP
+    return _capture(profile)
+
+
+@contextmanager
+def _capture(profile: RequestProfile) -> Iterator[None]:
+    if not _capture_lock.acquire(blocking=False):
+        yield
+        return
+    started_tracing = False
+    try:
+        if "alloc" in profile.capture and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        if "cpu" in profile.capture:
+            profile.profiler = cProfile.Profile()
+            profile.profiler.enable()
+        try:
+            yield
+        finally:
+            if profile.profiler is not None:
+                profile.profiler.disable()
+            if started_tracing:
+                stats = tracemalloc.take_snapshot().statistics("lineno")
+                profile.alloc_top = [str(s) for s in stats[:ALLOC_TOP_LINES]]
+                tracemalloc.stop()
+    finally:
+        _capture_lock.release()
+
+
+def server_timing(stages: List[Tuple[str, float]], total_s: float) -> str:
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages]
+    parts.append(f"total;dur={total_s * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class SlowestProfiles:
+    """Mantém em disco os perfis das N requisições mais lentas (heap por duração)."""
+
+    def __init__(self, output_dir: Path, keep: int):
+        self.output_dir = Path(output_dir)
+        self.keep = keep
+        self._heap: List[Tuple[float, str, List[Path]]] = []
+        self._lock = threading.Lock()
+
+    def offer(self, duration_s: float, path: str, profile: RequestProfile) -> List[Path]:
+        if self.keep <= 0 or (profile.profiler is None and profile.alloc_top is None):
+            return []
+        with self._lock:
+            if len(self._heap) >= self.keep and duration_s <= self._heap[0][0]:
+                return []
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            stem = f"{time.strftime('%Y%m%dT%H%M%S')}_{duration_s * 1000:.0f}ms_{uuid.uuid4().hex[:8]}"
+            files = []
+            if profile.profiler is not None:
+                files.append(self.output_dir / f"{stem}.prof")
+                profile.profiler.dump_stats(files[-1])
+            if profile.alloc_top is not None:
+                files.append(self.output_dir / f"{stem}.alloc.txt")
+                files[-1].write_text(f"{path} {duration_s * 1000:.1f}ms\n" + "\n".join(profile.alloc_top),
+                                     encoding="utf-8")
+            entry = (duration_s, stem, files)
+            if len(self._heap) < self.keep:
+                heapq.heappush(self._heap, entry)
+                return files
+            for old in heapq.heappushpop(self._heap, entry)[2]:
+                old.unlink(missing_ok=True)
+            return files
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI puro: não bufferiza o corpo e, fora da amostra, só repassa a
+    chamada. Desligado (`ProfilingConfig.enabled` falso) nem deve ser instalado:
+    aí `stage(...)` custa só uma leitura de ContextVar.
+    """
+
+    def __init__(self, app, config: ProfilingConfig):
+        self.app = app
+        self.config = config
+        self.slowest = SlowestProfiles(config.output_dir, config.keep_slowest)
+
+    def _sampled(self, scope) -> bool:
+        if self.config.sample_rate > 0 and random.random() < self.config.sample_rate:
+            return True
+        if not self.config.allowed_clients:
+            return False
+        client = (scope.get("client") or ("",))[0]
+        if client not in self.config.allowed_clients:
+            return False
+        header = self.config.header.encode("latin-1")
+        return any(k == header and v not in (b"", b"0") for k, v in scope.get("headers", ()))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._sampled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(capture=self.config.capture)
+        token = _current.set(profile)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                value = server_timing(profile.stages, time.perf_counter() - start)
+                headers = list(message.get("headers", ())) + [(b"server-timing", value.encode("latin-1"))]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if profile.profiler is not None or profile.alloc_top is not None:
+                # Escrita em disco fora do event loop
+                await run_in_threadpool(
+                    self.slowest.offer, time.perf_counter() - start, scope.get("path", ""), profile)
@@ -0,0 +1,202 @@
+import glob
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import time
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from ticket_ai.data import storage
+from ticket_ai.data.ingest import DEFAULT_CHUNKSIZE, IngestReport, insert_rows, normalize_chunk
+
+
+@dataclass
+class BulkImportResult:
+    """
+    Resumo de um bulk import: arquivos concluídos, pulados (já importados antes),
+    com conteúdo repetido nesta lista (arquivo -> 1º arquivo com o mesmo conteúdo)
+    e com erro.
+    """
+    completed: List[IngestReport] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    same_content: Dict[str, str] = field(default_factory=dict)
+    failed: Dict[str, str] = field(default_factory=dict)
+    elapsed_s: float = 0.0
+
+    @property
+    def read_rows(self) -> int:
+        return sum(r.read_rows for r in self.completed)
+
+    @property
+    def inserted(self) -> int:
+        return sum(r.inserted for r in self.completed)
+
+    @property
+    def duplicates(self) -> int:
+        return sum(r.duplicates for r in self.completed)
+
+    @property
+    def rows_per_s(self) -> Optional[float]:
+        return self.read_rows / self.elapsed_s if self.elapsed_s > 0 else None
+
+
+def expand_paths(patterns: Sequence[str]) -> List[Path]:
+    """Expande arquivos/globs (ordem estável, sem repetição)."""
+    paths: List[Path] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for match in matches:
+            path = Path(match)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _prepare_file(path: str, chunksize: int) -> dict:
+    """
+    Worker (processo separado): parse + validação + normalização + hash.
+    Não toca no banco; devolve as linhas prontas para o escritor único.
+    """
+    start = time.perf_counter()
+    frames: List[pd.DataFrame] = []
+    read_rows = invalid_rows = 0
+    try:
+        for chunk in pd.read_csv(path, delimiter=";", encoding="utf-8", chunksize=chunksize):
+            valid, invalid = normalize_chunk(chunk)
+            read_rows += len(chunk)
+            invalid_rows += invalid
+            frames.append(valid)
+    except (OSError, ValueError, UnicodeDecodeError, pd.errors.ParserError) as e:
+        # OSError: arquivo removido/ilegível entre o hash e o parse
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+    return {
+        "path": path,
+        "frames": frames,
+        "read_rows": read_rows,
+        "invalid_rows": invalid_rows,
+        "parse_s": time.perf_counter() - start,
+    }
+
+
+def bulk_import(
+    paths: Sequence[Path],
+    db_path: Path = storage.DEFAULT_DB_PATH,
+    workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    force: bool = False,
+    defer_indexes: bool = False,
+    on_file: Optional[Callable[[IngestReport, BulkImportResult], None]] = None,
+) -> BulkImportResult:
+    """
+    Importa vários CSVs: parse/validação em pool de processos e um único escritor
+    (conexão `bulk`). Cada arquivo entra em UMA transação junto com seu registro em
+    `import_files`, então uma importação interrompida retoma do primeiro arquivo
+    não concluído. A escrita segue a ordem de `paths` (dedup "keep first" estável).
+
+    `defer_indexes=True` recria os índices secundários só no fim da carga.
+    """
+    result = BulkImportResult()
+    start = time.perf_counter()
+    # spawn: fork de processo com threads (pandas/BLAS, servidor) pode travar
+    workers = workers or os.cpu_count() or 1
+
+    with storage.connection(db_path, mode="bulk", migrate=True) as conn, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        done = set() if force else {
+            row[0] for row in conn.execute("SELECT file_hash FROM import_files")}
+        first_by_hash: Dict[str, str] = {}
+        pending: List[tuple] = []
+        for path in paths:
+            try:
+                file_hash = file_sha256(path)
+            except OSError as e:
+                result.failed[str(path)] = f"{type(e).__name__}: {e}"
+                continue
+            if file_hash in first_by_hash:
+                # mesmo conteúdo repetido na lista: importa uma vez
+                result.same_content[str(path)] = first_by_hash[file_hash]
+            elif file_hash in done:
+                result.skipped.append(str(path))
+            else:
+                first_by_hash[file_hash] = str(path)
+                pending.append((path, file_hash))
+
+        max_in_flight = 2 * workers  # limita memória: no máx. 2 arquivos preparados por worker
+        queue: deque = deque()
+        items = iter(pending)
+
+        def _submit_next() -> None:
+            item = next(items, None)
+            if item is not None:
+                future: Future = pool.submit(_prepare_file, str(item[0]), chunksize)
+                queue.append((item, future))
+
+        for _ in range(max_in_flight):
+            _submit_next()
+
+        with storage.deferred_indexes(conn) if defer_indexes and pending else nullcontext():
+            _write_all(conn, queue, _submit_next, result, start, on_file)
+
+    result.elapsed_s = time.perf_counter() - start
+    return result
+
+
+def _write_all(
+    conn: sqlite3.Connection,
+    queue: deque,
+    submit_next: Callable[[], None],
+    result: BulkImportResult,
+    start: float,
+    on_file: Optional[Callable[[IngestReport, BulkImportResult], None]],
+) -> None:
+    """Escritor único: consome os arquivos preparados na ordem de submissão."""
+    while queue:
+        (path, file_hash), future = queue.popleft()
+        prepared = future.result()
+        submit_next()
+
+        if "error" in prepared:
+            result.failed[str(path)] = prepared["error"]
+            continue
+
+        write_start = time.perf_counter()
+        inserted = sum(insert_rows(conn, frame) for frame in prepared["frames"])
+        valid_rows = sum(len(frame) for frame in prepared["frames"])
+        report = IngestReport(
+            source=str(path),
+            read_rows=prepared["read_rows"],
+            invalid_rows=prepared["invalid_rows"],
+            inserted=inserted,
+            duplicates=valid_rows - inserted,
+            elapsed_s=prepared["parse_s"] + (time.perf_counter() - write_start),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO import_files "
+            "(file_hash, path, read_rows, invalid_rows, inserted, duplicates, completed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (file_hash, str(path), report.read_rows, report.invalid_rows,
+             report.inserted, report.duplicates, datetime.now(timezone.utc).isoformat()),
+        )
+        conn.commit()
+
+        result.completed.append(report)
+        result.elapsed_s = time.perf_counter() - start
+        if on_file is not None:
+            on_file(report, result)
+
@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+from typing import Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Texto em buffer Arrow contíguo (sem um objeto Python por linha)
+TEXT_DTYPE = pd.StringDtype("pyarrow")
+
+
+def as_text(s: pd.Series) -> pd.Series:
+    """Equivalente a `fillna("").astype(str)`, seguro também para colunas categóricas."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        s = s.astype(object)
+    return s.fillna("").astype(str)
+
+
+def normalize_categoria(s: pd.Series) -> pd.Series:
+    """
+    `strip().lower()` como categórica. Em colunas já categóricas (saída do loader)
+    a normalização roda só nas categorias (O(categorias)) e os códigos são
+    remapeados; nulos continuam nulos.
+    """
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        s = s.astype("category")
+    norm = s.cat.categories.astype(str).str.strip().str.lower()
+    categories, remap = np.unique(norm.to_numpy(dtype=object), return_inverse=True)
+    codes = s.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=categories), index=s.index, name=s.name)
+
+
+@dataclass(frozen=True)
+class TicketFrame:
+    """
+    Tickets já limpos pelo loader: texto com strip e tamanho mínimo, categoria
+    em minúsculas, sem nulos nem duplicatas texto+categoria. Colunas compactas
+    (texto Arrow, categoria categórica).
+
+    O tipo registra que a limpeza já foi feita: treino, perfil de referência,
+    fingerprint e drift usam as colunas como estão, sem recast nem cópia.
+    Só o loader deve construí-lo (`TicketDataLoader.prepare_training_data` /
+    `load_training_data` com `as_frame=True`).
+    """
+    df: pd.DataFrame
+
+    @classmethod
+    def from_clean(cls, df: pd.DataFrame) -> "TicketFrame":
+        """Envolve um DataFrame limpo, convertendo (in place) para os dtypes compactos."""
+        if df["texto"].dtype != TEXT_DTYPE:
+            df["texto"] = df["texto"].astype(TEXT_DTYPE)
+        if not isinstance(df["categoria"].dtype, pd.CategoricalDtype):
+            df["categoria"] = df["categoria"].astype("category")
+        return cls(df)
+
+    @property
+    def texto(self) -> pd.Series:
+        return self.df["texto"]
+
+    @property
+    def categoria(self) -> pd.Series:
+        return self.df["categoria"]
+
+    @property
+    def empty(self) -> bool:
+        return self.df.empty
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def select(self, *columns: str) -> "TicketFrame":
+        """Projeção (texto/categoria sempre incluídos): continua limpa."""
+        cols = [c for c in ("texto", "categoria") if c not in columns] + list(columns)
+        return TicketFrame(pd.DataFrame({c: self.df[c] for c in cols}, copy=False))
+
+    def sample(self, n: int, random_state: int = 42) -> "TicketFrame":
+        return self if len(self) <= n else TicketFrame(self.df.sample(n=n, random_state=random_state))
+
+
+TicketData = Union[pd.DataFrame, TicketFrame]
+
+
+def text_and_labels(
+    data: TicketData,
+    text_col: str = "texto",
+    category_col: str = "categoria",
+) -> Tuple[pd.Series, pd.Series]:
+    """
+    (texto, categoria normalizada). `TicketFrame`: as próprias colunas, sem custo;
+    DataFrame qualquer: `as_text` + `normalize_categoria` (nulos viram "").
+    """
+    if isinstance(data, TicketFrame):
+        return data.texto, data.categoria
+    categoria = normalize_categoria(data[category_col])
+    if categoria.hasnans:
+        if "" not in categoria.cat.categories:
+            categoria = categoria.cat.add_categories("")
+        categoria = categoria.fillna("")
+    return as_text(data[text_col]), categoria
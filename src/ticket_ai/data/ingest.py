@@ -0,0 +1,109 @@
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from ticket_ai.data import storage
+
+REQUIRED_COLS = [
+    "texto",
+    "categoria",
+    "origem",
+    "data_criacao",
+    "status",
+    "prioridade",
+    "cliente_id",
+]
+DEFAULT_CHUNKSIZE = 50_000
+
+# Só o conflito no índice único de content_hash é ignorado (duplicata); qualquer
+# outra violação (ex.: NOT NULL) ainda falha em vez de virar "duplicata"
+_INSERT_SQL = (
+    f"INSERT INTO tickets ({', '.join(REQUIRED_COLS)}, content_hash) "
+    f"VALUES ({', '.join('?' * (len(REQUIRED_COLS) + 1))}) "
+    "ON CONFLICT(content_hash) DO NOTHING"
+)
+
+
+@dataclass
+class IngestReport:
+    """Contadores de uma ingestão (reexecutar o mesmo arquivo só soma duplicatas)."""
+    source: str
+    read_rows: int = 0
+    invalid_rows: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def rows_per_s(self) -> Optional[float]:
+        return self.read_rows / self.elapsed_s if self.elapsed_s > 0 else None
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "rows_per_s": self.rows_per_s}
+
+
+def normalize_chunk(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Valida colunas, normaliza texto/categoria, remove vazios (texto, categoria e
+    `origem`, que é NOT NULL no banco) e calcula `content_hash`.
+    Retorna (linhas válidas, quantidade de inválidas).
+    """
+    missing = [c for c in REQUIRED_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"CSV sem colunas obrigatórias: {missing}")
+
+    df = df[REQUIRED_COLS].copy()
+    df["texto"] = df["texto"].fillna("").astype(str).str.strip()
+    df["categoria"] = df["categoria"].fillna("").astype(str).str.strip().str.lower()
+
+    df["origem"] = df["origem"].where(df["origem"].isna(), df["origem"].astype(str).str.strip())
+
+    valid = (
+        (df["texto"].str.len() > 0)
+        & (df["categoria"].str.len() > 0)
+        & (df["origem"].fillna("").str.len() > 0)
+    )
+    df = df[valid]
+    df["cliente_id"] = pd.to_numeric(df["cliente_id"], errors="coerce").astype("Int64")
+    df["content_hash"] = [
+        storage.content_hash(t, c) for t, c in zip(df["texto"], df["categoria"])
+    ]
+    return df.reset_index(drop=True), int((~valid).sum())
+
+
+def insert_rows(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """Insere ignorando duplicatas de content_hash (commit fica com o chamador); retorna quantas linhas entraram de fato."""
+    if df.empty:
+        return 0
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    # rowcount (e não total_changes): ignora linhas alteradas pelos triggers
+    return conn.executemany(_INSERT_SQL, rows).rowcount
+
+
+def ingest_csv(
+    csv_path: Path,
+    db_path: Path = storage.DEFAULT_DB_PATH,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> IngestReport:
+    """
+    Ingestão incremental: lê o CSV em chunks e insere com conflito ignorado no
+    índice único de `content_hash` (duplicatas do próprio CSV e do banco).
+    Seguro para reexecutar.
+    """
+    report = IngestReport(source=str(csv_path))
+    start = time.perf_counter()
+    with storage.connection(db_path, mode="write", migrate=True) as conn:
+        for chunk in pd.read_csv(csv_path, delimiter=";", encoding="utf-8", chunksize=chunksize):
+            valid, invalid = normalize_chunk(chunk)
+            inserted = insert_rows(conn, valid)
+            conn.commit()
+            report.read_rows += len(chunk)
+            report.invalid_rows += invalid
+            report.inserted += inserted
+            report.duplicates += len(valid) - inserted
+    report.elapsed_s = time.perf_counter() - start
+    return report
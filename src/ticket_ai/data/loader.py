@@ -1,12 +1,25 @@
-import sqlite3
 import pandas as pd
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 from datetime import datetime, timezone
+import numpy as np
+from pandas.api.types import union_categoricals
+
+from ticket_ai.data import snapshot, storage
+from ticket_ai.data.frame import TicketFrame, as_text, normalize_categoria  # noqa: F401 (as_text: reexport)
+from ticket_ai.data.near_duplicates import near_duplicate_mask
+
+COLUMNS = ("texto", "categoria", "data_criacao", "status", "prioridade", "cliente_id")
+CATEGORICAL_COLUMNS = ("categoria", "status", "prioridade")
+DEFAULT_CHUNKSIZE = 50_000
+MIN_TEXT_LENGTH = 10
 
 
 class TicketDataLoader:
-    """Carrega e prepara dados de tickets a partir de um banco SQLite."""
+    """
+    Carrega e prepara dados de tickets a partir de um banco SQLite.
+    Só lê: migrações ficam com quem prepara o banco (`storage.ensure_schema`).
+    """
 
     def __init__(self, db_path: str = "data/tickets.db"):
         self.db_path = Path(db_path)
@@ -16,25 +29,112 @@ class TicketDataLoader:
                 "Execute: uv run python scripts/create_database.py"
             )
 
+    def iter_chunks(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        clean: bool = True,
+        stats: Optional[Dict[str, int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lê o banco em chunks.
+
+        - `columns`: projeção (só as colunas pedidas saem do SQLite; `id` também é aceito)
+        - `clean=True`: aplica a mesma limpeza de `prepare_training_data`
+          (dtypes compactos e dedup texto+categoria entre chunks)
+        - `clean=False`: valores como estão no SQLite (nenhuma conversão de tipo)
+        - `stats`: se informado, recebe `raw_rows` (linhas lidas antes da limpeza)
+        - `id_range`: (após_id, até_id] para leituras incrementais por marca d'água
+        """
+        cols = list(columns) if columns is not None else list(COLUMNS)
+        unknown = set(cols) - set(COLUMNS) - {"id"}
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas: {sorted(unknown)}")
+        if clean:
+            # limpeza depende de texto/categoria
+            cols = [c for c in ("texto", "categoria") if c not in cols] + cols
+
+        seen: set = set()
+        for chunk in self._iter_from_db(cols, chunksize, date_from, date_to, id_range):
+            if stats is not None:
+                stats["raw_rows"] = stats.get("raw_rows", 0) + len(chunk)
+            if clean:
+                chunk = self._clean_data(chunk, seen=seen)
+            if not chunk.empty:
+                yield chunk
+
     def load_raw_data(
         self,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
+        columns: Optional[Sequence[str]] = None,
     ) -> pd.DataFrame:
-        """Carrega dados do SQLite SEM limpeza/normalização (útil para gates)."""
-        return self._load_from_db(date_from=date_from, date_to=date_to)
+        """
+        Carrega dados do SQLite SEM limpeza/normalização (útil para gates): textos e
+        datas como estão no banco, sem conversão de tipo. Dtypes compactos
+        (categóricos, Int32, datetime) só depois da limpeza.
+        """
+        cols = list(columns) if columns is not None else list(COLUMNS)
+        chunks = self.iter_chunks(columns=cols, date_from=date_from, date_to=date_to, clean=False)
+        return self._concat_chunks(list(chunks), cols, compact=False)
+
+    def load_snapshot(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        columns: Optional[Sequence[str]] = None,
+        snapshot_dir: Optional[Path] = None,
+    ) -> pd.DataFrame:
+        """
+        Mesmas linhas e colunas de `load_raw_data`, lendo o snapshot Parquet (poda por
+        mês, filtro de data no scan, só as colunas pedidas). Os dtypes, porém, não são
+        os do SQLite bruto: o snapshot já é tipado no export (datas convertidas) e sai
+        com os dtypes compactos da limpeza, equivalente a `_compact_dtypes(load_raw_data())`.
+        Avisa se o snapshot está atrás do banco (rode `scripts/export_snapshot.py`).
+        """
+        snapshot_dir = Path(snapshot_dir) if snapshot_dir is not None else snapshot.DEFAULT_SNAPSHOT_DIR
+        cols = list(columns) if columns is not None else list(COLUMNS)
+        unknown = set(cols) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas: {sorted(unknown)}")
+
+        with storage.connection(self.db_path, mode="read") as conn:
+            max_id = conn.execute("SELECT MAX(id) FROM tickets").fetchone()[0] or 0
+        last_id = snapshot.read_watermark(snapshot_dir)["last_id"]
+        if max_id > last_id:
+            print(f"⚠️ Snapshot desatualizado: {max_id - last_id} ids novos no banco após o id {last_id}.")
+
+        df = snapshot.read_snapshot(snapshot_dir, columns=cols, date_from=date_from, date_to=date_to)
+        return self._compact_dtypes(df)
 
     def prepare_training_data(
         self,
         df_raw: pd.DataFrame,
         min_samples_per_category: int = 10,
         return_full: bool = False,
-    ) -> pd.DataFrame:
-        """Aplica limpeza/normalização + filtros e retorna DF pronto para treino."""
+        near_dup_threshold: Optional[float] = None,
+        as_frame: bool = False,
+    ) -> Union[pd.DataFrame, TicketFrame]:
+        """
+        Aplica limpeza/normalização + filtros e retorna DF pronto para treino.
+        `near_dup_threshold`: se informado, remove também quase-duplicatas
+        (MinHash/LSH, Jaccard ≥ limiar), mantendo a primeira de cada cluster.
+        `as_frame=True`: devolve um `TicketFrame` (colunas compactas, marcado como
+        limpo), que treino/perfil/drift consomem sem renormalizar.
+        """
         df = self._clean_data(df_raw)
+        if near_dup_threshold is not None:
+            df = self._drop_near_duplicates(df, near_dup_threshold)
         df = self._filter_by_category_count(df, min_samples_per_category)
         self._print_summary(df)
 
+        if as_frame:
+            frame = TicketFrame.from_clean(df)
+            return frame if return_full else frame.select()
+
         if return_full:
             return df # baseline operacional (com metadados)
 
@@ -45,63 +145,224 @@ class TicketDataLoader:
         min_samples_per_category: int = 10,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
-    ) -> pd.DataFrame:
-        """Atalho: carrega RAW e prepara para treino."""
-        df_raw = self.load_raw_data(date_from=date_from, date_to=date_to)
-        return self.prepare_training_data(df_raw, min_samples_per_category=min_samples_per_category)
+        columns: Sequence[str] = ("texto", "categoria"),
+        stats: Optional[Dict[str, int]] = None,
+        pushdown: bool = False,
+        near_dup_threshold: Optional[float] = None,
+        as_frame: bool = False,
+    ) -> Union[pd.DataFrame, TicketFrame]:
+        """
+        Atalho: lê já limpo em chunks (só as colunas pedidas) e aplica o filtro
+        por categoria. Não materializa o RAW inteiro.
 
-    def _load_from_db(
+        `pushdown=True`: limpeza, dedup e filtro por categoria rodam no SQLite;
+        só as linhas prontas para treino chegam ao Python (mesmo resultado).
+        `near_dup_threshold`: remove quase-duplicatas antes do filtro por categoria.
+        `as_frame=True`: devolve um `TicketFrame` (ver `prepare_training_data`).
+        """
+        cols = list(columns)
+        if pushdown:
+            chunks = self._iter_pushdown(
+                cols, min_samples_per_category, date_from=date_from, date_to=date_to, stats=stats)
+            df = self._concat_chunks(list(chunks), cols)
+            if near_dup_threshold is not None:
+                # as contagens por categoria mudam: refiltra depois do dedup
+                df = self._drop_near_duplicates(df, near_dup_threshold)
+                df = self._filter_by_category_count(df, min_samples_per_category)
+        else:
+            chunks = self.iter_chunks(
+                columns=cols, date_from=date_from, date_to=date_to, clean=True, stats=stats)
+            df = self._concat_chunks(list(chunks), cols)
+            if near_dup_threshold is not None:
+                df = self._drop_near_duplicates(df, near_dup_threshold)
+            df = self._filter_by_category_count(df, min_samples_per_category)
+        self._print_summary(df)
+        return TicketFrame.from_clean(df) if as_frame else df
+
+    def _iter_pushdown(
         self,
+        columns: List[str],
+        min_samples_per_category: int,
+        chunksize: int = DEFAULT_CHUNKSIZE,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
-    ) -> pd.DataFrame:
-        """Executa query no SQLite com filtros opcionais por data."""
+        stats: Optional[Dict[str, int]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Equivalente SQL de `_clean_data` + `_filter_by_category_count`:
+        normalização (UDFs), filtro por LENGTH, dedup "keep first" por
+        ROW_NUMBER sobre a chave normalizada e contagem por categoria.
+        """
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas: {sorted(unknown)}")
+
+        where, params = self._date_filters(date_from, date_to)
+        extra = [c for c in COLUMNS if c in columns and c not in ("texto", "categoria")]
+        query = f"""
+        WITH base AS MATERIALIZED (
+            SELECT id, norm_text(texto) AS texto, norm_categoria(categoria) AS categoria
+                {"".join(f", {c}" for c in extra)}
+            FROM tickets
+            WHERE texto IS NOT NULL AND categoria IS NOT NULL{where}
+        ),
+        firsts AS (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY texto, categoria ORDER BY id) AS rn
+            FROM base
+            WHERE LENGTH(texto) >= ?
+        ),
+        kept AS (
+            SELECT *, COUNT(*) OVER (PARTITION BY categoria) AS n_categoria
+            FROM firsts
+            WHERE rn = 1
+        )
+        SELECT {", ".join(columns)}
+        FROM kept
+        WHERE n_categoria >= ?
+        ORDER BY id
+        """
+        with storage.connection(self.db_path, mode="read") as conn:
+            if stats is not None:
+                raw = conn.execute(f"SELECT COUNT(*) FROM tickets WHERE 1=1{where}", params).fetchone()[0]
+                stats["raw_rows"] = stats.get("raw_rows", 0) + int(raw)
+            chunks = pd.read_sql_query(
+                query, conn, params=params + [MIN_TEXT_LENGTH, min_samples_per_category],
+                chunksize=chunksize)
+            for chunk in chunks:
+                yield self._compact_dtypes(chunk)
+
+    @staticmethod
+    def _date_filters(
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> Tuple[str, List[str]]:
+        """Cláusulas `AND data_criacao ...` e parâmetros (datas em UTC naive)."""
 
         def _format_dt(value: datetime) -> str:
             if value.tzinfo is not None:
                 value = value.astimezone(timezone.utc).replace(tzinfo=None)
             return value.strftime("%Y-%m-%d %H:%M:%S")
 
-        query = """
-        SELECT texto, categoria, data_criacao, status, prioridade, cliente_id
-        FROM tickets
-        WHERE 1=1
-        """
-        params: list[str] = []
-
+        where = ""
+        params: List[str] = []
         if date_from:
-            query += " AND data_criacao >= ?"
+            where += " AND data_criacao >= ?"
             params.append(_format_dt(date_from))
         if date_to:
-            query += " AND data_criacao <= ?"
+            where += " AND data_criacao <= ?"
             params.append(_format_dt(date_to))
+        return where, params
+
+    def _iter_from_db(
+        self,
+        columns: List[str],
+        chunksize: int,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Executa query no SQLite com projeção e filtros opcionais por data/id."""
+        where, params = self._date_filters(date_from, date_to)
+        if id_range is not None:
+            where += " AND id > ? AND id <= ?"
+            params += [int(id_range[0]), int(id_range[1])]
+        query = f"""
+        SELECT {", ".join(columns)}
+        FROM tickets
+        WHERE 1=1{where}
+        """
+
+        # Ordem de inserção explícita: o índice por data não altera o "keep first" do dedup
+        query += " ORDER BY id"
 
-        with sqlite3.connect(self.db_path) as conn:
-            df = pd.read_sql_query(query, conn, params=params)
+        with storage.connection(self.db_path, mode="read") as conn:
+            yield from pd.read_sql_query(query, conn, params=params, chunksize=chunksize)
+
+    @staticmethod
+    def _compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Categóricos para colunas de baixa cardinalidade, Int32 e datetime (datas
+        inválidas viram NaT). Etapa da limpeza: altera `df` in place.
+        """
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+        if "cliente_id" in df.columns:
+            df["cliente_id"] = pd.to_numeric(df["cliente_id"], errors="coerce").astype("Int32")
+        if "data_criacao" in df.columns:
+            df["data_criacao"] = pd.to_datetime(df["data_criacao"], errors="coerce")
         return df
 
-    def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Limpa e normaliza os dados."""
-        if df.empty:
-            return df
+    @staticmethod
+    def _concat_chunks(
+        chunks: List[pd.DataFrame], columns: Sequence[str], compact: bool = True,
+    ) -> pd.DataFrame:
+        """Concatena chunks preservando categóricos (união das categorias)."""
+        if not chunks:
+            empty = pd.DataFrame({c: pd.Series(dtype=object) for c in columns})
+            return TicketDataLoader._compact_dtypes(empty) if compact else empty
+        if len(chunks) == 1:
+            return chunks[0].reset_index(drop=True)
+
+        cat_cols = [c for c in CATEGORICAL_COLUMNS
+                    if c in chunks[0].columns and isinstance(chunks[0][c].dtype, pd.CategoricalDtype)]
+        df = pd.concat([c.drop(columns=cat_cols) for c in chunks], ignore_index=True)
+        for col in cat_cols:
+            df[col] = union_categoricals([c[col] for c in chunks], ignore_order=True)
+        return df[list(chunks[0].columns)]
 
+    def _clean_data(self, df: pd.DataFrame, seen: Optional[set] = None) -> pd.DataFrame:
+        """
+        Limpa e normaliza os dados (inclui a conversão para dtypes compactos;
+        o DataFrame recebido não é alterado).
+        `seen` (hashes texto+categoria) permite deduplicar entre chunks.
+        """
         required = {"texto", "categoria"}
         missing = required - set(df.columns)
         if missing:
             raise ValueError(
                 f"Colunas obrigatórias ausentes no banco: {missing}")
 
-        df = df.dropna(subset=["texto", "categoria"])
-        df["texto"] = df["texto"].astype(str).str.strip()
-        df = df[df["texto"].str.len() >= 10]
-        df["categoria"] = df["categoria"].astype(str).str.strip().str.lower()
+        df = self._compact_dtypes(df.copy(deep=False))
+        if df.empty:
+            return df
 
-        if "data_criacao" in df.columns:
-            df["data_criacao"] = pd.to_datetime(
-                df["data_criacao"], errors="coerce")
+        # Máscaras e colunas normalizadas primeiro; o DataFrame de saída é montado
+        # uma única vez no fim (sem cópias intermediárias do chunk inteiro)
+        rows = np.flatnonzero((df["texto"].notna() & df["categoria"].notna()).to_numpy())
+        texto = df["texto"].iloc[rows].astype(str).str.strip()
+        long_enough = (texto.str.len() >= MIN_TEXT_LENGTH).to_numpy()
+        rows, texto = rows[long_enough], texto[long_enough]
+        # categórica (saída de `_compact_dtypes`): strip/lower só nas categorias
+        categoria = normalize_categoria(df["categoria"].iloc[rows])
 
-        df = df.drop_duplicates(subset=["texto", "categoria"])
-        return df.reset_index(drop=True)
+        hashes = pd.util.hash_pandas_object(
+            pd.DataFrame({"texto": texto, "categoria": categoria}, copy=False), index=False)
+        first = ~hashes.duplicated().to_numpy()
+        if seen is not None:
+            first &= [h not in seen for h in hashes.tolist()]
+            seen.update(hashes[first].tolist())
+        rows = rows[first]
+
+        columns = {}
+        for col in df.columns:
+            if col == "texto":
+                columns[col] = texto.to_numpy()[first]
+            elif col == "categoria":
+                columns[col] = categoria.array[first].remove_unused_categories()
+            else:
+                columns[col] = df[col].array.take(rows)
+        return pd.DataFrame(columns)
+
+    def _drop_near_duplicates(self, df: pd.DataFrame, threshold: float) -> pd.DataFrame:
+        """Remove quase-duplicatas de texto (mantém a primeira de cada cluster)."""
+        if df.empty:
+            return df
+        keep = near_duplicate_mask(df["texto"], threshold=threshold)
+        removed = int((~keep).sum())
+        if removed > 0:
+            print(f"⚠️ Removidas {removed} quase-duplicatas (Jaccard ≥ {threshold}).")
+        return df[keep].reset_index(drop=True)
 
     def _filter_by_category_count(self, df: pd.DataFrame, min_samples: int) -> pd.DataFrame:
         """Remove categorias com poucos exemplos."""
@@ -110,14 +371,18 @@ class TicketDataLoader:
 
         counts = df["categoria"].value_counts()
         valid = counts[counts >= min_samples].index
-        filtered = df[df["categoria"].isin(valid)].copy()
+        keep = df["categoria"].isin(valid)
+        if keep.all():
+            return df  # nada a remover: sem cópia
 
+        filtered = df[keep].reset_index(drop=True)
         removed = len(df) - len(filtered)
-        if removed > 0:
-            print(
-                f"⚠️ Removidos {removed} tickets de categorias com menos de {min_samples} exemplos.")
+        print(
+            f"⚠️ Removidos {removed} tickets de categorias com menos de {min_samples} exemplos.")
 
-        return filtered.reset_index(drop=True)
+        if isinstance(filtered["categoria"].dtype, pd.CategoricalDtype):
+            filtered["categoria"] = filtered["categoria"].cat.remove_unused_categories()
+        return filtered
 
     def _print_summary(self, df: pd.DataFrame) -> None:
         """Resumo rápido do dataset."""
@@ -140,19 +405,28 @@ class TicketDataLoader:
 
         print("-" * 50)
 
-    def get_category_stats(self) -> pd.DataFrame:
-        """Estatísticas por categoria (debug/EDA rápido)."""
-        query = """
+    def get_category_stats(self, by_month: bool = False) -> pd.DataFrame:
+        """
+        Estatísticas por categoria (ou categoria+mês) lidas da tabela materializada
+        `category_stats`: custo O(categorias), não O(linhas).
+        """
+        keys = "categoria, mes" if by_month else "categoria"
+        query = f"""
         SELECT
-            categoria,
-            COUNT(*) as total,
-            AVG(LENGTH(texto)) as tamanho_medio_texto,
-            MIN(data_criacao) as primeiro_ticket,
-            MAX(data_criacao) as ultimo_ticket
-        FROM tickets
-        GROUP BY categoria
-        ORDER BY total DESC
+            {keys},
+            SUM(total) as total,
+            CAST(SUM(soma_tamanho_texto) AS REAL) / SUM(total) as tamanho_medio_texto,
+            MIN(primeiro_ticket) as primeiro_ticket,
+            MAX(ultimo_ticket) as ultimo_ticket
+        FROM {{source}}
+        GROUP BY {keys}
+        ORDER BY {"categoria, mes" if by_month else "total DESC, categoria"}
         """
-        with sqlite3.connect(self.db_path) as conn:
-            stats = pd.read_sql_query(query, conn)
+        with storage.connection(self.db_path, mode="read") as conn:
+            # Banco não migrado (ex.: somente leitura): recalcula a partir de tickets
+            if storage.has_category_stats(conn):
+                source = "category_stats"
+            else:
+                source = f"({storage.CATEGORY_STATS_LIVE_SQL})"
+            stats = pd.read_sql_query(query.format(source=source), conn)
         return stats
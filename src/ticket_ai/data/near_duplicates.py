@@ -0,0 +1,253 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 64
+DEFAULT_SHINGLE_SIZE = 3  # palavras por shingle
+
+_SEPARATOR = "\ue000"  # caractere de uso privado: não é espaço para str.split()
+_NUMBERS = re.compile(r"\d+")
+_BATCH_TEXTS = 2_000        # textos por lote de shingling
+_PERM_BLOCK = 16            # permutações por passada (matriz intermediária cabe no cache)
+_VERIFY_BATCH = 100_000     # pares candidatos verificados por vez
+
+
+def _shingle_hashes(texts: Sequence[str], shingle_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash de cada k-grama de palavras (minúsculas, números → "0") de um lote de textos.
+    A tokenização roda uma vez sobre o lote concatenado e o hash das palavras é
+    vetorizado (pandas). Retorna (hashes, início de cada texto em `hashes`);
+    textos com menos de k palavras viram um único shingle.
+    """
+    joined = f" {_SEPARATOR} ".join(texts).lower()
+    if joined.count(_SEPARATOR) != len(texts) - 1:  # separador dentro de algum texto
+        joined = f" {_SEPARATOR} ".join(t.replace(_SEPARATOR, " ") for t in texts).lower()
+    tokens = np.array(_NUMBERS.sub("0", joined).split(), dtype=object)
+
+    boundary = tokens == _SEPARATOR
+    text_of_word = np.cumsum(boundary)[~boundary]
+    words = pd.util.hash_array(tokens[~boundary])
+    n_words = np.bincount(text_of_word, minlength=len(texts))
+
+    # Cada texto ganha k-1 posições vazias no fim: janelas nunca cruzam textos
+    padded = np.zeros(len(words) + len(texts) * (shingle_size - 1) + 1, dtype=np.uint64)
+    padded[np.arange(len(words)) + text_of_word * (shingle_size - 1)] = words
+    powers = np.uint64(0x100000001B3) ** np.arange(shingle_size, dtype=np.uint64)
+    window_hash = (sliding_window_view(padded, shingle_size) * powers).sum(axis=1, dtype=np.uint64)
+
+    counts = np.maximum(n_words - shingle_size + 1, 1)
+    text_starts = np.concatenate([[0], np.cumsum(n_words + shingle_size - 1)[:-1]])
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    h = window_hash[np.arange(counts.sum()) + np.repeat(text_starts - offsets, counts)]
+    h ^= h >> np.uint64(29)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    return h >> np.uint64(32), offsets
+
+
+def minhash_signatures(
+    texts: Sequence[str],
+    num_perm: int = DEFAULT_NUM_PERM,
+    shingle_size: int = DEFAULT_SHINGLE_SIZE,
+    seed: int = 1,
+) -> np.ndarray:
+    """
+    Assinaturas MinHash (n, num_perm) em uint32 sobre k-gramas de `shingle_size` palavras.
+    Permutações multiply-shift ((a·x + b) mod 2^64) >> 32, determinísticas por `seed`:
+    sem divisão, só mul/add/shift por elemento. Textos repetidos são hasheados uma vez.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    codes, uniques = pd.factorize(pd.Series(list(texts), dtype=object).fillna(""))
+    out = np.empty((len(uniques), num_perm), dtype=np.uint32)
+    for start in range(0, len(uniques), _BATCH_TEXTS):
+        shingles, offsets = _shingle_hashes(list(uniques[start:start + _BATCH_TEXTS]), shingle_size)
+        for p in range(0, num_perm, _PERM_BLOCK):
+            values = a[p:p + _PERM_BLOCK, None] * shingles[None, :]
+            values += b[p:p + _PERM_BLOCK, None]
+            values >>= np.uint64(32)
+            out[start:start + _BATCH_TEXTS, p:p + _PERM_BLOCK] = (
+                np.minimum.reduceat(values, offsets, axis=1).T)
+    return out[codes]
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bandas, linhas por banda) que minimizam falsos positivos + falsos negativos no limiar."""
+    s = np.linspace(0.0, 1.0, 201)
+    below, above = s < threshold, s >= threshold
+    best, best_error = (1, num_perm), np.inf
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        p = 1.0 - (1.0 - s ** rows) ** bands
+        error = np.trapezoid(p[below], s[below]) + np.trapezoid(1.0 - p[above], s[above])
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+def cluster_signatures(signatures: np.ndarray, threshold: float = DEFAULT_THRESHOLD) -> np.ndarray:
+    """
+    Agrupa linhas com Jaccard estimado ≥ `threshold` via LSH por bandas.
+
+    Em cada balde, cada membro é comparado só com o primeiro (menor índice) do balde,
+    então o custo é linear mesmo com baldes enormes (templates). Os pares confirmados
+    viram arestas e os clusters são componentes conexas. Retorna, para cada linha,
+    o índice da primeira linha do seu cluster (ela mesma, se não tiver quase-duplicata).
+    """
+    n, num_perm = signatures.shape
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    bands, rows = lsh_params(threshold, num_perm)
+    multipliers = (np.uint64(0x9E3779B97F4A7C15) ** np.arange(1, rows + 1, dtype=np.uint64))
+
+    src: List[np.ndarray] = []
+    dst: List[np.ndarray] = []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = (block * multipliers).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        new_bucket = np.concatenate([[True], sorted_keys[1:] != sorted_keys[:-1]])
+        first = order[np.flatnonzero(new_bucket)][np.cumsum(new_bucket) - 1]
+        member = first != order
+        src.append(first[member])
+        dst.append(order[member])
+
+    pairs = np.unique(np.concatenate(src) * n + np.concatenate(dst)) if src else np.empty(0, np.int64)
+    left, right = pairs // n, pairs % n
+    confirmed = np.zeros(len(pairs), dtype=bool)
+    for i in range(0, len(pairs), _VERIFY_BATCH):
+        l, r = left[i:i + _VERIFY_BATCH], right[i:i + _VERIFY_BATCH]
+        confirmed[i:i + _VERIFY_BATCH] = (signatures[l] == signatures[r]).mean(axis=1) >= threshold
+    left, right = left[confirmed], right[confirmed]
+
+    graph = coo_matrix((np.ones(len(left), dtype=np.int8), (left, right)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    first_of_label = np.full(labels.max() + 1, n, dtype=np.int64)
+    np.minimum.at(first_of_label, labels, np.arange(n))
+    return first_of_label[labels]
+
+
+@dataclass
+class NearDuplicateReport:
+    """Clusters de quase-duplicatas (inclui as exatas) sobre um conjunto de tickets."""
+    threshold: float
+    cluster_of: np.ndarray                     # índice da 1ª linha do cluster, por linha
+    ids: Optional[np.ndarray] = None           # id do ticket por linha (se conhecido)
+    categories: Optional[np.ndarray] = None    # categoria normalizada por linha
+
+    @property
+    def total_rows(self) -> int:
+        return len(self.cluster_of)
+
+    def keep_mask(self) -> np.ndarray:
+        """True para a primeira linha de cada cluster (dedup "keep first")."""
+        return self.cluster_of == np.arange(self.total_rows)
+
+    @property
+    def duplicate_rows(self) -> int:
+        return int(self.total_rows - self.keep_mask().sum())
+
+    def clusters(self, min_size: int = 2) -> List[np.ndarray]:
+        """Posições de cada cluster com ≥ `min_size` linhas, do maior para o menor."""
+        sizes = np.bincount(self.cluster_of, minlength=self.total_rows)
+        positions = np.flatnonzero(sizes[self.cluster_of] >= min_size)
+        if len(positions) == 0:
+            return []
+        order = positions[np.argsort(self.cluster_of[positions], kind="stable")]
+        groups = np.split(order, np.flatnonzero(np.diff(self.cluster_of[order])) + 1)
+        return sorted(groups, key=len, reverse=True)
+
+    def conflicting_clusters(self) -> int:
+        """Clusters cujos tickets têm categorias diferentes (provável ruído de rótulo)."""
+        if self.categories is None:
+            return 0
+        multi = pd.Series(self.categories).groupby(self.cluster_of).nunique()
+        return int((multi > 1).sum())
+
+    def summary(self, top: int = 5) -> Dict:
+        clusters = self.clusters()
+        largest = []
+        for positions in clusters[:top]:
+            ids = self.ids[positions] if self.ids is not None else positions
+            item = {"size": len(positions), "ids": [int(i) for i in ids[:10]]}
+            if self.categories is not None:
+                item["categorias"] = sorted(set(self.categories[positions]))
+            largest.append(item)
+        return {
+            "threshold": self.threshold,
+            "total_rows": self.total_rows,
+            "clusters": len(clusters),
+            "duplicate_rows": self.duplicate_rows,
+            "conflicting_clusters": self.conflicting_clusters(),
+            "largest": largest,
+        }
+
+
+class NearDuplicateIndex:
+    """
+    Detecção de quase-duplicatas em streaming: `update(chunk)` calcula só as
+    assinaturas MinHash (num_perm × 4 bytes por linha); o agrupamento LSH roda
+    uma vez em `report()`. Custo ~linear no número de linhas.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = DEFAULT_NUM_PERM,
+        shingle_size: int = DEFAULT_SHINGLE_SIZE,
+        seed: int = 1,
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold deve estar em (0, 1].")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self._signatures: List[np.ndarray] = []
+        self._ids: List[np.ndarray] = []
+        self._categories: List[np.ndarray] = []
+
+    def update(self, df: pd.DataFrame) -> "NearDuplicateIndex":
+        """Consome um chunk com `texto` (e, opcionalmente, `categoria`/`id`)."""
+        if df.empty:
+            return self
+        texts = df["texto"].astype(object).fillna("").astype(str).tolist()
+        self._signatures.append(minhash_signatures(texts, self.num_perm, self.shingle_size, self.seed))
+        if "id" in df.columns:
+            self._ids.append(df["id"].to_numpy(dtype=np.int64))
+        if "categoria" in df.columns:
+            categoria = df["categoria"].astype(object).fillna("").astype(str)
+            self._categories.append(categoria.str.strip().str.lower().to_numpy())
+        return self
+
+    def report(self) -> NearDuplicateReport:
+        signatures = (np.concatenate(self._signatures) if self._signatures
+                      else np.empty((0, self.num_perm), dtype=np.uint32))
+        return NearDuplicateReport(
+            threshold=self.threshold,
+            cluster_of=cluster_signatures(signatures, self.threshold),
+            ids=_concat_if_complete(self._ids, len(signatures)),
+            categories=_concat_if_complete(self._categories, len(signatures)),
+        )
+
+
+def _concat_if_complete(parts: List[np.ndarray], n: int) -> Optional[np.ndarray]:
+    """Só usa a coluna opcional se ela veio em todos os chunks."""
+    if not parts or sum(map(len, parts)) != n:
+        return None
+    return np.concatenate(parts)
+
+
+def near_duplicate_mask(texts: pd.Series, threshold: float = DEFAULT_THRESHOLD, **kwargs) -> np.ndarray:
+    """Máscara "keep first" que remove quase-duplicatas de `texts` (ordem preservada)."""
+    index = NearDuplicateIndex(threshold=threshold, **kwargs)
+    return index.update(pd.DataFrame({"texto": texts})).report().keep_mask()
@@ -1,94 +1,186 @@
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+
+import joblib
+import numpy as np
 import pandas as pd
-from typing import Dict, Optional, Sequence
 
+from ticket_ai.data import storage
+from ticket_ai.data.frame import text_and_labels
+from ticket_ai.data.loader import TicketDataLoader
+from ticket_ai.data.near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex, NearDuplicateReport
 
-class DataQualityChecker:
-    """Verificações básicas de qualidade para datasets de tickets."""
+DEFAULT_QUALITY_STATE_PATH = Path(os.getenv("TICKET_AI_QUALITY_STATE", "data/quality_state.joblib"))
+QUALITY_STATE_VERSION = 1
 
-    def __init__(
-        self,
-        df: pd.DataFrame,
-        expected_categories: Optional[Sequence[str]] = None,
-        min_text_len: int = 10,
-    ):
-        self.df = df.copy()
-        self.expected_categories = set(
-            expected_categories) if expected_categories else None
+REQUIRED_COLUMNS = ("texto", "categoria")
+LEAKAGE_TERMS = ("financeiro", "assinatura", "logistica")
+LEAKAGE_PATTERN = "|".join(rf"\b{term}\b" for term in LEAKAGE_TERMS)
+
+
+class QualityAccumulator:
+    """
+    Estatísticas parciais de qualidade, atualizáveis por chunk e combináveis (`merge`).
+    Duplicatas são rastreadas por hash de 64 bits de (texto+categoria) normalizados,
+    guardados num array ordenado e compactado: 8 bytes por linha única.
+    """
+
+    def __init__(self, min_text_len: int = 10, compact_every: int = 1_000_000):
         self.min_text_len = min_text_len
+        self.compact_every = compact_every
+        self.rows = 0
+        self.missing_columns: set = set()
+        self.null_counts = {col: 0 for col in REQUIRED_COLUMNS}
+        self.empty_categoria = 0
+        self.short_texts = 0
+        self.punct_sum = 0
+        self.high_punct = 0
+        self.leakage_hits = 0
+        self.category_counts: Counter = Counter()
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._pending: list = []
+        self._pending_rows = 0
 
-    def run_all_checks(self) -> Dict:
+    def update(self, df: pd.DataFrame) -> "QualityAccumulator":
+        """Consome um chunk (não altera nem copia o DataFrame de entrada)."""
+        missing = set(REQUIRED_COLUMNS) - set(df.columns)
+        if missing:
+            self.missing_columns |= missing
+            return self
+        if df.empty:
+            return self
+
+        self.rows += len(df)
+        for col in REQUIRED_COLUMNS:
+            self.null_counts[col] += int(df[col].isnull().sum())
+
+        # categoria normalizada como categórica: strip/lower só nas categorias
+        texto, categoria = text_and_labels(df)
+
+        self.empty_categoria += int((categoria == "").sum())
+        self.short_texts += int((texto.str.len() < self.min_text_len).sum())
+        counts = categoria.value_counts()
+        self.category_counts.update(counts[counts > 0].to_dict())
+
+        punct = texto.str.count(r"[^\w\s]")
+        self.punct_sum += int(punct.sum())
+        self.high_punct += int((punct > 20).sum())
+        # Regex com \b só onde o termo aparece como substring (mesmo resultado, ~3x mais rápido)
+        lower = texto.str.lower()
+        candidates = np.fromiter(
+            (any(term in s for term in LEAKAGE_TERMS) for s in lower), dtype=bool, count=len(lower))
+        self.leakage_hits += int(lower[candidates].str.contains(LEAKAGE_PATTERN).sum())
+
+        hashes = pd.util.hash_pandas_object(
+            pd.DataFrame({"texto": texto.str.strip(), "categoria": categoria}), index=False)
+        self._add_hashes(np.unique(hashes.to_numpy()))
+        return self
+
+    def merge(self, other: "QualityAccumulator") -> "QualityAccumulator":
+        """Combina com outro acumulador (ex.: chunks processados em paralelo)."""
+        if other.min_text_len != self.min_text_len:
+            raise ValueError("Acumuladores com min_text_len diferentes não podem ser combinados.")
+        self.rows += other.rows
+        self.missing_columns |= other.missing_columns
+        for col in REQUIRED_COLUMNS:
+            self.null_counts[col] += other.null_counts[col]
+        self.empty_categoria += other.empty_categoria
+        self.short_texts += other.short_texts
+        self.punct_sum += other.punct_sum
+        self.high_punct += other.high_punct
+        self.leakage_hits += other.leakage_hits
+        self.category_counts.update(other.category_counts)
+        self._add_hashes(other.unique_hashes())
+        return self
+
+    def unique_hashes(self) -> np.ndarray:
+        self._compact()
+        return self._hashes
+
+    @property
+    def duplicates(self) -> int:
+        return self.rows - len(self.unique_hashes())
+
+    def _add_hashes(self, hashes: np.ndarray) -> None:
+        self._pending.append(hashes)
+        self._pending_rows += len(hashes)
+        if self._pending_rows >= self.compact_every:
+            self._compact()
+
+    def _compact(self) -> None:
+        if self._pending:
+            self._hashes = np.unique(np.concatenate([self._hashes, *self._pending]))
+            self._pending = []
+            self._pending_rows = 0
+
+    def results(self, expected_categories: Optional[Sequence[str]] = None) -> Dict:
+        """Mesmo dicionário de `DataQualityChecker.run_all_checks`."""
         results = {
             "is_valid": True,
-            "total_rows": int(len(self.df)),
+            "total_rows": int(self.rows),
             "issues": [],
             "warnings": [],
         }
 
         # 0) Schema mínimo
-        required_cols = {"texto", "categoria"}
-        missing = required_cols - set(self.df.columns)
-        if missing:
+        if self.missing_columns:
             results["issues"].append(
-                f"Colunas obrigatórias ausentes: {sorted(missing)}")
+                f"Colunas obrigatórias ausentes: {sorted(self.missing_columns)}")
             results["is_valid"] = False
             return results
 
         # 1) Dataset vazio
-        if self.df.empty:
+        if self.rows == 0:
             results["issues"].append("DataFrame vazio.")
             results["is_valid"] = False
             return results
 
-        texto = self.df["texto"].fillna("").astype(str)
-        categoria = self.df["categoria"].fillna("").astype(str).str.strip()
-
         # 2) Nulos reais (antes de normalizar)
-        null_counts = self.df[["texto", "categoria"]].isnull().sum()
-        if null_counts.any():
+        nulls = {col: n for col, n in self.null_counts.items() if n > 0}
+        if nulls:
             results["warnings"].append(
-                f"Nulos detectados (antes de normalizar): {null_counts[null_counts > 0].to_dict()}"
+                f"Nulos detectados (antes de normalizar): {nulls}"
             )
 
         # 3) Categorias vazias (bloqueante)
-        empty_cat = (categoria.str.len() == 0).sum()
-        if empty_cat > 0:
+        if self.empty_categoria > 0:
             results["issues"].append(
-                f"{empty_cat} linhas com categoria vazia.")
+                f"{self.empty_categoria} linhas com categoria vazia.")
             results["is_valid"] = False
 
         # 4) Textos muito curtos (warning)
-        short_texts = (texto.str.len() < self.min_text_len).sum()
-        if short_texts > 0:
+        if self.short_texts > 0:
             results["warnings"].append(
-                f"{short_texts} textos com menos de {self.min_text_len} caracteres.")
+                f"{self.short_texts} textos com menos de {self.min_text_len} caracteres.")
 
         # 5) Duplicatas exatas (warning)
-        dup = pd.DataFrame({"texto": texto.str.strip(
-        ), "categoria": categoria.str.lower()}).duplicated().sum()
+        dup = self.duplicates
         if dup > 0:
             results["warnings"].append(
                 f"{dup} duplicatas exatas (texto+categoria).")
 
         # 6) Desbalanceamento alto (warning)
-        counts = categoria.str.lower().value_counts()
-        if len(counts) > 1 and counts.min() > 0:
-            ratio = counts.max() / counts.min()
+        counts = self.category_counts
+        if len(counts) > 1 and min(counts.values()) > 0:
+            ratio = max(counts.values()) / min(counts.values())
             if ratio > 10:
                 results["warnings"].append(
                     f"Desbalanceamento alto (max/min = {ratio:.1f}x).")
 
         # 7) Categorias fora do esperado (bloqueante, se informado)
-        if self.expected_categories is not None:
-            unknown = sorted(set(counts.index) - self.expected_categories)
+        if expected_categories is not None:
+            unknown = sorted(set(counts) - set(expected_categories))
             if unknown:
                 results["issues"].append(
                     f"Categorias fora do conjunto esperado: {unknown}")
                 results["is_valid"] = False
 
         # 8) Ruído por pontuação (warnings)
-        punct_count = texto.str.count(r"[^\w\s]")
-        avg_punct = float(punct_count.mean())
-        pct_high_punct = float((punct_count > 20).mean() * 100)
+        avg_punct = self.punct_sum / self.rows
+        pct_high_punct = self.high_punct / self.rows * 100
         if avg_punct > 8:
             results["warnings"].append(
                 f"Média alta de caracteres especiais por texto: {avg_punct:.1f}")
@@ -97,8 +189,7 @@ class DataQualityChecker:
                 f"{pct_high_punct:.1f}% dos textos têm >20 caracteres especiais.")
 
         # 9) Possível vazamento (heurístico)
-        leakage_hits = (texto.str.lower().str.contains(
-            r"\bfinanceiro\b|\bassinatura\b|\blogistica\b")).mean() * 100
+        leakage_hits = self.leakage_hits / self.rows * 100
         if leakage_hits > 15:
             results["warnings"].append(
                 f"Possível vazamento: {leakage_hits:.1f}% dos textos contêm nomes de categorias (heurístico)."
@@ -106,6 +197,84 @@ class DataQualityChecker:
 
         return results
 
+
+class DataQualityChecker:
+    """Verificações básicas de qualidade para datasets de tickets."""
+
+    def __init__(
+        self,
+        df: Optional[pd.DataFrame],
+        expected_categories: Optional[Sequence[str]] = None,
+        min_text_len: int = 10,
+    ):
+        self.df = df  # sem cópia: as checagens só leem o DataFrame
+        self.expected_categories = set(
+            expected_categories) if expected_categories else None
+        self.min_text_len = min_text_len
+        self.near_duplicates: Optional[NearDuplicateReport] = None
+        self._accumulator: Optional[QualityAccumulator] = None
+
+    @classmethod
+    def from_chunks(
+        cls,
+        chunks: Iterable[pd.DataFrame],
+        expected_categories: Optional[Sequence[str]] = None,
+        min_text_len: int = 10,
+    ) -> "DataQualityChecker":
+        """Gate em memória limitada: consome chunks (ex.: `loader.iter_chunks(clean=False)`)."""
+        accumulator = QualityAccumulator(min_text_len=min_text_len)
+        for chunk in chunks:
+            accumulator.update(chunk)
+        return cls.from_accumulator(accumulator, expected_categories=expected_categories)
+
+    @classmethod
+    def from_accumulator(
+        cls,
+        accumulator: "QualityAccumulator",
+        expected_categories: Optional[Sequence[str]] = None,
+    ) -> "DataQualityChecker":
+        checker = cls(None, expected_categories=expected_categories, min_text_len=accumulator.min_text_len)
+        checker._accumulator = accumulator
+        return checker
+
+    @property
+    def accumulator(self) -> QualityAccumulator:
+        if self._accumulator is None:
+            self._accumulator = QualityAccumulator(min_text_len=self.min_text_len).update(self.df)
+        return self._accumulator
+
+    def detect_near_duplicates(
+        self,
+        chunks: Optional[Iterable[pd.DataFrame]] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        **kwargs,
+    ) -> NearDuplicateReport:
+        """
+        Etapa opcional (MinHash/LSH): agrupa quase-duplicatas de texto e passa a
+        incluí-las no relatório. Sem `chunks`, usa o DataFrame do checker.
+        """
+        index = NearDuplicateIndex(threshold=threshold, **kwargs)
+        for chunk in ([self.df] if chunks is None else chunks):
+            index.update(chunk)
+        self.near_duplicates = index.report()
+        return self.near_duplicates
+
+    def run_all_checks(self) -> Dict:
+        results = self.accumulator.results(self.expected_categories)
+        report = self.near_duplicates
+        if report is not None:
+            summary = report.summary()
+            results["near_duplicates"] = summary
+            if summary["duplicate_rows"] > 0:
+                results["warnings"].append(
+                    f"{summary['duplicate_rows']} quase-duplicatas (Jaccard ≥ {report.threshold}, "
+                    f"inclui exatas) em {summary['clusters']} clusters.")
+            if summary["conflicting_clusters"] > 0:
+                results["warnings"].append(
+                    f"{summary['conflicting_clusters']} clusters de quase-duplicatas com "
+                    "categorias diferentes (possível ruído de rótulo).")
+        return results
+
     def print_report(self) -> None:
         r = self.run_all_checks()
         print("\n" + "=" * 60)
@@ -125,7 +294,118 @@ class DataQualityChecker:
             for i, w in enumerate(r["warnings"], start=1):
                 print(f"{i}. {w}")
 
+        largest = r.get("near_duplicates", {}).get("largest", [])
+        if largest:
+            print("\n🔁 Maiores clusters de quase-duplicatas:")
+            for cluster in largest:
+                categorias = ", ".join(cluster.get("categorias", [])) or "-"
+                ids = ", ".join(map(str, cluster["ids"]))
+                print(f"- {cluster['size']} tickets | categorias: {categorias} | ids: {ids}...")
+
         if not r["issues"] and not r["warnings"]:
             print("\n✅ Nenhum problema identificado.")
 
         print("=" * 60)
+
+
+class IncrementalQualityGate:
+    """
+    Gate de qualidade incremental: persiste a marca d'água (maior id checado) e o
+    `QualityAccumulator` do último run aprovado. Só as linhas novas são lidas e
+    combinadas às estatísticas globais (duplicatas contra os hashes guardados,
+    contagens por categoria, tamanhos etc.), então o custo é proporcional aos dados novos.
+
+    Recheck completo: `full=True`, estado ausente/incompatível ou linhas removidas
+    abaixo da marca d'água. UPDATE em linhas já checadas não é detectado (use `full`).
+    """
+
+    def __init__(
+        self,
+        loader: TicketDataLoader,
+        state_path: Optional[Path] = None,
+        expected_categories: Optional[Sequence[str]] = None,
+        min_text_len: int = 10,
+    ):
+        self.loader = loader
+        self.state_path = Path(state_path) if state_path is not None else DEFAULT_QUALITY_STATE_PATH
+        self.expected_categories = expected_categories
+        self.min_text_len = min_text_len
+        self.last_run: Dict = {}
+
+    def run(self, full: bool = False) -> DataQualityChecker:
+        with storage.connection(self.loader.db_path, mode="read") as conn:
+            max_id = int(conn.execute("SELECT COALESCE(MAX(id), 0) FROM tickets").fetchone()[0])
+            state, reason = (None, "recheck completo solicitado") if full else self._load_state()
+            if state is not None:
+                rows_below = conn.execute(
+                    "SELECT COUNT(*) FROM tickets WHERE id <= ?", (state["last_id"],)).fetchone()[0]
+                if rows_below != state["accumulator"].rows:
+                    state, reason = None, "linhas removidas abaixo da marca d'água"
+
+        if state is not None:
+            accumulator, start_id = state["accumulator"], state["last_id"]
+        else:
+            accumulator, start_id = QualityAccumulator(min_text_len=self.min_text_len), 0
+
+        rows_before = accumulator.rows
+        chunks = self.loader.iter_chunks(
+            columns=["texto", "categoria"], clean=False, id_range=(start_id, max_id))
+        for chunk in chunks:
+            accumulator.update(chunk)
+
+        checker = DataQualityChecker.from_accumulator(accumulator, self.expected_categories)
+        passed = checker.run_all_checks()["is_valid"]
+        self.last_run = {
+            "mode": "incremental" if state is not None else "full",
+            "reason": reason,
+            "from_id": start_id,
+            "last_id": max_id,
+            "new_rows": accumulator.rows - rows_before,
+            "total_rows": accumulator.rows,
+        }
+        # Só avança a marca d'água com o gate aprovado: linhas problemáticas
+        # continuam sendo relidas até serem corrigidas
+        if passed:
+            self._save_state(accumulator, max_id)
+        return checker
+
+    def _load_state(self):
+        if not self.state_path.exists():
+            return None, "sem estado anterior"
+        try:
+            state = joblib.load(self.state_path)
+        except Exception as e:  # estado corrompido/classe incompatível: recomeça
+            return None, f"estado ilegível ({type(e).__name__})"
+        if state.get("version") != QUALITY_STATE_VERSION:
+            return None, "versão de estado diferente"
+        if state.get("db_path") != str(self.loader.db_path.resolve()):
+            return None, "estado de outro banco"
+        if state["accumulator"].min_text_len != self.min_text_len:
+            return None, "min_text_len diferente"
+        return state, None
+
+    def _save_state(self, accumulator: QualityAccumulator, last_id: int) -> None:
+        accumulator.unique_hashes()  # compacta antes de serializar
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        joblib.dump(
+            {
+                "version": QUALITY_STATE_VERSION,
+                "db_path": str(self.loader.db_path.resolve()),
+                "last_id": int(last_id),
+                "accumulator": accumulator,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            },
+            tmp,
+        )
+        os.replace(tmp, self.state_path)
+
+    def print_summary(self) -> None:
+        run = self.last_run
+        if run.get("mode") == "incremental":
+            print(
+                f"♻️ Quality gate incremental: {run['new_rows']} linhas novas após o id "
+                f"{run['from_id']} (total {run['total_rows']})."
+            )
+        elif run:
+            print(f"🔎 Quality gate completo ({run['reason']}): {run['total_rows']} linhas.")
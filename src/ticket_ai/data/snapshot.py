@@ -0,0 +1,171 @@
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from ticket_ai.data import storage
+
+DEFAULT_SNAPSHOT_DIR = Path(os.getenv("TICKET_AI_SNAPSHOT_DIR", "data/snapshots/tickets"))
+WATERMARK_FILE = "_watermark.json"  # prefixo "_": ignorado pelo pyarrow.dataset
+NO_DATE_PARTITION = "sem_data"
+
+# Colunas RAW (sem limpeza) com tipos fixos: todos os arquivos têm o mesmo schema
+SNAPSHOT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("texto", pa.string()),
+    ("categoria", pa.string()),
+    ("data_criacao", pa.timestamp("ns")),
+    ("status", pa.string()),
+    ("prioridade", pa.string()),
+    ("cliente_id", pa.int32()),
+])
+_PARTITIONING = ds.partitioning(pa.schema([("mes", pa.string())]), flavor="hive")
+
+
+def read_watermark(snapshot_dir: Path = DEFAULT_SNAPSHOT_DIR) -> Dict:
+    path = Path(snapshot_dir) / WATERMARK_FILE
+    if not path.exists():
+        return {"last_id": 0, "rows": 0}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_watermark(snapshot_dir: Path, watermark: Dict) -> None:
+    path = Path(snapshot_dir) / WATERMARK_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(watermark, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def export_snapshot(
+    db_path: Path = storage.DEFAULT_DB_PATH,
+    snapshot_dir: Path = DEFAULT_SNAPSHOT_DIR,
+    chunksize: int = 100_000,
+    full: bool = False,
+) -> Dict:
+    """
+    Exporta para Parquet (particionado por `mes=YYYY-MM` de data_criacao) só as linhas
+    com id acima da marca d'água. Cada chunk vira um arquivo por partição com nome
+    determinístico (`part-<primeiro id>.parquet`): reexecutar após uma falha
+    sobrescreve os mesmos arquivos. O snapshot é append-only (UPDATE/DELETE no
+    SQLite exigem `full=True`).
+    """
+    snapshot_dir = Path(snapshot_dir)
+    if full and snapshot_dir.exists():
+        shutil.rmtree(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    watermark = read_watermark(snapshot_dir)
+    start = time.perf_counter()
+    exported = files = 0
+    columns = ", ".join(SNAPSHOT_SCHEMA.names)
+
+    with storage.connection(db_path, mode="read") as conn:
+        while True:
+            chunk = pd.read_sql_query(
+                f"SELECT {columns} FROM tickets WHERE id > ? ORDER BY id LIMIT ?",
+                conn, params=[watermark["last_id"], chunksize],
+            )
+            if chunk.empty:
+                break
+
+            chunk["data_criacao"] = pd.to_datetime(chunk["data_criacao"], errors="coerce")
+            chunk["cliente_id"] = pd.to_numeric(chunk["cliente_id"], errors="coerce").astype("Int32")
+            meses = chunk["data_criacao"].dt.strftime("%Y-%m").fillna(NO_DATE_PARTITION)
+            first_id = int(chunk["id"].iloc[0])
+
+            for mes, part in chunk.groupby(meses, sort=True):
+                part_dir = snapshot_dir / f"mes={mes}"
+                part_dir.mkdir(exist_ok=True)
+                target = part_dir / f"part-{first_id:012d}.parquet"
+                tmp = part_dir / f".{target.name}.tmp"  # "." também é ignorado no scan
+                table = pa.Table.from_pandas(part, schema=SNAPSHOT_SCHEMA, preserve_index=False)
+                pq.write_table(table, tmp, compression="zstd")
+                os.replace(tmp, target)
+                files += 1
+
+            exported += len(chunk)
+            watermark = {
+                "last_id": int(chunk["id"].iloc[-1]),
+                "rows": int(watermark["rows"]) + len(chunk),
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+            _write_watermark(snapshot_dir, watermark)
+
+    return {
+        "exported_rows": exported,
+        "files_written": files,
+        "elapsed_s": time.perf_counter() - start,
+        **watermark,
+    }
+
+
+def _utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def read_snapshot(
+    snapshot_dir: Path = DEFAULT_SNAPSHOT_DIR,
+    columns: Optional[Sequence[str]] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    filter: Optional[ds.Expression] = None,
+) -> pd.DataFrame:
+    """
+    Lê o snapshot com poda de partição (`mes`), predicado em data_criacao (e `filter`
+    extra, expressão pyarrow) empurrado para o scan e projeção de colunas.
+    Linhas saem em ordem de id (mesma ordem do SQLite).
+    """
+    snapshot_dir = Path(snapshot_dir)
+    if not (snapshot_dir / WATERMARK_FILE).exists():
+        raise FileNotFoundError(
+            f"Snapshot não encontrado em '{snapshot_dir}'. "
+            "Execute: uv run python scripts/export_snapshot.py"
+        )
+
+    cols = list(columns) if columns is not None else [c for c in SNAPSHOT_SCHEMA.names if c != "id"]
+    unknown = set(cols) - set(SNAPSHOT_SCHEMA.names)
+    if unknown:
+        raise ValueError(f"Colunas desconhecidas: {sorted(unknown)}")
+
+    conditions = []
+    if date_from:
+        date_from = _utc_naive(date_from)
+        conditions += [
+            ds.field("mes") >= f"{date_from:%Y-%m}",
+            ds.field("mes") != NO_DATE_PARTITION,
+            ds.field("data_criacao") >= pa.scalar(date_from, pa.timestamp("ns")),
+        ]
+    if date_to:
+        date_to = _utc_naive(date_to)
+        conditions += [
+            ds.field("mes") <= f"{date_to:%Y-%m}",
+            ds.field("data_criacao") <= pa.scalar(date_to, pa.timestamp("ns")),
+        ]
+    if filter is not None:
+        conditions.append(filter)
+    expr = None
+    for condition in conditions:
+        expr = condition if expr is None else expr & condition
+
+    dataset = ds.dataset(
+        snapshot_dir,
+        format="parquet",
+        schema=SNAPSHOT_SCHEMA.append(pa.field("mes", pa.string())),
+        partitioning=_PARTITIONING,
+    )
+    read_cols = cols if "id" in cols else ["id"] + cols
+    table = dataset.to_table(columns=read_cols, filter=expr)
+    table = table.sort_by("id")
+    if "id" not in cols:
+        table = table.drop_columns(["id"])
+    return table.to_pandas()
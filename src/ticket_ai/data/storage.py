@@ -0,0 +1,466 @@
+import hashlib
+import logging
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_DB_PATH = Path("data/tickets.db")
+
+logger = logging.getLogger("ticket_ai_storage")
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Migração versionada (PRAGMA user_version). `apply` cobre passos em Python."""
+    version: int
+    description: str
+    statements: Tuple[str, ...] = ()
+    apply: Optional[Callable[[sqlite3.Connection], None]] = None
+
+
+def _norm_text(value):
+    return None if value is None else str(value).strip()
+
+
+def _norm_categoria(value):
+    return None if value is None else str(value).strip().lower()
+
+
+def content_hash(texto, categoria) -> str:
+    """Hash do conteúdo normalizado (mesma chave texto+categoria do dedup do loader)."""
+    key = f"{_norm_text(texto)}\x1f{_norm_categoria(categoria)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def backfill_content_hash(conn: sqlite3.Connection, batch_size: int = 10_000) -> int:
+    """
+    Preenche `content_hash` das linhas sem hash, em ordem de id.
+    Duplicatas (normalizadas) ficam NULL via UPDATE OR IGNORE: o índice único
+    mantém só a primeira ocorrência, igual ao "keep first" do loader.
+    Retorna quantas linhas receberam hash.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, texto, categoria FROM tickets "
+            "WHERE content_hash IS NULL AND id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size),
+        ).fetchall()
+        if not rows:
+            return updated
+        updated += conn.executemany(
+            "UPDATE OR IGNORE tickets SET content_hash = ? WHERE id = ?",
+            [(content_hash(texto, categoria), id_) for id_, texto, categoria in rows],
+        ).rowcount
+        last_id = rows[-1][0]
+
+
+def _migrate_content_hash(conn: sqlite3.Connection) -> None:
+    backfilled = backfill_content_hash(conn)
+    logger.info(f"content_hash preenchido em {backfilled} linhas")
+
+
+# Índices secundários (migração 2); o bulk import pode adiá-los para o fim da carga
+# Índices da migração 2: congelados (migração publicada); índices novos entram só
+# em migrações novas e em SECONDARY_INDEXES
+_MIGRATION_2_INDEXES = (
+    ("idx_tickets_data_criacao", "data_criacao"),
+    ("idx_tickets_categoria", "categoria"),
+    ("idx_tickets_cliente_id", "cliente_id"),
+)
+# Todos os índices secundários (removidos/recriados por `deferred_indexes`)
+SECONDARY_INDEXES = _MIGRATION_2_INDEXES + (
+    # min/max do grupo no trigger de remoção de category_stats (migração 7)
+    ("idx_tickets_categoria_data", "categoria, data_criacao"),
+)
+
+
+def _create_index_sql(name: str, column: str) -> str:
+    return f"CREATE INDEX IF NOT EXISTS {name} ON tickets({column})"
+
+
+# Estatísticas por categoria/mês materializadas (mantidas por triggers)
+CATEGORY_STATS_VERSION = 5
+_MES_SQL = "COALESCE(substr({row}.data_criacao, 1, 7), 'sem_data')"
+
+CATEGORY_STATS_LIVE_SQL = f"""
+SELECT
+    categoria,
+    {_MES_SQL.format(row="tickets")} AS mes,
+    COUNT(*) AS total,
+    SUM(LENGTH(texto)) AS soma_tamanho_texto,
+    MIN(data_criacao) AS primeiro_ticket,
+    MAX(data_criacao) AS ultimo_ticket
+FROM tickets
+GROUP BY categoria, mes
+"""
+
+
+def _stats_add_sql(row: str) -> str:
+    return f"""
+    INSERT INTO category_stats (categoria, mes, total, soma_tamanho_texto, primeiro_ticket, ultimo_ticket)
+    VALUES ({row}.categoria, {_MES_SQL.format(row=row)}, 1, LENGTH({row}.texto),
+            {row}.data_criacao, {row}.data_criacao)
+    ON CONFLICT (categoria, mes) DO UPDATE SET
+        total = total + 1,
+        soma_tamanho_texto = soma_tamanho_texto + excluded.soma_tamanho_texto,
+        primeiro_ticket = COALESCE(MIN(primeiro_ticket, excluded.primeiro_ticket),
+                                   primeiro_ticket, excluded.primeiro_ticket),
+        ultimo_ticket = COALESCE(MAX(ultimo_ticket, excluded.ultimo_ticket),
+                                 ultimo_ticket, excluded.ultimo_ticket);
+    """
+
+
+def _stats_neighbor_sql(row: str, op: str, order: str) -> str:
+    # Vizinho mais próximo do extremo removido na mesma categoria: um seek no índice
+    # (categoria, data_criacao). As datas do mês formam um intervalo contíguo na
+    # ordenação, então se o vizinho não é do mesmo mês, o grupo não tem outra data.
+    return f"""(
+        SELECT d FROM (
+            SELECT t.data_criacao AS d FROM tickets t
+            WHERE t.categoria = {row}.categoria AND t.data_criacao {op} {row}.data_criacao
+            ORDER BY t.data_criacao {order} LIMIT 1
+        ) WHERE substr(d, 1, 7) = substr({row}.data_criacao, 1, 7)
+    )"""
+
+
+def _stats_remove_sql(row: str) -> str:
+    # Contagem/soma são decrementais; min/max só são recalculados quando a linha
+    # removida era o extremo (custo O(log n), não um scan da categoria)
+    group = f"categoria = {row}.categoria AND mes = {_MES_SQL.format(row=row)}"
+    return f"""
+    UPDATE category_stats SET
+        total = total - 1,
+        soma_tamanho_texto = soma_tamanho_texto - LENGTH({row}.texto),
+        primeiro_ticket = CASE WHEN {row}.data_criacao = primeiro_ticket
+            THEN {_stats_neighbor_sql(row, ">=", "ASC")}
+            ELSE primeiro_ticket END,
+        ultimo_ticket = CASE WHEN {row}.data_criacao = ultimo_ticket
+            THEN {_stats_neighbor_sql(row, "<=", "DESC")}
+            ELSE ultimo_ticket END
+    WHERE {group};
+    DELETE FROM category_stats WHERE {group} AND total <= 0;
+    """
+
+
+def has_category_stats(conn: sqlite3.Connection) -> bool:
+    """Banco já tem `category_stats` materializada (migração `CATEGORY_STATS_VERSION`)."""
+    return schema_version(conn) >= CATEGORY_STATS_VERSION
+
+
+def _stats_remove_triggers_sql() -> Tuple[str, ...]:
+    return (
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_category_stats_delete AFTER DELETE ON tickets
+        BEGIN {_stats_remove_sql("OLD")} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_category_stats_update
+        AFTER UPDATE OF texto, categoria, data_criacao ON tickets
+        BEGIN {_stats_remove_sql("OLD")} {_stats_add_sql("NEW")} END
+        """,
+    )
+
+
+def rebuild_category_stats(conn: sqlite3.Connection) -> None:
+    """Recalcula `category_stats` do zero (um GROUP BY completo)."""
+    conn.execute("DELETE FROM category_stats")
+    conn.execute(f"INSERT INTO category_stats {CATEGORY_STATS_LIVE_SQL}")
+
+
+def verify_category_stats(conn: sqlite3.Connection) -> List[Tuple]:
+    """Linhas divergentes entre o agregado materializado e o recalculado (vazio = ok)."""
+    columns = "categoria, mes, total, soma_tamanho_texto, primeiro_ticket, ultimo_ticket"
+    query = f"""
+    SELECT 'materializado' AS origem, * FROM (
+        SELECT {columns} FROM category_stats EXCEPT SELECT * FROM ({CATEGORY_STATS_LIVE_SQL})
+    )
+    UNION ALL
+    SELECT 'recalculado' AS origem, * FROM (
+        SELECT * FROM ({CATEGORY_STATS_LIVE_SQL}) EXCEPT SELECT {columns} FROM category_stats
+    )
+    """
+    return conn.execute(query).fetchall()
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "tabela tickets",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS tickets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                texto TEXT NOT NULL,
+                categoria TEXT NOT NULL,
+                origem TEXT NOT NULL,
+                data_criacao TEXT,
+                status TEXT,
+                prioridade TEXT,
+                cliente_id INTEGER
+            )
+            """,
+        ),
+    ),
+    Migration(
+        2,
+        "índices para filtros por data, GROUP BY categoria e cliente",
+        tuple(_create_index_sql(name, column) for name, column in _MIGRATION_2_INDEXES),
+    ),
+    Migration(
+        3,
+        "content_hash normalizado com índice único (dedup na ingestão)",
+        (
+            "ALTER TABLE tickets ADD COLUMN content_hash TEXT",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_content_hash ON tickets(content_hash)",
+        ),
+        apply=_migrate_content_hash,
+    ),
+    Migration(
+        4,
+        "controle de arquivos importados (retomada do bulk import)",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS import_files (
+                file_hash TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                read_rows INTEGER NOT NULL,
+                invalid_rows INTEGER NOT NULL,
+                inserted INTEGER NOT NULL,
+                duplicates INTEGER NOT NULL,
+                completed_at TEXT NOT NULL
+            )
+            """,
+        ),
+    ),
+    Migration(
+        CATEGORY_STATS_VERSION,
+        "estatísticas por categoria/mês materializadas (triggers)",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS category_stats (
+                categoria TEXT NOT NULL,
+                mes TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                soma_tamanho_texto INTEGER NOT NULL,
+                primeiro_ticket TEXT,
+                ultimo_ticket TEXT,
+                PRIMARY KEY (categoria, mes)
+            ) WITHOUT ROWID
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_category_stats_insert AFTER INSERT ON tickets
+            BEGIN {_stats_add_sql("NEW")} END
+            """,
+            *_stats_remove_triggers_sql(),
+        ),
+        apply=rebuild_category_stats,
+    ),
+    Migration(
+        6,
+        "respostas geradas para tickets (backlog offline)",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS ticket_replies (
+                ticket_id INTEGER PRIMARY KEY REFERENCES tickets(id) ON DELETE CASCADE,
+                categoria_prevista TEXT NOT NULL,
+                confidence REAL,
+                resposta TEXT NOT NULL,
+                resposta_origem TEXT NOT NULL,
+                model_version TEXT,
+                created_at TEXT NOT NULL
+            )
+            """,
+        ),
+    ),
+    Migration(
+        7,
+        "índice (categoria, data_criacao) para o min/max dos triggers de category_stats",
+        (
+            _create_index_sql("idx_tickets_categoria_data", "categoria, data_criacao"),
+            "DROP TRIGGER IF EXISTS trg_category_stats_delete",
+            "DROP TRIGGER IF EXISTS trg_category_stats_update",
+            *_stats_remove_triggers_sql(),
+        ),
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# Pragmas por perfil de uso.
+# - WAL: leitores não bloqueiam o escritor (e vice-versa)
+# - read: query_only + mmap/cache maiores
+# - write: synchronous=NORMAL (seguro com WAL)
+# - bulk: synchronous=OFF e cache grande para cargas em lote (reexecutáveis)
+_COMMON_PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+)
+_MODE_PRAGMAS = {
+    "read": (
+        "PRAGMA query_only = ON",
+        "PRAGMA cache_size = -65536",
+        "PRAGMA mmap_size = 268435456",
+    ),
+    "write": (
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -65536",
+    ),
+    "bulk": (
+        "PRAGMA synchronous = OFF",
+        "PRAGMA cache_size = -262144",
+        "PRAGMA wal_autocheckpoint = 10000",
+    ),
+}
+
+
+def connect(
+    db_path: Path = DEFAULT_DB_PATH,
+    mode: str = "read",
+    migrate: bool = False,
+) -> sqlite3.Connection:
+    """
+    Abre conexão com pragmas do perfil (`read`, `write` ou `bulk`).
+    `migrate=True` aplica migrações pendentes (não permitido em `read`).
+    """
+    if mode not in _MODE_PRAGMAS:
+        raise ValueError(f"Modo inválido: '{mode}'. Use: {sorted(_MODE_PRAGMAS)}")
+    if migrate and mode == "read":
+        raise ValueError("Migrações exigem conexão de escrita (mode='write' ou 'bulk').")
+
+    conn = sqlite3.connect(db_path)
+    if mode != "read":
+        conn.execute("PRAGMA journal_mode = WAL")
+    for pragma in _COMMON_PRAGMAS + _MODE_PRAGMAS[mode]:
+        conn.execute(pragma)
+    register_functions(conn)
+    if migrate:
+        apply_migrations(conn)
+    return conn
+
+
+@contextmanager
+def connection(
+    db_path: Path = DEFAULT_DB_PATH,
+    mode: str = "read",
+    migrate: bool = False,
+) -> Iterator[sqlite3.Connection]:
+    """Context manager: commit ao final (se houver transação) e fecha a conexão."""
+    conn = connect(db_path, mode=mode, migrate=migrate)
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    finally:
+        conn.close()
+
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    """
+    Registra `norm_text`/`norm_categoria` (determinísticas). Usam `str.strip`/`str.lower`
+    do Python para bater exatamente com a limpeza em pandas (TRIM/LOWER do SQLite
+    só tratam espaço e ASCII).
+    """
+    conn.create_function("norm_text", 1, _norm_text, deterministic=True)
+    conn.create_function("norm_categoria", 1, _norm_categoria, deterministic=True)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def apply_migrations(
+    conn: sqlite3.Connection,
+    migrations: Sequence[Migration] = MIGRATIONS,
+) -> int:
+    """Aplica migrações pendentes, cada uma em sua transação. Retorna a versão final."""
+    if conn.in_transaction:
+        conn.commit()
+
+    previous_isolation = conn.isolation_level
+    conn.isolation_level = None  # controle explícito de transação (DDL incluso)
+    try:
+        current = schema_version(conn)
+        for migration in migrations:
+            if migration.version <= current:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for statement in migration.statements:
+                    conn.execute(statement)
+                if migration.apply is not None:
+                    migration.apply(conn)
+                conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            logger.info(f"Migração {migration.version} aplicada: {migration.description}")
+            current = migration.version
+        return current
+    finally:
+        conn.isolation_level = previous_isolation
+
+
+def ensure_schema(db_path: Path = DEFAULT_DB_PATH) -> int:
+    """Aplica migrações pendentes só se necessário (abre escrita apenas nesse caso)."""
+    with connection(db_path, mode="read") as conn:
+        current = schema_version(conn)
+    if current >= LATEST_VERSION:
+        return current
+    try:
+        with connection(db_path, mode="write", migrate=True) as conn:
+            return schema_version(conn)
+    except sqlite3.OperationalError as e:
+        # Banco somente leitura (ex.: réplica): segue sem índices novos
+        logger.warning(f"Não foi possível migrar '{db_path}': {e}")
+        return current
+
+
+def reset_tickets(conn: sqlite3.Connection) -> None:
+    """Remove tickets (e tabelas derivadas) e recria o schema completo."""
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("DROP TABLE IF EXISTS tickets")
+    conn.execute("DROP TABLE IF EXISTS import_files")
+    conn.execute("DROP TABLE IF EXISTS category_stats")
+    conn.execute("DROP TABLE IF EXISTS ticket_replies")
+    conn.execute("PRAGMA user_version = 0")
+    apply_migrations(conn)
+
+
+@contextmanager
+def deferred_indexes(conn: sqlite3.Connection) -> Iterator[None]:
+    """
+    Remove os índices secundários durante uma carga em lote e os recria ao final
+    (uma ordenação por índice em vez de manutenção linha a linha). O índice único
+    de `content_hash` continua ativo: o dedup na inserção depende dele.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    for name, _ in SECONDARY_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
+    try:
+        yield
+    finally:
+        if conn.in_transaction:
+            conn.commit()
+        for name, column in SECONDARY_INDEXES:
+            conn.execute(_create_index_sql(name, column))
+        conn.commit()
+
+
+def explain_query_plan(
+    conn: sqlite3.Connection,
+    query: str,
+    params: Sequence = (),
+) -> List[str]:
+    """Plano de execução (coluna `detail` do EXPLAIN QUERY PLAN)."""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", list(params)).fetchall()
+    return [str(row[-1]) for row in rows]
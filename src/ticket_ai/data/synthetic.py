@@ -0,0 +1,135 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SOURCE_CSV = Path("data/tickets_sinteticos.csv")
+
+COLUMNS = [
+    "texto",
+    "categoria",
+    "origem",
+    "data_criacao",
+    "status",
+    "prioridade",
+    "cliente_id",
+]
+
+
+class SyntheticTicketGenerator:
+    """
+    Gera tickets sintéticos em qualquer escala a partir de um CSV de referência.
+
+    Preserva (empiricamente) a distribuição de categorias, o tamanho dos textos
+    (em palavras, por categoria), a frequência de palavras por categoria e as
+    distribuições de origem/status/prioridade/cliente_id/data_criacao.
+    `novel_token_rate` injeta tokens inéditos para simular o crescimento do
+    vocabulário com o volume (lei de Heaps).
+    """
+
+    def __init__(self, df: pd.DataFrame, seed: int = 42, novel_token_rate: float = 0.01):
+        missing = set(COLUMNS) - set(df.columns)
+        if missing:
+            raise ValueError(f"Colunas obrigatórias ausentes na referência: {sorted(missing)}")
+
+        self.rng = np.random.default_rng(seed)
+        self.novel_token_rate = novel_token_rate
+
+        df = df.dropna(subset=["texto", "categoria"])
+        categorias = df["categoria"].astype(str).str.strip().str.lower()
+        palavras = df["texto"].astype(str).str.split()
+
+        counts = categorias.value_counts()
+        self.categories = counts.index.to_numpy()
+        self.category_probs = (counts / counts.sum()).to_numpy()
+
+        self.vocab: Dict[str, np.ndarray] = {}
+        self.vocab_probs: Dict[str, np.ndarray] = {}
+        self.lengths: Dict[str, np.ndarray] = {}
+        for cat in self.categories:
+            tokens = palavras[categorias == cat]
+            freq = Counter(tok for row in tokens for tok in row)
+            words, n = zip(*freq.items())
+            n = np.asarray(n, dtype=float)
+            self.vocab[cat] = np.asarray(words, dtype=object)
+            self.vocab_probs[cat] = n / n.sum()
+            self.lengths[cat] = tokens.str.len().clip(lower=1).to_numpy()
+
+        self._meta_dists = {}
+        for col in ("origem", "status", "prioridade"):
+            vc = df[col].astype(str).value_counts(normalize=True)
+            self._meta_dists[col] = (vc.index.to_numpy(), vc.to_numpy())
+
+        self.clientes = df["cliente_id"].dropna().astype(int).unique()
+        datas = pd.to_datetime(df["data_criacao"], errors="coerce").dropna()
+        self.date_min = datas.min()
+        self.date_max = datas.max()
+
+    @classmethod
+    def from_csv(cls, path: Path = DEFAULT_SOURCE_CSV, **kwargs) -> "SyntheticTicketGenerator":
+        df = pd.read_csv(path, delimiter=";", encoding="utf-8")
+        return cls(df, **kwargs)
+
+    def _texts(self, cat: str, n: int) -> list:
+        lengths = self.rng.choice(self.lengths[cat], size=n)
+        total = int(lengths.sum())
+        words = self.rng.choice(self.vocab[cat], size=total, p=self.vocab_probs[cat])
+
+        if self.novel_token_rate > 0:
+            novel = self.rng.random(total) < self.novel_token_rate
+            n_novel = int(novel.sum())
+            if n_novel:
+                ids = self.rng.integers(0, 36**6, size=n_novel)
+                words[novel] = [np.base_repr(i, 36).lower() for i in ids]
+
+        bounds = np.cumsum(lengths)[:-1]
+        return [" ".join(row) for row in np.split(words, bounds)]
+
+    def generate(self, n_rows: int, date_min=None, date_max=None) -> pd.DataFrame:
+        """Gera `n_rows` tickets (ordenados por data_criacao, como num export real)."""
+        cats = self.rng.choice(self.categories, size=n_rows, p=self.category_probs)
+        textos = np.empty(n_rows, dtype=object)
+        for cat in self.categories:
+            idx = np.flatnonzero(cats == cat)
+            if len(idx):
+                textos[idx] = self._texts(cat, len(idx))
+
+        date_min = pd.Timestamp(date_min) if date_min is not None else self.date_min
+        date_max = pd.Timestamp(date_max) if date_max is not None else self.date_max
+        span = max(int((date_max - date_min).total_seconds()), 1)
+        offsets = np.sort(self.rng.integers(0, span, size=n_rows))
+        datas = (date_min + pd.to_timedelta(offsets, unit="s")).strftime("%Y-%m-%d %H:%M:%S")
+
+        df = pd.DataFrame({
+            "texto": textos,
+            "categoria": cats,
+            "data_criacao": datas,
+            "cliente_id": self.rng.choice(self.clientes, size=n_rows),
+        })
+        for col, (values, probs) in self._meta_dists.items():
+            df[col] = self.rng.choice(values, size=n_rows, p=probs)
+        return df[COLUMNS]
+
+    def iter_chunks(self, n_rows: int, chunk_size: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Gera em chunks (memória limitada para escalas grandes). Datas são por chunk."""
+        span = self.date_max - self.date_min
+        n_chunks = max(1, -(-n_rows // chunk_size))
+        for i in range(n_chunks):
+            n = min(chunk_size, n_rows - i * chunk_size)
+            start = self.date_min + span * (i / n_chunks)
+            end = self.date_min + span * ((i + 1) / n_chunks)
+            yield self.generate(n, date_min=start, date_max=end)
+
+
+def scale_reference(
+    factor: float,
+    source: Path = DEFAULT_SOURCE_CSV,
+    seed: int = 42,
+    generator: Optional[SyntheticTicketGenerator] = None,
+) -> pd.DataFrame:
+    """Atalho: gera `factor` × o volume do CSV de referência."""
+    generator = generator or SyntheticTicketGenerator.from_csv(source, seed=seed)
+    n_ref = sum(len(v) for v in generator.lengths.values())
+    return generator.generate(int(n_ref * factor))
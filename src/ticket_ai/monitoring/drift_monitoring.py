@@ -1,6 +1,16 @@
+import os
 import pandas as pd
 import numpy as np
-from typing import Dict
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from ticket_ai.data.frame import TicketData
+from ticket_ai.monitoring.reference_profile import DEFAULT_PROFILE_PATH, ReferenceProfile
+from ticket_ai.monitoring.sketches import DriftSketch
+
+DEFAULT_REFERENCE_PATH = Path(os.getenv("TICKET_AI_REFERENCE_PATH", "models/reference_data.parquet"))
+PSI_ALERT_THRESHOLD = 0.2  # regra de bolso: acima disso, mudança relevante
 
 
 def _psi(expected: pd.Series, actual: pd.Series, eps: float = 1e-8) -> float:
@@ -24,9 +34,41 @@ def _psi(expected: pd.Series, actual: pd.Series, eps: float = 1e-8) -> float:
     return float(((actual - expected) * np.log(actual / expected)).sum())
 
 
+def compare_sketches(ref: DriftSketch, cur: DriftSketch, top_k: int = 20) -> Dict:
+    """
+    Mesmas métricas de `compare_baseline_vs_current` (mais PSI de tamanho de texto,
+    quantis de confiança e tokens novos no topo) a partir de sketches: custo
+    O(categorias + faixas + top_k), sem tocar nas linhas.
+    """
+    ref_dist = pd.Series(ref.category_counts, dtype=float)
+    cur_dist = pd.Series(cur.category_counts, dtype=float)
+    ref_len, cur_len = ref.avg_text_len, cur.avg_text_len
+
+    ref_conf, cur_conf = ref.confidence_quantiles(), cur.confidence_quantiles()
+    psi_confidence = None
+    if ref_conf is not None and cur_conf is not None:
+        psi_confidence = _psi(pd.Series(ref.confidence_hist), pd.Series(cur.confidence_hist))
+
+    return {
+        "ref_rows": int(ref.rows),
+        "cur_rows": int(cur.rows),
+        "ref_avg_text_len": float(ref_len),
+        "cur_avg_text_len": float(cur_len),
+        "avg_text_len_delta_pct": float(((cur_len - ref_len) / (ref_len + 1e-8)) * 100),
+        "ref_category_dist": {k: int(v) for k, v in ref.category_counts.items()},
+        "cur_category_dist": {k: int(v) for k, v in cur.category_counts.items()},
+        "psi_category": _psi(ref_dist, cur_dist),
+        "psi_text_len": _psi(pd.Series(ref.length_hist), pd.Series(cur.length_hist)),
+        "ref_confidence_quantiles": ref_conf,
+        "cur_confidence_quantiles": cur_conf,
+        "psi_confidence": psi_confidence,
+        "new_top_tokens": [t for t in cur.top(top_k) if t not in ref.token_counts],
+    }
+
+
 def compare_baseline_vs_current(
-    df_ref: pd.DataFrame,
-    df_cur: pd.DataFrame,
+    df_ref: TicketData,
+    df_cur: TicketData,
     category_col: str = "categoria",
     text_col: str = "texto",
 ) -> Dict:
@@ -34,37 +76,79 @@ def compare_baseline_vs_current(
     Compara baseline vs atual em:
     - tamanho médio do texto
     - distribuição de categorias (com PSI)
+    Monta um `DriftSketch` de cada lado (sem copiar os DataFrames) e usa `compare_sketches`.
     """
-    ref = df_ref.copy()
-    cur = df_cur.copy()
+    ref = DriftSketch().update(df_ref, text_col=text_col, category_col=category_col)
+    cur = DriftSketch().update(df_cur, text_col=text_col, category_col=category_col)
+    return compare_sketches(ref, cur)
 
-    # normalização mínima
-    ref[text_col] = ref[text_col].fillna("").astype(str)
-    cur[text_col] = cur[text_col].fillna("").astype(str)
 
-    ref[category_col] = ref[category_col].fillna(
-        "").astype(str).str.strip().str.lower()
-    cur[category_col] = cur[category_col].fillna(
-        "").astype(str).str.strip().str.lower()
+def vocabulary_drift(ref_df: np.ndarray, cur_df: np.ndarray, eps: float = 1e-12) -> float:
+    """
+    Divergência de Jensen-Shannon (base 2, em [0, 1]) entre as distribuições de
+    frequência de documento por termo. Só o suporte (termos com DF > 0 em algum
+    lado) entra na conta.
+    """
+    support = np.flatnonzero((ref_df > 0) | (cur_df > 0))
+    if len(support) == 0 or ref_df.sum() == 0 or cur_df.sum() == 0:
+        return 0.0
+    p = ref_df[support] / ref_df.sum()
+    q = cur_df[support] / cur_df.sum()
+    m = (p + q) / 2
+    kl_p = np.sum(p * np.log2((p + eps) / (m + eps)))
+    kl_q = np.sum(q * np.log2((q + eps) / (m + eps)))
+    return float(0.5 * kl_p + 0.5 * kl_q)
 
-    # métricas simples
-    ref_len = ref[text_col].str.len()
-    cur_len = cur[text_col].str.len()
 
-    ref_dist = ref[category_col].value_counts()
-    cur_dist = cur[category_col].value_counts()
+def compare_profiles(
+    ref: ReferenceProfile,
+    cur: ReferenceProfile,
+    feature_names: Optional[Sequence[str]] = None,
+    top_k: int = 10,
+) -> Dict:
+    """
+    `compare_sketches` + drift de vocabulário: JS das frequências de documento
+    sobre o vocabulário do TF-IDF, taxa de OOV e termos com maior variação de DF.
+    Custo O(vocabulário); nenhuma linha do treino é lida.
+    """
+    if ref.vocabulary_hash != cur.vocabulary_hash:
+        raise ValueError("Perfis com vocabulários diferentes (modelos distintos) não são comparáveis.")
 
-    psi = _psi(ref_dist, cur_dist)
+    result = compare_sketches(ref.sketch, cur.sketch)
+    ref_rate = ref.document_frequency / max(ref.sampled_rows, 1)
+    cur_rate = cur.document_frequency / max(cur.sampled_rows, 1)
+    delta = cur_rate - ref_rate
+    shifted = np.argsort(-np.abs(delta))[:top_k]
 
-    return {
-        "ref_rows": int(len(ref)),
-        "cur_rows": int(len(cur)),
-        "ref_avg_text_len": float(ref_len.mean()),
-        "cur_avg_text_len": float(cur_len.mean()),
-        "avg_text_len_delta_pct": float(
-            ((cur_len.mean() - ref_len.mean()) / (ref_len.mean() + 1e-8)) * 100
-        ),
-        "ref_category_dist": ref_dist.to_dict(),
-        "cur_category_dist": cur_dist.to_dict(),
-        "psi_category": psi,
-    }
+    result.update({
+        "vocab_js_divergence": vocabulary_drift(ref.document_frequency, cur.document_frequency),
+        "ref_oov_rate": ref.oov_rate,
+        "cur_oov_rate": cur.oov_rate,
+        "oov_rate_delta": cur.oov_rate - ref.oov_rate,
+        "top_vocab_shifts": [
+            {
+                "term": str(feature_names[i]) if feature_names is not None else int(i),
+                "ref_doc_rate": float(ref_rate[i]),
+                "cur_doc_rate": float(cur_rate[i]),
+            }
+            for i in shifted if delta[i] != 0
+        ],
+    })
+    return result
+
+
+def load_baseline_sketch(
+    path: Path = DEFAULT_REFERENCE_PATH,
+    chunk_rows: int = 100_000,
+    profile_path: Path = DEFAULT_PROFILE_PATH,
+) -> DriftSketch:
+    """
+    Sketch do baseline: do perfil compacto gerado no treino (KBs), se existir;
+    senão, do Parquet de referência (lido uma vez, em lotes).
+    """
+    if Path(profile_path).exists():
+        return ReferenceProfile.load(profile_path).sketch
+    sketch = DriftSketch()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=["texto", "categoria"]):
+        sketch.update(batch.to_pandas())
+    return sketch
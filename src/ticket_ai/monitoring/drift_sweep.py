@@ -0,0 +1,188 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ticket_ai.data import storage
+from ticket_ai.data.loader import MIN_TEXT_LENGTH
+from ticket_ai.monitoring.drift_monitoring import PSI_ALERT_THRESHOLD
+from ticket_ai.monitoring.sketches import DriftSketch
+
+# Chave da janela a partir de data_criacao ("YYYY-MM-DD HH:MM:SS"); semana começa na segunda
+GRANULARITIES = {
+    "day": "substr(data_criacao, 1, 10)",
+    "week": "date(data_criacao, 'weekday 0', '-6 days')",
+    "month": "substr(data_criacao, 1, 7)",
+}
+DEFAULT_WORKERS = int(os.getenv("TICKET_AI_SWEEP_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# TRIM do SQLite só remove espaço por padrão; aproxima o str.strip() do loader
+_WHITESPACE_SQL = "' ' || char(9, 10, 11, 12, 13)"
+
+_SWEEP_SQL = """
+SELECT janela, categoria, unico, n >= ? AS longo, COUNT(*) AS raw_rows, SUM(n) AS soma_tamanho
+FROM (
+    SELECT {key} AS janela, categoria, content_hash IS NOT NULL AS unico,
+           LENGTH(TRIM(texto, {ws})) AS n
+    FROM tickets
+    WHERE 1=1{where}
+)
+GROUP BY janela, categoria, unico, longo
+"""
+
+
+def _format_dt(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _split_range(
+    db_path: Path,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    workers: int,
+) -> List[Tuple[str, str, bool]]:
+    """Fatias [início, fim) de data_criacao, uma por worker (a última inclui o fim)."""
+    with storage.connection(db_path, mode="read") as conn:
+        lo, hi = conn.execute("SELECT MIN(data_criacao), MAX(data_criacao) FROM tickets").fetchone()
+    if lo is None:
+        return []
+    start = max(pd.Timestamp(lo), pd.Timestamp(date_from)) if date_from else pd.Timestamp(lo)
+    end = min(pd.Timestamp(hi), pd.Timestamp(date_to)) if date_to else pd.Timestamp(hi)
+    if start > end:
+        return []
+    step = (end - start) / workers
+    edges = [start + step * i for i in range(workers)] + [end]
+    return [
+        (_format_dt(a.floor("s")), _format_dt(b.floor("s") if i < workers - 1 else b), i == workers - 1)
+        for i, (a, b) in enumerate(zip(edges[:-1], edges[1:]))
+    ]
+
+
+def aggregate_windows(
+    db_path: Path = storage.DEFAULT_DB_PATH,
+    granularity: str = "month",
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    workers: int = DEFAULT_WORKERS,
+) -> pd.DataFrame:
+    """
+    Um GROUP BY por (janela, categoria) sobre `tickets`, sem trazer linhas ao Python.
+    Linhas retidas seguem a limpeza do loader: texto aparado com ≥ MIN_TEXT_LENGTH
+    caracteres e primeira ocorrência de texto+categoria (`content_hash` não nulo,
+    dedup global em ordem de id; o loader deduplica só dentro do recorte pedido).
+
+    Com `workers > 1` o intervalo de datas é fatiado e cada fatia roda numa conexão
+    de leitura própria (o sqlite3 libera o GIL durante a query); contagens e somas
+    das fatias são combinadas no pandas. Linhas sem data_criacao ficam de fora.
+
+    Retorna colunas: janela, categoria, raw_rows, rows, soma_tamanho.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularidade inválida: '{granularity}'. Use: {sorted(GRANULARITIES)}")
+    storage.ensure_schema(db_path)  # content_hash preenchido pela migração
+
+    def run(where: str, params: List[str]) -> pd.DataFrame:
+        query = _SWEEP_SQL.format(key=GRANULARITIES[granularity], ws=_WHITESPACE_SQL, where=where)
+        with storage.connection(db_path, mode="read") as conn:
+            return pd.read_sql_query(query, conn, params=[MIN_TEXT_LENGTH] + params)
+
+    if workers <= 1:
+        where, params = "", []
+        if date_from:
+            where += " AND data_criacao >= ?"
+            params.append(_format_dt(date_from))
+        if date_to:
+            where += " AND data_criacao <= ?"
+            params.append(_format_dt(date_to))
+        parts = [run(where, params)]
+    else:
+        slices = _split_range(db_path, date_from, date_to, workers)
+        with ThreadPoolExecutor(max_workers=max(len(slices), 1)) as pool:
+            parts = list(pool.map(
+                lambda s: run(f" AND data_criacao >= ? AND data_criacao {'<=' if s[2] else '<'} ?",
+                              [s[0], s[1]]),
+                slices,
+            ))
+
+    agg = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+        columns=["janela", "categoria", "unico", "longo", "raw_rows", "soma_tamanho"])
+    agg = agg.dropna(subset=["janela"])
+    # Normalização da categoria fica no pandas: poucas combinações distintas
+    agg["categoria"] = agg["categoria"].astype(str).str.strip().str.lower()
+    kept = agg["unico"].astype(bool) & agg["longo"].astype(bool)
+    agg["rows"] = np.where(kept, agg["raw_rows"], 0)
+    agg["soma_tamanho"] = np.where(kept, agg["soma_tamanho"], 0)
+    return (
+        agg.groupby(["janela", "categoria"], as_index=False)[["raw_rows", "rows", "soma_tamanho"]]
+        .sum()
+        .astype({"raw_rows": "int64", "rows": "int64", "soma_tamanho": "int64"})
+    )
+
+
+def _psi_rows(expected: pd.DataFrame, actual: pd.DataFrame, eps: float = 1e-8) -> np.ndarray:
+    """`_psi` linha a linha (janela × categoria), vetorizado."""
+    expected = expected.div(expected.sum(axis=1) + eps, axis=0) + eps
+    actual = actual.div(actual.sum(axis=1) + eps, axis=0) + eps
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=1).to_numpy()
+
+
+def drift_sweep(
+    db_path: Path = storage.DEFAULT_DB_PATH,
+    reference: Optional[DriftSketch] = None,
+    granularity: str = "month",
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    workers: int = DEFAULT_WORKERS,
+    psi_threshold: float = PSI_ALERT_THRESHOLD,
+) -> pd.DataFrame:
+    """
+    Série temporal de drift: uma linha por janela com volume bruto/retido, retenção,
+    tamanho médio (e delta vs referência), PSI de categorias vs referência e vs a
+    janela anterior, e `alerta` quando o PSI vs referência passa de `psi_threshold`.
+
+    `reference`: sketch do baseline (ex.: `load_baseline_sketch()`); sem ele, a
+    referência é o próprio período varrido (todas as janelas somadas).
+    """
+    agg = aggregate_windows(db_path, granularity, date_from=date_from, date_to=date_to, workers=workers)
+    counts = agg.pivot_table(index="janela", columns="categoria", values="rows",
+                             aggfunc="sum", fill_value=0).sort_index()
+    totals = agg.groupby("janela")[["raw_rows", "rows", "soma_tamanho"]].sum().reindex(counts.index)
+
+    if reference is not None:
+        ref_counts = pd.Series(reference.category_counts, dtype=float)
+        ref_avg_len = reference.avg_text_len
+    else:
+        ref_counts = counts.sum(axis=0).astype(float)
+        ref_avg_len = totals["soma_tamanho"].sum() / max(totals["rows"].sum(), 1)
+
+    columns = counts.columns.union(ref_counts.index)
+    counts = counts.reindex(columns=columns, fill_value=0).astype(float)
+    expected = pd.DataFrame(
+        np.tile(ref_counts.reindex(columns, fill_value=0.0).to_numpy(), (len(counts), 1)),
+        index=counts.index, columns=columns)
+
+    rows = totals["rows"].to_numpy()
+    avg_len = np.divide(totals["soma_tamanho"].to_numpy(), rows,
+                        out=np.zeros(len(rows)), where=rows > 0)
+    psi_prev = _psi_rows(counts.shift(1).fillna(0.0), counts) if len(counts) else np.array([])
+    result = pd.DataFrame({
+        "janela": counts.index,
+        "raw_rows": totals["raw_rows"].to_numpy(),
+        "rows": rows,
+        "retention_pct": np.divide(rows * 100.0, totals["raw_rows"].to_numpy(),
+                                   out=np.zeros(len(rows)), where=totals["raw_rows"].to_numpy() > 0),
+        "avg_text_len": avg_len,
+        "avg_text_len_delta_pct": (avg_len - ref_avg_len) / (ref_avg_len + 1e-8) * 100,
+        "psi_category": _psi_rows(expected, counts) if len(counts) else np.array([]),
+        "psi_prev": psi_prev,
+    })
+    if len(result):
+        result.loc[0, "psi_prev"] = np.nan  # primeira janela não tem anterior
+    result["alerta"] = result["psi_category"] > psi_threshold
+    return result
@@ -0,0 +1,105 @@
+import hashlib
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+import joblib
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from ticket_ai.data.frame import TicketData, text_and_labels
+from ticket_ai.monitoring.sketches import DriftSketch
+
+DEFAULT_PROFILE_PATH = Path(
+    os.getenv("TICKET_AI_REFERENCE_PROFILE_PATH", "models/reference_profile.joblib"))
+PROFILE_VERSION = 1
+DEFAULT_SAMPLE_ROWS = 50_000
+OOV_SAMPLE_ROWS = 5_000  # taxa sobre centenas de milhares de n-gramas: amostra menor basta
+
+
+def vocabulary_hash(model: Pipeline) -> str:
+    """Identifica o vocabulário do TF-IDF: perfis só são comparáveis com o mesmo vocabulário."""
+    names = model.named_steps["tfidf"].get_feature_names_out()
+    return hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()
+
+
+def oov_rate(texts: Iterable[str], model: Pipeline) -> float:
+    """Fração de termos (n-gramas do analisador do TF-IDF) fora do vocabulário ajustado."""
+    tfidf = model.named_steps["tfidf"]
+    analyzer, vocabulary = tfidf.build_analyzer(), tfidf.vocabulary_
+    total = known = 0
+    for text in texts:
+        grams = analyzer(text)
+        total += len(grams)
+        known += sum(1 for g in grams if g in vocabulary)
+    return 1.0 - known / total if total else 0.0
+
+
+@dataclass
+class ReferenceProfile:
+    """
+    Perfil compacto (KBs) de um conjunto de tickets para drift, sem guardar linhas:
+    `DriftSketch` (categorias, histograma de tamanho, confiança prevista, top tokens),
+    frequência de documento por termo do vocabulário do TF-IDF e taxa de OOV.
+
+    Gerado no treino para o baseline; o mesmo construtor resume a janela atual.
+    Confiança e DF vêm de uma amostra (`sampled_rows`), OOV das primeiras
+    `OOV_SAMPLE_ROWS` dela; contagens e tamanhos, de todas as linhas. No baseline a confiança é medida no próprio
+    conjunto de treino (otimista).
+    """
+    rows: int
+    sampled_rows: int
+    sketch: DriftSketch
+    document_frequency: np.ndarray  # nº de documentos da amostra com cada termo
+    oov_rate: float
+    vocabulary_hash: str
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    version: int = PROFILE_VERSION
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: TicketData,
+        model: Pipeline,
+        sample_rows: int = DEFAULT_SAMPLE_ROWS,
+        seed: int = 42,
+        text_col: str = "texto",
+        category_col: str = "categoria",
+    ) -> "ReferenceProfile":
+        sketch = DriftSketch().update(df, text_col=text_col, category_col=category_col)
+        sample = df if len(df) <= sample_rows else df.sample(n=sample_rows, random_state=seed)
+        texts, _ = text_and_labels(sample, text_col=text_col, category_col=category_col)
+
+        n_features = len(model.named_steps["tfidf"].vocabulary_)
+        document_frequency = np.zeros(n_features, dtype=np.int32)
+        if len(texts):
+            X = model.named_steps["tfidf"].transform(texts)
+            # CSR: cada (documento, termo) presente aparece uma vez em X.indices
+            document_frequency = np.bincount(X.indices, minlength=n_features).astype(np.int32)
+            sketch.add_confidences(model.named_steps["clf"].predict_proba(X).max(axis=1))
+
+        return cls(
+            rows=int(len(df)),
+            sampled_rows=int(len(sample)),
+            sketch=sketch,
+            document_frequency=document_frequency,
+            oov_rate=oov_rate(texts.iloc[:OOV_SAMPLE_ROWS], model),
+            vocabulary_hash=vocabulary_hash(model),
+        )
+
+    def save(self, path: Path = DEFAULT_PROFILE_PATH) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        joblib.dump(self, tmp, compress=3)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_PROFILE_PATH) -> "ReferenceProfile":
+        profile = joblib.load(path)
+        if not isinstance(profile, cls) or profile.version != PROFILE_VERSION:
+            raise ValueError(f"Perfil de referência incompatível em '{path}'. Rode o treino novamente.")
+        return profile
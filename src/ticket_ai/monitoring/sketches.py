@@ -0,0 +1,197 @@
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ticket_ai.data.frame import TicketData, TicketFrame, text_and_labels
+
+# Faixas fixas: sketches de origens diferentes (baseline, janelas, processos) são combináveis
+LENGTH_BINS = np.array([0, 20, 40, 60, 80, 100, 150, 200, 300, 500, 1000, np.inf])
+CONFIDENCE_BINS = 20
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"  # mesmo padrão do vetorizador online
+
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+
+class DriftSketch:
+    """
+    Resumo combinável (`merge`) de um conjunto de tickets/predições, de tamanho
+    independente do volume: contagem por categoria, histograma de tamanho de texto,
+    histograma de confiança (quantis aproximados) e tokens mais frequentes
+    (contador limitado, heavy hitters aproximados).
+    """
+
+    def __init__(self, top_tokens: int = 500):
+        self.top_tokens = top_tokens
+        self.rows = 0
+        self.text_len_sum = 0
+        self.category_counts: Counter = Counter()
+        self.length_hist = np.zeros(len(LENGTH_BINS) - 1, dtype=np.int64)
+        self.confidence_hist = np.zeros(CONFIDENCE_BINS, dtype=np.int64)
+        self.token_counts: Counter = Counter()
+
+    def add(self, texto: str, categoria: str, confidence: Optional[float] = None) -> None:
+        """Uma predição (caminho quente da API: O(tamanho do texto))."""
+        size = len(texto)
+        self.rows += 1
+        self.text_len_sum += size
+        self.category_counts[str(categoria).strip().lower()] += 1
+        self.length_hist[np.searchsorted(LENGTH_BINS, size, side="right") - 1] += 1
+        if confidence is not None:
+            self.confidence_hist[_confidence_bin(confidence)] += 1
+        self.token_counts.update(_TOKEN_RE.findall(texto.lower()))
+        self._prune_tokens()
+
+    def update(
+        self,
+        df: TicketData,
+        text_col: str = "texto",
+        category_col: str = "categoria",
+        confidence_col: Optional[str] = None,
+    ) -> "DriftSketch":
+        """
+        Versão vetorizada de `add` para um DataFrame/chunk ou `TicketFrame` (este
+        sem renormalizar). Não copia o DataFrame; tokens são contados texto a
+        texto, sem materializar a lista explodida de todos os tokens.
+        """
+        if df.empty:
+            return self
+        texto, categoria = text_and_labels(df, text_col=text_col, category_col=category_col)
+        sizes = texto.str.len().to_numpy()
+        self.rows += len(df)
+        self.text_len_sum += int(sizes.sum())
+        counts = categoria.value_counts()
+        self.category_counts.update(counts[counts > 0].to_dict())
+        self.length_hist += np.histogram(sizes, bins=LENGTH_BINS)[0]
+        if confidence_col is not None:
+            values = df.df[confidence_col] if isinstance(df, TicketFrame) else df[confidence_col]
+            self.add_confidences(pd.to_numeric(values, errors="coerce").dropna().to_numpy())
+        for text in texto.str.lower():
+            self.token_counts.update(_TOKEN_RE.findall(text))
+        self._prune_tokens()
+        return self
+
+    def add_confidences(self, confidences: np.ndarray) -> None:
+        self.confidence_hist += np.bincount(
+            _confidence_bin(confidences), minlength=CONFIDENCE_BINS).astype(np.int64)
+
+    def merge(self, other: "DriftSketch") -> "DriftSketch":
+        self.rows += other.rows
+        self.text_len_sum += other.text_len_sum
+        self.category_counts.update(other.category_counts)
+        self.length_hist += other.length_hist
+        self.confidence_hist += other.confidence_hist
+        self.token_counts.update(other.token_counts)
+        self._prune_tokens()
+        return self
+
+    @property
+    def avg_text_len(self) -> float:
+        return self.text_len_sum / self.rows if self.rows else 0.0
+
+    @property
+    def confidence_rows(self) -> int:
+        return int(self.confidence_hist.sum())
+
+    def confidence_quantiles(self, qs: Sequence[float] = (0.1, 0.5, 0.9)) -> Optional[Dict[str, float]]:
+        """Quantis aproximados (interpolação linear dentro da faixa do histograma)."""
+        total = self.confidence_rows
+        if total == 0:
+            return None
+        edges = np.linspace(0.0, 1.0, CONFIDENCE_BINS + 1)
+        cum = np.concatenate([[0], np.cumsum(self.confidence_hist)]) / total
+        return {f"p{int(q * 100)}": float(np.interp(q, cum, edges)) for q in qs}
+
+    def top(self, k: int = 20) -> Dict[str, int]:
+        return dict(self.token_counts.most_common(k))
+
+    def _prune_tokens(self) -> None:
+        # Mantém o contador limitado: poda para 2k quando passar de 4k entradas
+        if len(self.token_counts) > 4 * self.top_tokens:
+            self.token_counts = Counter(dict(self.token_counts.most_common(2 * self.top_tokens)))
+
+
+def _confidence_bin(confidence):
+    return np.clip((np.asarray(confidence) * CONFIDENCE_BINS).astype(int), 0, CONFIDENCE_BINS - 1)
+
+
+def parse_window(value: str) -> int:
+    """"15m", "1h", "24h", "7d" ou segundos → segundos."""
+    match = re.fullmatch(r"\s*(\d+)\s*([smhd]?)\s*", value)
+    if match is None:
+        raise ValueError(f"Janela inválida: '{value}' (use ex.: 15m, 1h, 24h).")
+    amount, unit = int(match.group(1)), match.group(2) or "s"
+    return amount * {"s": 1, "m": 60, "h": 3600, "d": 86400}[unit]
+
+
+class SlidingWindowSketches:
+    """
+    Janelas deslizantes de `DriftSketch`: cada predição entra no sketch do seu
+    bucket de tempo (`bucket_seconds`); uma janela é a fusão dos buckets que ela
+    cobre. Buckets mais antigos que a maior janela são descartados, então a
+    memória é O(buckets × tamanho do sketch), não O(predições). A fusão dos
+    buckets já fechados fica em cache por janela (e roda sem segurar o lock de
+    `observe`): cada consulta só soma o bucket aberto.
+    """
+
+    def __init__(
+        self,
+        windows: Sequence[str] = tuple(os.getenv("TICKET_AI_DRIFT_WINDOWS", "15m,1h,24h").split(",")),
+        bucket_seconds: int = int(os.getenv("TICKET_AI_DRIFT_BUCKET_SECONDS", "60")),
+        top_tokens: int = 500,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.windows = {w.strip(): parse_window(w) for w in windows}
+        self.bucket_seconds = bucket_seconds
+        self.top_tokens = top_tokens
+        self.clock = clock
+        self._retention = max(self.windows.values(), default=bucket_seconds)
+        self._buckets: Dict[int, DriftSketch] = {}
+        self._closed: Dict[int, Tuple[int, int, DriftSketch]] = {}  # janela → (1º, atual, fusão)
+        self._lock = threading.Lock()
+
+    def observe(self, texto: str, categoria: str, confidence: Optional[float] = None) -> None:
+        bucket = int(self.clock() // self.bucket_seconds)
+        with self._lock:
+            sketch = self._buckets.get(bucket)
+            if sketch is None:
+                sketch = self._buckets[bucket] = DriftSketch(top_tokens=self.top_tokens)
+                self._expire(bucket)
+            sketch.add(texto, categoria, confidence)
+
+    def window(self, window: str) -> DriftSketch:
+        """Sketch fundido dos buckets dentro da janela (ex.: "1h")."""
+        seconds = self.windows.get(window) or parse_window(window)
+        if seconds > self._retention:
+            raise ValueError(f"Janela '{window}' maior que a retenção ({self._retention}s).")
+        now = self.clock()
+        first = int((now - seconds) // self.bucket_seconds) + 1
+        current = int(now // self.bucket_seconds)
+        with self._lock:
+            cached = self._closed.get(seconds)
+            stale = cached is None or cached[:2] != (first, current)
+            if stale:
+                to_merge = [sketch for bucket, sketch in self._buckets.items() if first <= bucket < current]
+            # Só o bucket aberto é copiado com o lock (é o único que `observe` altera)
+            merged = DriftSketch(top_tokens=self.top_tokens)
+            if current in self._buckets:
+                merged.merge(self._buckets[current])
+        if stale:
+            # Fusão dos fechados fora do lock: `observe` não espera por ela
+            closed = DriftSketch(top_tokens=self.top_tokens)
+            for sketch in to_merge:
+                closed.merge(sketch)
+            cached = (first, current, closed)
+            with self._lock:
+                self._closed[seconds] = cached
+        return merged.merge(cached[2])
+
+    def _expire(self, current: int) -> None:
+        oldest = current - self._retention // self.bucket_seconds
+        for bucket in [b for b in self._buckets if b < oldest]:
+            del self._buckets[bucket]
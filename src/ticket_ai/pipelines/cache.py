@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+import sklearn
+from joblib import dump
+from sklearn.pipeline import Pipeline
+
+DEFAULT_STORE_DIR = Path(os.getenv("TICKET_AI_MODEL_STORE", "models/store"))
+
+MODEL_FILENAME = "ticket_clf.joblib"
+REFERENCE_FILENAME = "reference_data.parquet"
+PROFILE_FILENAME = "reference_profile.joblib"
+METADATA_FILENAME = "metadata.json"
+
+
+def fingerprint_dataframe(df: pd.DataFrame, chunk_size: int = 50_000) -> str:
+    """
+    Fingerprint do conteúdo (hash incremental sobre as linhas, em chunks).
+    Sensível a colunas, valores e ordem das linhas.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+    h.update(str(len(df)).encode("utf-8"))
+
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        # uint64 por linha (vetorizado); alimenta o sha256 chunk a chunk
+        row_hashes = pd.util.hash_pandas_object(chunk, index=False)
+        h.update(row_hashes.to_numpy().tobytes())
+
+    return h.hexdigest()
+
+
+def fingerprint_config(pipeline: Pipeline, **extra) -> str:
+    """
+    Fingerprint da configuração de treino: hiperparâmetros do pipeline,
+    versão do sklearn e parâmetros extras do treinador (split, CV, etc.).
+    """
+    params = {
+        k: repr(v)
+        for k, v in pipeline.get_params(deep=True).items()
+        if k != "steps" and not hasattr(v, "get_params")
+    }
+    payload = {
+        "steps": [(name, type(step).__name__) for name, step in pipeline.steps],
+        "params": params,
+        "sklearn": sklearn.__version__,
+        "extra": {k: repr(v) for k, v in extra.items()},
+    }
+    blob = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+class ModelStore:
+    """Store local de artefatos de treino, indexado por (dados, config)."""
+
+    def __init__(self, root: Path = DEFAULT_STORE_DIR):
+        self.root = Path(root)
+
+    def _entry_dir(self, data_fp: str, config_fp: str) -> Path:
+        return self.root / f"{data_fp[:16]}-{config_fp[:16]}"
+
+    def get(self, data_fp: str, config_fp: str) -> Optional[Path]:
+        """
+        Retorna o diretório do artefato se existir um treino com os mesmos fingerprints
+        e todos os arquivos que `publish` copia (modelo e baseline: perfil ou, em
+        entradas antigas, o Parquet de referência) estiverem presentes.
+        """
+        entry = self._entry_dir(data_fp, config_fp)
+        meta_path = entry / METADATA_FILENAME
+        if not (meta_path.exists() and (entry / MODEL_FILENAME).exists()):
+            return None
+        if not ((entry / PROFILE_FILENAME).exists() or (entry / REFERENCE_FILENAME).exists()):
+            return None
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("data_fingerprint") != data_fp or meta.get("config_fingerprint") != config_fp:
+            return None
+        return entry
+
+    def put(
+        self,
+        data_fp: str,
+        config_fp: str,
+        model: object,
+        df_reference: pd.DataFrame,
+        metadata: Optional[Dict] = None,
+        profile: Optional[object] = None,
+    ) -> Path:
+        """
+        Grava modelo + baseline + metadados (escrita em dir temporário e rename).
+        `profile`: perfil compacto de referência para drift (objeto com `save(path)`);
+        com ele, o baseline é só o perfil. Sem perfil, `df_reference` vai para o
+        Parquet de referência (fallback do drift).
+        """
+        entry = self._entry_dir(data_fp, config_fp)
+        tmp = entry.with_name(entry.name + ".tmp")
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+
+        dump(model, tmp / MODEL_FILENAME)
+        if profile is not None:
+            profile.save(tmp / PROFILE_FILENAME)
+        else:
+            df_reference.to_parquet(tmp / REFERENCE_FILENAME, index=False)
+
+        meta = {
+            **(metadata or {}),
+            "data_fingerprint": data_fp,
+            "config_fingerprint": config_fp,
+            "rows": int(len(df_reference)),
+            "sklearn_version": sklearn.__version__,
+            "created_at_utc": datetime.now(timezone.utc).isoformat(),
+        }
+        (tmp / METADATA_FILENAME).write_text(
+            json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+
+        if entry.exists():
+            shutil.rmtree(entry)
+        os.replace(tmp, entry)
+        return entry
+
+    @staticmethod
+    def publish(entry: Path, model_dir: Path) -> Dict[str, Path]:
+        """
+        Copia os artefatos do store para os caminhos consumidos pela API/drift.
+        Não copia se o metadado publicado já aponta para os mesmos fingerprints.
+        Publica um único baseline: o perfil ou, em entradas antigas (sem perfil), o
+        Parquet de referência; o outro, se publicado antes (de outro modelo), é
+        removido para o drift não parear este modelo com o baseline de outro.
+        """
+        model_dir = Path(model_dir)
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        paths = {
+            "model": model_dir / MODEL_FILENAME,
+            "metadata": model_dir / "model_metadata.json",
+        }
+        artifacts = [("model", MODEL_FILENAME)]
+        if (entry / PROFILE_FILENAME).exists():
+            baseline, stale = ("profile", PROFILE_FILENAME), REFERENCE_FILENAME
+        else:
+            baseline, stale = ("reference", REFERENCE_FILENAME), PROFILE_FILENAME
+        paths[baseline[0]] = model_dir / baseline[1]
+        artifacts.append(baseline)
+        (model_dir / stale).unlink(missing_ok=True)
+
+        entry_meta = json.loads((entry / METADATA_FILENAME).read_text(encoding="utf-8"))
+        if paths["metadata"].exists() and all(paths[key].exists() for key, _ in artifacts):
+            current = json.loads(paths["metadata"].read_text(encoding="utf-8"))
+            if (
+                current.get("data_fingerprint") == entry_meta["data_fingerprint"]
+                and current.get("config_fingerprint") == entry_meta["config_fingerprint"]
+            ):
+                return paths
+
+        for key, name in artifacts:
+            tmp = paths[key].with_name(paths[key].name + ".tmp")
+            shutil.copy2(entry / name, tmp)
+            os.replace(tmp, paths[key])
+        shutil.copy2(entry / METADATA_FILENAME, paths["metadata"])
+        return paths
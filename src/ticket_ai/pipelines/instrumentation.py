@@ -0,0 +1,117 @@
+import re
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from sklearn.pipeline import Pipeline
+
+_PROC_STATUS = Path("/proc/self/status")
+_PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def _reset_peak_rss() -> bool:
+    """Zera o pico de RSS (VmHWM) no Linux. Retorna False se não suportado."""
+    try:
+        _PROC_CLEAR_REFS.write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Pico de RSS do processo em MB (VmHWM no Linux; ru_maxrss como fallback)."""
+    try:
+        match = re.search(r"VmHWM:\s+(\d+)\s+kB", _PROC_STATUS.read_text())
+        if match:
+            return int(match.group(1)) / 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB; macOS em bytes
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+class StageTimer:
+    """
+    Instrumentação por estágio de treino: wall time, CPU time, pico de RSS e linhas/s.
+
+    Observações:
+    - CPU time é do processo atual (workers do joblib/loky não entram)
+    - Pico de RSS é por estágio no Linux (VmHWM zerado no início); nos demais
+      sistemas é o pico acumulado do processo
+    """
+
+    def __init__(self):
+        self.stages: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Dict]:
+        """Mede um estágio. O dict retornado aceita `rows` definido dentro do bloco."""
+        record: Dict = {"stage": name, "rows": rows}
+        per_stage_peak = _reset_peak_rss()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_s"] = time.perf_counter() - wall_start
+            record["cpu_s"] = time.process_time() - cpu_start
+            record["peak_rss_mb"] = _peak_rss_mb()
+            record["peak_rss_per_stage"] = per_stage_peak
+            if record["rows"] and record["wall_s"] > 0:
+                record["rows_per_s"] = record["rows"] / record["wall_s"]
+            self.stages.append(record)
+
+    def as_metrics(self, prefix: str = "stage_") -> Dict[str, float]:
+        """Achata os estágios em métricas numéricas (formato aceito por mlflow.log_metrics)."""
+        metrics: Dict[str, float] = {}
+        for record in self.stages:
+            base = f"{prefix}{record['stage']}"
+            for key in ("wall_s", "cpu_s", "peak_rss_mb", "rows", "rows_per_s"):
+                value = record.get(key)
+                if value is not None:
+                    metrics[f"{base}_{key}"] = float(value)
+        return metrics
+
+    def print_summary(self) -> None:
+        print("\n⏱️ Tempo por estágio")
+        print("-" * 72)
+        print(f"{'estágio':<22}{'wall (s)':>10}{'cpu (s)':>10}{'pico RSS (MB)':>15}{'linhas/s':>15}")
+        for r in self.stages:
+            rss = f"{r['peak_rss_mb']:.1f}" if r.get("peak_rss_mb") is not None else "-"
+            rps = f"{r['rows_per_s']:.0f}" if r.get("rows_per_s") else "-"
+            print(f"{r['stage']:<22}{r['wall_s']:>10.3f}{r['cpu_s']:>10.3f}{rss:>15}{rps:>15}")
+        print("-" * 72)
+
+
+def fit_pipeline_with_stages(
+    pipeline: Pipeline,
+    X,
+    y,
+    timer: Optional[StageTimer] = None,
+    prefix: str = "fit_",
+) -> Pipeline:
+    """
+    Equivalente a `pipeline.fit(X, y)`, mas medindo cada passo separadamente
+    (ex.: fit_tfidf, fit_clf). Sem timer, delega ao fit padrão.
+    """
+    if timer is None:
+        return pipeline.fit(X, y)
+
+    rows = len(X)
+    Xt = X
+    for name, step in pipeline.steps[:-1]:
+        with timer.stage(f"{prefix}{name}", rows=rows):
+            Xt = step.fit_transform(Xt, y)
+
+    name, final = pipeline.steps[-1]
+    with timer.stage(f"{prefix}{name}", rows=rows):
+        final.fit(Xt, y)
+    return pipeline
@@ -1,8 +1,12 @@
-import pandas as pd
+from typing import Optional
+
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import Pipeline
 
+from ticket_ai.data.frame import TicketData, text_and_labels
+from ticket_ai.pipelines.instrumentation import StageTimer, fit_pipeline_with_stages
+
 
 def build_pipeline() -> Pipeline:
     """Cria um pipeline (não treinado) para classificação de tickets."""
@@ -37,14 +41,14 @@ def build_pipeline() -> Pipeline:
     )
 
 
-def train(df: pd.DataFrame) -> Pipeline:
+def train(df: TicketData, timer: Optional[StageTimer] = None) -> Pipeline:
     """
     Treina pipeline de classificação de tickets.
+    Com `timer`, mede cada passo do pipeline (tfidf, clf) separadamente.
+    `TicketFrame` (saída do loader com `as_frame=True`) é usado sem renormalizar.
     Retorna pipeline treinado.
     """
-    X = df["texto"].fillna("").astype(str)
-    y = df["categoria"].fillna("").astype(str).str.strip().str.lower()
+    X, y = text_and_labels(df)
 
     pipeline = build_pipeline()
-    pipeline.fit(X, y)
-    return pipeline
\ No newline at end of file
+    return fit_pipeline_with_stages(pipeline, X, y, timer=timer)
\ No newline at end of file
@@ -1,4 +1,5 @@
-import pandas as pd
+from typing import Dict, Optional
+
 import mlflow
 import mlflow.sklearn
 from mlflow.models import infer_signature
@@ -11,126 +12,148 @@ from sklearn.metrics import (
     confusion_matrix,
 )
 
+from ticket_ai.data.frame import TicketData, text_and_labels
+from ticket_ai.pipelines.instrumentation import StageTimer, fit_pipeline_with_stages
 from ticket_ai.pipelines.train import build_pipeline
 
 
 def train_with_tracking(
-    df: pd.DataFrame,
+    df: TicketData,
     experiment_name: str = "ticket-classification",
     test_size: float = 0.2,
     random_state: int = 42,
     enable_cross_validation: bool = True,
+    extra_params: Optional[Dict] = None,
+    timer: Optional[StageTimer] = None,
 ) -> object:
     """
     Treina o pipeline e registra parâmetros/métricas/artefatos no MLflow.
+    `extra_params` (ex.: fingerprints de dados/config) são registrados como params.
+    `timer` permite incluir estágios medidos antes (load, quality...) no mesmo run.
+    Params e métricas são enviados em lote (log_params/log_metrics).
+    `TicketFrame` é usado como está (sem cópia nem renormalização).
     Retorna o modelo treinado (pipeline sklearn).
     """
     if df.empty:
         raise ValueError("DataFrame vazio. Nada para treinar.")
 
-    df = df.copy()
-    df["texto"] = df["texto"].fillna("").astype(str)
-    df["categoria"] = df["categoria"].fillna("").astype(str).str.strip().str.lower()
+    timer = timer if timer is not None else StageTimer()
 
-    mlflow.set_experiment(experiment_name)
+    with timer.stage("split", rows=len(df)):
+        texto, categoria = text_and_labels(df)
 
-    # Split estratificado: evita que classes fiquem desbalanceadas no holdout
-    X_train, X_val, y_train, y_val = train_test_split(
-        df["texto"],
-        df["categoria"],
-        test_size=test_size,
-        random_state=random_state,
-        stratify=df["categoria"],
-    )
+        # Split estratificado: evita que classes fiquem desbalanceadas no holdout
+        X_train, X_val, y_train, y_val = train_test_split(
+            texto,
+            categoria,
+            test_size=test_size,
+            random_state=random_state,
+            stratify=categoria,
+        )
+
+    mlflow.set_experiment(experiment_name)
 
     with mlflow.start_run():
         # --
-        # Parâmetros principais
+        # Parâmetros principais (um único round trip)
         # --
-        mlflow.log_param("model_type", "LogisticRegression + TFIDF")
-        mlflow.log_param("tfidf_max_features", 50000)
-        mlflow.log_param("tfidf_ngram_range", "(1,2)")
-        mlflow.log_param("lr_solver", "saga")
-        mlflow.log_param("lr_C", 2.0)
-
-        mlflow.log_param("split_test_size", test_size)
-        mlflow.log_param("split_random_state", random_state)
-        mlflow.log_param("train_size", int(len(X_train)))
-        mlflow.log_param("val_size", int(len(X_val)))
+        mlflow.log_params({
+            "model_type": "LogisticRegression + TFIDF",
+            "tfidf_max_features": 50000,
+            "tfidf_ngram_range": "(1,2)",
+            "lr_solver": "saga",
+            "lr_C": 2.0,
+            "split_test_size": test_size,
+            "split_random_state": random_state,
+            "train_size": int(len(X_train)),
+            "val_size": int(len(X_val)),
+            **(extra_params or {}),
+        })
+
+        metrics: Dict[str, float] = {}
 
         # --
         # Cross-validation (opcional)
         # --
         if enable_cross_validation:
-            cv_model = build_pipeline()
-            cv_results = cross_validate(
-                cv_model,
-                X_train,
-                y_train,
-                cv=5,
-                scoring=["accuracy", "f1_weighted"],
-                return_train_score=True,
-                n_jobs=-1,
-            )
-            mlflow.log_metric("cv_val_f1_weighted_mean", float(cv_results["test_f1_weighted"].mean()))
-            mlflow.log_metric(
-                "cv_f1_weighted_gap",
-                float(cv_results["train_f1_weighted"].mean() - cv_results["test_f1_weighted"].mean()),
+            with timer.stage("cross_validation", rows=len(X_train)):
+                cv_model = build_pipeline()
+                cv_results = cross_validate(
+                    cv_model,
+                    X_train,
+                    y_train,
+                    cv=5,
+                    scoring=["accuracy", "f1_weighted"],
+                    return_train_score=True,
+                    n_jobs=-1,
+                )
+            metrics["cv_val_f1_weighted_mean"] = float(cv_results["test_f1_weighted"].mean())
+            metrics["cv_f1_weighted_gap"] = float(
+                cv_results["train_f1_weighted"].mean() - cv_results["test_f1_weighted"].mean()
             )
 
         # --
-        # Treino final (somente no treino)
+        # Treino final (somente no treino), medido por passo do pipeline
         # --
-        model = build_pipeline()
-        model.fit(X_train, y_train)
+        model = fit_pipeline_with_stages(build_pipeline(), X_train, y_train, timer=timer)
 
         # --
         # Avaliação no holdout
         # --
-        y_pred = model.predict(X_val)
-        accuracy = accuracy_score(y_val, y_pred)
-
-        _, _, f1_w, _ = precision_recall_fscore_support(
-            y_val, y_pred, average="weighted", zero_division=0
-        )
-        _, _, f1_m, _ = precision_recall_fscore_support(
-            y_val, y_pred, average="macro", zero_division=0
-        )
-
-        mlflow.log_metric("val_accuracy", float(accuracy))
-        mlflow.log_metric("val_f1_weighted", float(f1_w))
-        mlflow.log_metric("val_f1_macro", float(f1_m))
+        with timer.stage("evaluate", rows=len(X_val)):
+            y_pred = model.predict(X_val)
+            accuracy = accuracy_score(y_val, y_pred)
 
-        # --
-        # Métricas por classe
-        # --
-        report_dict = classification_report(y_val, y_pred, output_dict=True, zero_division=0)
-        for label, metrics in report_dict.items():
-            if label in ("accuracy", "macro avg", "weighted avg"):
-                continue
-            safe_label = str(label).strip().lower().replace(" ", "_")
-            if isinstance(metrics, dict):
-                if "precision" in metrics:
-                    mlflow.log_metric(f"val_precision_{safe_label}", float(metrics["precision"]))
-                if "recall" in metrics:
-                    mlflow.log_metric(f"val_recall_{safe_label}", float(metrics["recall"]))
-                if "f1-score" in metrics:
-                    mlflow.log_metric(f"val_f1_{safe_label}", float(metrics["f1-score"]))
-                if "support" in metrics:
-                    mlflow.log_metric(f"val_support_{safe_label}", float(metrics["support"]))
+            _, _, f1_w, _ = precision_recall_fscore_support(
+                y_val, y_pred, average="weighted", zero_division=0
+            )
+            _, _, f1_m, _ = precision_recall_fscore_support(
+                y_val, y_pred, average="macro", zero_division=0
+            )
 
-        # --
-        # Artefatos de diagnóstico
-        # --
-        mlflow.log_text(classification_report(y_val, y_pred, zero_division=0), "classification_report.txt")
-        mlflow.log_text(str(confusion_matrix(y_val, y_pred)), "confusion_matrix.txt")
+            metrics["val_accuracy"] = float(accuracy)
+            metrics["val_f1_weighted"] = float(f1_w)
+            metrics["val_f1_macro"] = float(f1_m)
+
+            # --
+            # Métricas por classe
+            # --
+            report_dict = classification_report(y_val, y_pred, output_dict=True, zero_division=0)
+            for label, values in report_dict.items():
+                if label in ("accuracy", "macro avg", "weighted avg"):
+                    continue
+                safe_label = str(label).strip().lower().replace(" ", "_")
+                if isinstance(values, dict):
+                    if "precision" in values:
+                        metrics[f"val_precision_{safe_label}"] = float(values["precision"])
+                    if "recall" in values:
+                        metrics[f"val_recall_{safe_label}"] = float(values["recall"])
+                    if "f1-score" in values:
+                        metrics[f"val_f1_{safe_label}"] = float(values["f1-score"])
+                    if "support" in values:
+                        metrics[f"val_support_{safe_label}"] = float(values["support"])
+
+        mlflow.log_metrics(metrics)
+
+        with timer.stage("log_artifacts"):
+            # --
+            # Artefatos de diagnóstico
+            # --
+            mlflow.log_text(classification_report(y_val, y_pred, zero_division=0), "classification_report.txt")
+            mlflow.log_text(str(confusion_matrix(y_val, y_pred)), "confusion_matrix.txt")
+
+            # --
+            # Signature / contrato do modelo
+            # --
+            signature = infer_signature(X_train, model.predict(X_train))
+
+            # Log do modelo como artefato MLflow
+            mlflow.sklearn.log_model(model, artifact_path="model", signature=signature)
 
         # --
-        # Signature / contrato do modelo
+        # Instrumentação por estágio (inclui estágios medidos antes do run)
         # --
-        signature = infer_signature(X_train, model.predict(X_train))
-
-        # Log do modelo como artefato MLflow
-        mlflow.sklearn.log_model(model, artifact_path="model", signature=signature)
+        mlflow.log_metrics(timer.as_metrics())
+        mlflow.log_dict({"stages": timer.stages}, "stage_timings.json")
 
     return model
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, field_validator
 
 class PredictRequest(BaseModel):
@@ -15,4 +17,24 @@ class PredictRequest(BaseModel):
 class PredictResponse(BaseModel):
     """Schema de saída do endpoint /predict."""
     categoria: str
-    resposta: str
\ No newline at end of file
+    resposta: str
+    # "template", "cache", "llm", "fallback" (LLM não configurado) ou "llm_error"
+    resposta_origem: Optional[str] = None
+    categoria_online: Optional[str] = None
+
+class CorrectionRequest(PredictRequest):
+    """Schema de entrada do endpoint /corrections (rótulo corrigido pelo atendente)."""
+    categoria: str
+
+    @field_validator("categoria")
+    @classmethod
+    def categoria_must_not_be_empty(cls, v: str) -> str:
+        v = v.strip().lower()
+        if not v:
+            raise ValueError("Categoria não pode ser vazia.")
+        return v
+
+class CorrectionResponse(BaseModel):
+    """Schema de saída do endpoint /corrections."""
+    aceito: bool
+    pendentes: int
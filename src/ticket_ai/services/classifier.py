@@ -1,8 +1,41 @@
+import json
 import os
 from joblib import load
 from pathlib import Path
+from typing import Optional
 
 DEFAULT_MODEL_PATH = Path(os.getenv("TICKET_AI_MODEL_PATH", "models/ticket_clf.joblib"))
+DEFAULT_WARMUP_REQUESTS = int(os.getenv("TICKET_AI_WARMUP_REQUESTS", "16"))
+
+_WARMUP_TEXTS = (
+    "Quero cancelar minha assinatura",
+    "Meu pedido ainda não chegou",
+    "Fui cobrado duas vezes no cartão",
+    "Não consigo acessar minha conta",
+)
+
+
+def warmup_texts(n: int = DEFAULT_WARMUP_REQUESTS) -> list[str]:
+    """Textos curtos e variados para aquecer o classificador antes do tráfego real."""
+    return [f"{_WARMUP_TEXTS[i % len(_WARMUP_TEXTS)]} ({i})" for i in range(n)]
+
+
+def model_version(model_path: Path = DEFAULT_MODEL_PATH) -> Optional[str]:
+    """
+    Identificador do modelo servido: fingerprints de dados/config do metadado
+    publicado ao lado do artefato ou, sem metadado, tamanho+mtime do arquivo.
+    """
+    metadata = model_path.parent / "model_metadata.json"
+    try:
+        meta = json.loads(metadata.read_text(encoding="utf-8"))
+        return f"{meta['data_fingerprint'][:8]}.{meta['config_fingerprint'][:8]}"
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        stat = model_path.stat()
+    except OSError:
+        return None
+    return f"{stat.st_size:x}.{int(stat.st_mtime):x}"
 
 
 class TicketClassifier:
@@ -24,4 +57,19 @@ class TicketClassifier:
         """Retorna probabilidades por categoria."""
         probas = self.model.predict_proba([texto])[0]
         classes = self.model.classes_
-        return {str(cls): float(p) for cls, p in zip(classes, probas)}
\ No newline at end of file
+        return {str(cls): float(p) for cls, p in zip(classes, probas)}
+
+    def classify_batch(self, textos: list[str]) -> tuple[list[str], list[float]]:
+        """Categoria e confiança de vários textos numa única chamada ao modelo (uso offline)."""
+        if not textos:
+            return [], []
+        probas = self.model.predict_proba(textos)
+        best = probas.argmax(axis=1)
+        classes = self.model.classes_
+        return [str(classes[i]) for i in best], probas.max(axis=1).tolist()
+
+    def warm_up(self, n: int = DEFAULT_WARMUP_REQUESTS) -> None:
+        """Primeiras chamadas (caches/alocações do sklearn e numpy) fora do caminho do usuário."""
+        for texto in warmup_texts(n):
+            self.predict(texto)
+            self.predict_proba(texto)
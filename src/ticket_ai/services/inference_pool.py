@@ -0,0 +1,185 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from joblib import load
+
+from ticket_ai.services.classifier import DEFAULT_MODEL_PATH, DEFAULT_WARMUP_REQUESTS, warmup_texts
+
+DEFAULT_INFERENCE_WORKERS = int(os.getenv("TICKET_AI_INFERENCE_WORKERS", "2"))
+DEFAULT_START_METHOD = os.getenv("TICKET_AI_INFERENCE_START_METHOD", "forkserver")
+
+_model = None  # um modelo por processo de inferência (carregado no initializer)
+
+
+def _init_worker(model_path: str) -> None:
+    global _model
+    # mmap_mode="r": os arrays numpy do artefato (salvo sem compressão) são mapeados
+    # do arquivo e compartilhados entre processos via page cache; o vocabulário
+    # (dict Python) continua sendo uma cópia por processo
+    _model = load(model_path, mmap_mode="r")
+
+
+def _worker_classes() -> List[str]:
+    return [str(c) for c in _model.classes_]
+
+
+def _worker_classify(texto: str) -> Tuple[str, Dict[str, float], float]:
+    """Mesmo contrato de `TicketClassifier.predict`/`predict_proba` + tempo de CPU gasto."""
+    start = time.perf_counter()
+    categoria = str(_model.predict([texto])[0])
+    try:
+        probas = {str(c): float(p) for c, p in zip(_model.classes_, _model.predict_proba([texto])[0])}
+    except Exception:
+        probas = {}  # não derruba request se probas falhar (mesma regra do /predict)
+    return categoria, probas, time.perf_counter() - start
+
+
+class InferencePool:
+    """
+    Classificação em processos dedicados: o event loop da API só faz I/O e
+    aguarda (`await classify(...)`), sem disputar o GIL com TF-IDF + LR.
+
+    O modelo é carregado uma vez por processo no initializer e os processos são
+    aquecidos na criação (primeira requisição não paga o load). Um processo morto
+    (OOM, kill) quebra o executor inteiro: o pool é recriado e a classificação
+    repetida uma vez. `stats()` expõe fila, ocupação e latências da janela recente.
+    """
+
+    def __init__(
+        self,
+        model_path: Path = DEFAULT_MODEL_PATH,
+        workers: int = DEFAULT_INFERENCE_WORKERS,
+        start_method: str = DEFAULT_START_METHOD,
+        window_seconds: float = 60.0,
+    ):
+        model_path = Path(model_path)
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"Modelo não encontrado em '{model_path}'. "
+                "Execute o pipeline de treinamento."
+            )
+        self.model_path = model_path
+        self.workers = workers
+        self.start_method = start_method
+        self.window_seconds = window_seconds
+        self._executor = self._new_executor()
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._restarts = 0
+        self._recent: deque = deque()  # (fim, cpu_s, latência_s) na janela
+        self._started = time.monotonic()
+
+        # Uma tarefa por processo: sobe todos agora e confirma que o modelo carregou
+        warmup = [self._executor.submit(_worker_classes) for _ in range(workers)]
+        self.classes: List[str] = [f.result() for f in warmup][0]
+
+    async def classify(self, texto: str) -> Tuple[str, Dict[str, float]]:
+        """(categoria, probabilidades) calculadas num processo do pool."""
+        submitted = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+        try:
+            for attempt in range(2):
+                executor = self._executor
+                try:
+                    categoria, probas, cpu_s = await asyncio.wrap_future(
+                        executor.submit(_worker_classify, texto))
+                    break
+                except BrokenProcessPool:
+                    self._restart(executor)
+                    if attempt:
+                        raise
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        now = time.monotonic()
+        with self._lock:
+            self._completed += 1
+            self._recent.append((now, cpu_s, time.perf_counter() - submitted))
+            self._expire(now)
+        return categoria, probas
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(str(self.model_path),),
+        )
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Troca o executor quebrado (uma vez, mesmo com vários requests falhando juntos)."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_executor()
+            self._restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self, n: int = DEFAULT_WARMUP_REQUESTS) -> None:
+        """`n` classificações por processo (distribuídas pelo executor), fora das estatísticas."""
+        for future in [self._executor.submit(_worker_classify, t) for t in warmup_texts(n * self.workers)]:
+            future.result()
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            pending = self._pending
+            recent = list(self._recent)
+            completed, failed, restarts = self._completed, self._failed, self._restarts
+
+        span = min(self.window_seconds, max(now - self._started, 1e-9))
+        cpu = np.array([r[1] for r in recent]) * 1000
+        latency = np.array([r[2] for r in recent]) * 1000
+
+        def pct(a, q):
+            return float(np.percentile(a, q)) if len(a) else None
+
+        return {
+            "workers": self.workers,
+            "start_method": self.start_method,
+            "in_flight": min(pending, self.workers),
+            "queue_depth": max(pending - self.workers, 0),
+            "completed": completed,
+            "failed": failed,
+            "restarts": restarts,
+            "window_seconds": self.window_seconds,
+            "utilization": float(cpu.sum() / 1000 / (self.workers * span)) if len(cpu) else 0.0,
+            "cpu_ms": {"p50": pct(cpu, 50), "p99": pct(cpu, 99)},
+            # fila + IPC + CPU, medido no processo da API
+            "latency_ms": {"p50": pct(latency, 50), "p99": pct(latency, 99)},
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _expire(self, now: float) -> None:
+        while self._recent and now - self._recent[0][0] > self.window_seconds:
+            self._recent.popleft()
+
+
+def serving_mode() -> str:
+    """`thread` (padrão: /predict inteiro no threadpool) ou `process` (InferencePool + LLM assíncrono)."""
+    mode = os.getenv("TICKET_AI_SERVING_MODE", "thread").lower()
+    if mode not in ("thread", "process"):
+        raise ValueError(f"TICKET_AI_SERVING_MODE inválido: '{mode}'. Use 'thread' ou 'process'.")
+    return mode
+
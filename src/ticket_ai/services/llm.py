@@ -1,22 +1,136 @@
 import os
 import time
 import random
+import asyncio
+import threading
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from openai import OpenAI
+
+if TYPE_CHECKING:  # o SDK (~1s de import) só é carregado no primeiro uso
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
 
 load_dotenv()
 
-_client: OpenAI | None = None
+_client: "OpenAI | None" = None
+_async_client: "AsyncOpenAI | None" = None
+# Pools HTTP dos clients (referência própria para o warm-up da conexão)
+_http_client: "httpx.Client | None" = None
+_async_http_client: "httpx.AsyncClient | None" = None
+_async_semaphore: asyncio.Semaphore | None = None
+# Loop em que o client assíncrono (pool HTTP) e o semáforo foram criados
+_async_loop: asyncio.AbstractEventLoop | None = None
+_async_stats = {"in_flight": 0, "waiting": 0, "completed": 0, "failed": 0}
+# Tokens reportados pelo provedor (sync + async): custo real estimado por chamada
+_usage_lock = threading.Lock()
+_usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+# Usado enquanto o provedor ainda não reportou nenhum `usage`
+DEFAULT_COMPLETION_TOKENS = 150
 
-def _get_client() -> OpenAI:
-    global _client
+def _api_key() -> str:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY não configurada.")
+    return api_key
+
+def _get_client() -> "OpenAI":
+    global _client, _http_client
+    api_key = _api_key()
     if _client is None:
-        _client = OpenAI(api_key=api_key)
+        from openai import DefaultHttpxClient, OpenAI
+
+        _http_client = DefaultHttpxClient()
+
+        # O SDK tem retries próprios (somados aos de gerar_resposta); OPENAI_BASE_URL
+        # também é lido pelo SDK (ex.: servidor fake do teste de carga).
+        _client = OpenAI(
+            api_key=api_key,
+            max_retries=int(os.getenv("OPENAI_SDK_MAX_RETRIES", "2")),
+            http_client=_http_client,
+        )
     return _client
 
+def _get_async_client() -> "AsyncOpenAI":
+    global _async_client, _async_semaphore, _async_http_client, _async_loop
+    api_key = _api_key()
+    # Conexões e semáforo ficam presos ao loop que os criou: outro loop
+    # (novo TestClient/lifespan, `asyncio.run` do backlog) ganha os seus
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_loop is not loop:
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        _async_http_client = DefaultAsyncHttpxClient()
+
+        _async_client = AsyncOpenAI(
+            api_key=api_key,
+            max_retries=int(os.getenv("OPENAI_SDK_MAX_RETRIES", "2")),
+            http_client=_async_http_client,
+        )
+        _async_semaphore = asyncio.Semaphore(max_llm_concurrency())
+        _async_loop = loop
+    return _async_client
+
+def warm_up_connection(timeout: float = 2.0) -> bool:
+    """
+    Cria o client e abre a conexão HTTP (TCP/TLS) com o provedor antes do primeiro
+    ticket: qualquer resposta serve, a conexão fica no pool do client.
+    Retorna False se o provedor não respondeu (o request real tenta de novo).
+    """
+    client = _get_client()
+    try:
+        _http_client.get(str(client.base_url), timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+async def warm_up_connection_async(timeout: float = 2.0) -> bool:
+    """`warm_up_connection` para o client assíncrono (modo `process`)."""
+    client = _get_async_client()
+    try:
+        await _async_http_client.get(str(client.base_url), timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+def max_llm_concurrency() -> int:
+    return int(os.getenv("TICKET_AI_LLM_MAX_CONCURRENCY", "64"))
+
+def llm_stats() -> dict:
+    """Chamadas assíncronas ao LLM: em andamento, aguardando vaga e concluídas."""
+    return {"max_concurrency": max_llm_concurrency(), **_async_stats}
+
+def _price_per_1m(kind: str, default: str) -> float:
+    return float(os.getenv(f"OPENAI_PRICE_{kind}_PER_1M", default))
+
+def custo_usd(prompt_tokens: float, completion_tokens: float) -> float:
+    """Custo de uma chamada pelos preços (USD por 1M tokens) de OPENAI_PRICE_*_PER_1M."""
+    return (prompt_tokens * _price_per_1m("INPUT", "0.15")
+            + completion_tokens * _price_per_1m("OUTPUT", "0.60")) / 1_000_000
+
+def estimar_tokens_prompt(texto: str, categoria: str) -> int:
+    """Aproximação (~4 caracteres por token) do prompt que `gerar_resposta` enviaria."""
+    return sum(len(m["content"]) + 16 for m in _mensagens(texto, categoria)) // 4
+
+def _registrar_uso(response) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    with _usage_lock:
+        _usage["calls"] += 1
+        _usage["prompt_tokens"] += usage.prompt_tokens or 0
+        _usage["completion_tokens"] += usage.completion_tokens or 0
+
+def usage_stats() -> dict:
+    """Tokens acumulados, média de completion por chamada e custo estimado (USD)."""
+    with _usage_lock:
+        usage = dict(_usage)
+    calls = usage["calls"]
+    return {
+        **usage,
+        "completion_tokens_avg": usage["completion_tokens"] / calls if calls else None,
+        "custo_usd": custo_usd(usage["prompt_tokens"], usage["completion_tokens"]),
+    }
+
 def resposta_fallback(categoria: str) -> str:
     """
     Resposta padrão para quando o LLM estiver desabilitado ou falhar.
@@ -28,16 +142,7 @@ def resposta_fallback(categoria: str) -> str:
         "Nossa equipe vai analisar e retornar com orientações em breve."
     )
 
-def gerar_resposta(texto: str, categoria: str) -> str:
-    """
-    Gera resposta profissional usando LLM.
-    - Reutiliza client global
-    - Timeout para evitar pendurar request
-    - Retries com backoff/jitter para reduzir falhas transitórias
-    """
-    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-    client = _get_client()
-
+def _mensagens(texto: str, categoria: str) -> list[dict]:
     system_msg = "Você é um atendente profissional e empático."
     user_msg = (
         f"Categoria do ticket: {categoria}\n"
@@ -46,32 +151,95 @@ def gerar_resposta(texto: str, categoria: str) -> str:
         "Use português do Brasil.\n"
         "Limite-se a 3-4 frases."
     )
+    return [
+        {"role": "system", "content": system_msg},
+        {"role": "user", "content": user_msg},
+    ]
+
+def _max_retries() -> int:
+    return int(os.getenv("OPENAI_MAX_RETRIES", "2"))
 
-    max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+def _backoff_seconds(attempt: int) -> float:
     backoff_base = float(os.getenv("OPENAI_RETRY_BACKOFF_BASE_SECONDS", "0.5"))
     backoff_max = float(os.getenv("OPENAI_RETRY_BACKOFF_MAX_SECONDS", "4.0"))
+    sleep_s = min(backoff_max, backoff_base * (2 ** attempt))
+    return sleep_s * (0.8 + 0.4 * random.random())  # jitter ~ [0.8x .. 1.2x]
+
+def gerar_resposta(texto: str, categoria: str) -> str:
+    """
+    Gera resposta profissional usando LLM.
+    - Reutiliza client global
+    - Timeout para evitar pendurar request
+    - Retries com backoff/jitter para reduzir falhas transitórias
+    """
+    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    client = _get_client()
+    messages = _mensagens(texto, categoria)
+    max_retries = _max_retries()
 
     last_err: Exception | None = None
     for attempt in range(max_retries + 1):
         try:
             response = client.chat.completions.create(
                 model=model,
-                messages=[
-                    {"role": "system", "content": system_msg},
-                    {"role": "user", "content": user_msg},
-                ],
+                messages=messages,
                 temperature=0.7,
                 max_tokens=300,
                 timeout=30,
             )
+            _registrar_uso(response)
             content = response.choices[0].message.content
             return content.strip() if content else ""
         except Exception as e:
             last_err = e
             if attempt >= max_retries:
                 break
-            sleep_s = min(backoff_max, backoff_base * (2 ** attempt))
-            sleep_s = sleep_s * (0.8 + 0.4 * random.random())  # jitter ~ [0.8x .. 1.2x]
-            time.sleep(sleep_s)
+            time.sleep(_backoff_seconds(attempt))
+
+    raise RuntimeError("Falha ao gerar resposta via LLM (após retries).") from last_err
+
+async def gerar_resposta_async(
+    texto: str,
+    categoria: str,
+    semaphore: asyncio.Semaphore | None = None,
+) -> str:
+    """
+    Versão assíncrona de `gerar_resposta` (mesmos retries/backoff): a espera pelo
+    provedor não ocupa thread. Concorrência limitada por TICKET_AI_LLM_MAX_CONCURRENCY
+    ou, se informado, por `semaphore` (quem controla a própria concorrência, ex.: backlog).
+    """
+    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    client = _get_async_client()
+    semaphore = semaphore if semaphore is not None else _async_semaphore
+    messages = _mensagens(texto, categoria)
+    max_retries = _max_retries()
+
+    last_err: Exception | None = None
+    _async_stats["waiting"] += 1
+    async with semaphore:
+        _async_stats["waiting"] -= 1
+        _async_stats["in_flight"] += 1
+        try:
+            for attempt in range(max_retries + 1):
+                try:
+                    response = await client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=0.7,
+                        max_tokens=300,
+                        timeout=30,
+                    )
+                    _registrar_uso(response)
+                    content = response.choices[0].message.content
+                    _async_stats["completed"] += 1
+                    return content.strip() if content else ""
+                except Exception as e:
+                    last_err = e
+                    if attempt >= max_retries:
+                        break
+                    await asyncio.sleep(_backoff_seconds(attempt))
+        finally:
+            _async_stats["in_flight"] -= 1
 
-    raise RuntimeError("Falha ao gerar resposta via LLM (após retries).") from last_err
\ No newline at end of file
+    _async_stats["failed"] += 1
+    raise RuntimeError("Falha ao gerar resposta via LLM (após retries).") from last_err
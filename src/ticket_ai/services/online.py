@@ -0,0 +1,308 @@
+import os
+import logging
+import threading
+from collections import deque
+from copy import deepcopy
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from joblib import dump, load
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+DEFAULT_ONLINE_MODEL_PATH = Path(
+    os.getenv("TICKET_AI_ONLINE_MODEL_PATH", "models/online_clf.joblib"))
+
+logger = logging.getLogger("ticket_ai_online")
+
+
+def build_vectorizer() -> HashingVectorizer:
+    """Vetorizador sem estado (hashing): não precisa de fit e aceita vocabulário novo."""
+    return HashingVectorizer(
+        n_features=2**18,
+        ngram_range=(1, 2),
+        alternate_sign=False,
+        norm="l2",
+        lowercase=True,
+        strip_accents="unicode",
+        token_pattern=r"(?u)\b\w\w+\b",
+    )
+
+
+def build_online_model() -> SGDClassifier:
+    """Classificador linear com suporte a partial_fit (log-loss → predict_proba)."""
+    return SGDClassifier(
+        loss="log_loss",
+        penalty="l2",
+        alpha=1e-5,
+        random_state=42,
+    )
+
+
+class OnlineTicketClassifier:
+    """
+    Aprendizado incremental a partir de correções dos atendentes.
+
+    - Correções entram num buffer em memória (O(1), não bloqueia /predict)
+    - Uma thread aplica mini-batches via partial_fit num *candidato* (cópia)
+    - O candidato só é publicado se não piorar no holdout (swap atômico da referência)
+    - Candidato rejeitado é mantido e continua recebendo só as correções novas; após
+      `max_rejections` rejeições seguidas ele e o lote pendente são descartados
+    """
+
+    def __init__(
+        self,
+        classes: Sequence[str],
+        model_path: Path = DEFAULT_ONLINE_MODEL_PATH,
+        batch_size: int = int(os.getenv("TICKET_AI_ONLINE_BATCH_SIZE", "64")),
+        update_interval_seconds: float = float(
+            os.getenv("TICKET_AI_ONLINE_UPDATE_INTERVAL_SECONDS", "30")),
+        max_buffer: int = 50_000,
+        holdout_every: int = 10,
+        holdout_size: int = 1_000,
+        min_holdout: int = 30,
+        max_accuracy_drop: float = 0.02,
+        max_rejections: int = 3,
+    ):
+        self.classes = np.array(sorted({str(c) for c in classes}))
+        self.model_path = Path(model_path)
+        self.batch_size = batch_size
+        self.update_interval_seconds = update_interval_seconds
+        self.holdout_every = holdout_every
+        self.min_holdout = min_holdout
+        self.max_accuracy_drop = max_accuracy_drop
+        self.max_rejections = max_rejections
+
+        self.vectorizer = build_vectorizer()
+        self._model: Optional[SGDClassifier] = None
+        self.version = 0
+
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()  # serializa treino/publicação
+        self._buffer: deque = deque(maxlen=max_buffer)
+        self._holdout: deque = deque(maxlen=holdout_size)
+        self._received = 0
+        self._seq = 0  # posição de cada correção no buffer (remoção exata após publicar)
+        self._dropped = 0
+        self._applied = 0
+        self._rejected_batches = 0
+        self._discarded = 0
+
+        # Candidato rejeitado em espera (só a thread de atualização mexe, sob _update_lock)
+        self._candidate: Optional[SGDClassifier] = None
+        self._candidate_rejections = 0
+        self._trained_seq = 0  # última correção já treinada (publicada ou no candidato)
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._load_persisted()
+
+    # --
+    # Serving
+    # --
+    @property
+    def is_fitted(self) -> bool:
+        return self._model is not None
+
+    def predict(self, texto: str) -> Optional[str]:
+        """Categoria pelo modelo online (None enquanto nenhuma versão foi publicada)."""
+        model = self._model  # leitura única: o swap é atômico
+        if model is None:
+            return None
+        X = self.vectorizer.transform([texto])
+        return str(model.predict(X)[0])
+
+    # --
+    # Ingestão de correções
+    # --
+    def submit(self, texto: str, categoria: str) -> int:
+        """Enfileira uma correção e retorna o número de pendentes no buffer."""
+        if categoria not in self.classes:
+            raise ValueError(f"Categoria desconhecida: '{categoria}'")
+
+        with self._lock:
+            self._received += 1
+            if self._received % self.holdout_every == 0:
+                self._holdout.append((texto, categoria))
+            else:
+                if len(self._buffer) == self._buffer.maxlen:
+                    self._dropped += 1
+                self._seq += 1
+                self._buffer.append((self._seq, texto, categoria))
+            pending = len(self._buffer)
+            # Só correções ainda não treinadas acordam a thread: um lote rejeitado
+            # pendente não dispara uma nova rodada a cada submit
+            untrained = self._seq - self._trained_seq
+
+        if untrained >= self.batch_size:
+            self._wake.set()
+        return pending
+
+    # --
+    # Atualização
+    # --
+    def apply_pending(self) -> Optional[dict]:
+        """Aplica as correções pendentes (em mini-batches) e publica se passar no holdout."""
+        with self._update_lock:
+            return self._apply_pending()
+
+    def _apply_pending(self) -> Optional[dict]:
+        # O buffer só é consumido se o candidato for publicado. Um candidato rejeitado
+        # fica em espera e a próxima rodada treina nele apenas as correções novas
+        with self._lock:
+            batch = [(t, c) for seq, t, c in self._buffer if seq > self._trained_seq]
+            if not batch:
+                return None
+            last_seq = self._buffer[-1][0]
+            holdout = list(self._holdout)
+
+        current = self._model
+        candidate = self._candidate
+        if candidate is None:
+            candidate = deepcopy(current) if current is not None else build_online_model()
+
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            X = self.vectorizer.transform([t for t, _ in chunk])
+            y = np.array([c for _, c in chunk])
+            candidate.partial_fit(X, y, classes=self.classes)
+
+        result = {
+            "samples": len(batch),
+            "holdout_size": len(holdout),
+            "accuracy_current": None,
+            "accuracy_candidate": None,
+            "published": False,
+        }
+
+        if current is not None and len(holdout) >= self.min_holdout:
+            X_h = self.vectorizer.transform([t for t, _ in holdout])
+            y_h = np.array([c for _, c in holdout])
+            acc_cur = float((current.predict(X_h) == y_h).mean())
+            acc_cand = float((candidate.predict(X_h) == y_h).mean())
+            result["accuracy_current"] = acc_cur
+            result["accuracy_candidate"] = acc_cand
+
+            if acc_cand < acc_cur - self.max_accuracy_drop:
+                self._candidate_rejections += 1
+                discard = self._candidate_rejections >= self.max_rejections
+                with self._lock:
+                    self._trained_seq = last_seq
+                    self._rejected_batches += 1
+                    if discard:
+                        result["discarded"] = self._consume(last_seq)
+                        self._discarded += result["discarded"]
+                self._candidate = None if discard else candidate
+                if discard:
+                    self._candidate_rejections = 0
+                logger.warning(
+                    "Atualização online rejeitada pelo holdout.",
+                    extra={
+                        "accuracy_current": acc_cur,
+                        "accuracy_candidate": acc_cand,
+                        "discarded": result.get("discarded", 0),
+                    },
+                )
+                return result
+
+        self._publish(candidate)
+        self._candidate = None
+        self._candidate_rejections = 0
+        with self._lock:
+            self._trained_seq = last_seq
+            self._applied += self._consume(last_seq)
+        result["published"] = True
+        result["version"] = self.version
+        return result
+
+    def _consume(self, last_seq: int) -> int:
+        """Remove do buffer as correções até `last_seq` (chamar com _lock)."""
+        removed = 0
+        while self._buffer and self._buffer[0][0] <= last_seq:
+            self._buffer.popleft()
+            removed += 1
+        return removed
+
+    def _publish(self, candidate: SGDClassifier) -> None:
+        """Persiste (escrita atômica via rename) e troca a referência servida."""
+        version = self.version + 1
+        self.model_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.model_path.with_suffix(self.model_path.suffix + ".tmp")
+        dump(
+            {"model": candidate, "classes": self.classes, "version": version},
+            tmp_path,
+        )
+        os.replace(tmp_path, self.model_path)
+
+        self._model = candidate
+        self.version = version
+
+    def _load_persisted(self) -> None:
+        if not self.model_path.exists():
+            return
+        try:
+            payload = load(self.model_path)
+        except Exception:
+            logger.exception("Falha ao carregar modelo online persistido; iniciando do zero.")
+            return
+
+        if set(payload["classes"]) != set(self.classes):
+            logger.warning("Classes do modelo online divergem do modelo batch; ignorando persistido.")
+            return
+        self._model = payload["model"]
+        self.version = int(payload.get("version", 0))
+
+    # --
+    # Thread de background
+    # --
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="online-learner", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush: bool = True) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if flush:
+            self.apply_pending()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.update_interval_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.apply_pending()
+            except Exception:
+                logger.exception("Erro ao aplicar atualização online.")
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                "fitted": self.is_fitted,
+                "pending": len(self._buffer),
+                "holdout_size": len(self._holdout),
+                "received": self._received,
+                "applied": self._applied,
+                "dropped": self._dropped,
+                "rejected_batches": self._rejected_batches,
+                "discarded": self._discarded,
+                "classes": [str(c) for c in self.classes],
+            }
+
+
+def classes_from_model(model: object) -> Optional[Iterable[str]]:
+    """Extrai as classes de um pipeline sklearn treinado (se houver)."""
+    classes = getattr(model, "classes_", None)
+    return [str(c) for c in classes] if classes is not None else None
@@ -0,0 +1,319 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ticket_ai.data.storage import connection
+
+DEFAULT_PREDICTION_LOG_PATH = Path(
+    os.getenv("TICKET_AI_PREDICTION_LOG_PATH", "data/predictions.db"))
+BACKENDS = ("sqlite", "parquet")
+BACKPRESSURE_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+logger = logging.getLogger("ticket_ai_prediction_log")
+
+_CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL,
+    texto_hash TEXT NOT NULL,
+    texto TEXT,
+    categoria TEXT NOT NULL,
+    confidence REAL,
+    probas TEXT,
+    model_version TEXT,
+    resposta_origem TEXT NOT NULL,
+    stages_ms TEXT,
+    total_ms REAL
+)
+"""
+_COLUMNS = ("ts", "texto_hash", "texto", "categoria", "confidence", "probas",
+            "model_version", "resposta_origem", "stages_ms", "total_ms")
+_FLOAT_COLUMNS = ("confidence", "total_ms")
+
+
+def _parquet_schema():
+    """Schema fixo: um lote só com None (ex.: fallback sem probas) não vira coluna `null`."""
+    import pyarrow as pa
+
+    return pa.schema([
+        (name, pa.float64() if name in _FLOAT_COLUMNS else pa.string()) for name in _COLUMNS
+    ])
+
+
+def prediction_log_backend() -> Optional[str]:
+    """`sqlite`, `parquet` ou None (desligado: TICKET_AI_PREDICTION_LOG vazio/off)."""
+    backend = os.getenv("TICKET_AI_PREDICTION_LOG", "off").lower()
+    if backend in ("", "off", "false", "0"):
+        return None
+    if backend not in BACKENDS:
+        raise ValueError(f"TICKET_AI_PREDICTION_LOG inválido: '{backend}'. Use: {BACKENDS} ou 'off'.")
+    return backend
+
+
+def texto_hash(texto: str) -> str:
+    """Hash do texto normalizado (sem o texto em si, o log continua útil para contagens/dedup)."""
+    return hashlib.sha256(texto.strip().encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class PredictionRecord:
+    ts: float
+    texto: str
+    categoria: str
+    probas: Dict[str, float]
+    model_version: Optional[str]
+    resposta_origem: str  # "template", "cache", "llm", "fallback" (sem chave) ou "llm_error"
+    stages_ms: Dict[str, float]
+
+
+class PredictionLogSink:
+    """
+    Log de predições write-behind.
+
+    - `/predict` só enfileira um registro em memória (O(1), sem I/O nem hashing)
+    - Uma thread grava em lote: uma transação SQLite ou um arquivo Parquet por flush
+    - Fila cheia: `drop_newest` (padrão, nunca bloqueia), `drop_oldest` ou `block`
+      (espera até `block_timeout_seconds` e então descarta; no event loop, enfileirar
+      numa thread: ver `may_block`)
+    - `ts` gravado em UTC como "YYYY-MM-DD HH:MM:SS" (mesmo formato de `tickets.data_criacao`)
+    - `stop(flush=True)` no teardown da API grava o que estiver pendente
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_PREDICTION_LOG_PATH,
+        backend: str = "sqlite",
+        max_queue: int = int(os.getenv("TICKET_AI_PREDICTION_LOG_MAX_QUEUE", "10000")),
+        batch_size: int = int(os.getenv("TICKET_AI_PREDICTION_LOG_BATCH_SIZE", "500")),
+        flush_interval_seconds: float = float(
+            os.getenv("TICKET_AI_PREDICTION_LOG_FLUSH_SECONDS", "2")),
+        backpressure: str = os.getenv("TICKET_AI_PREDICTION_LOG_BACKPRESSURE", "drop_newest"),
+        block_timeout_seconds: float = 0.05,
+        store_text: bool = os.getenv(
+            "TICKET_AI_PREDICTION_LOG_STORE_TEXT", "false").lower() in ("1", "true", "yes"),
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend inválido: '{backend}'. Use: {BACKENDS}")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Política inválida: '{backpressure}'. Use: {BACKPRESSURE_POLICIES}")
+        self.path = Path(path)
+        self.backend = backend
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.backpressure = backpressure
+        self.block_timeout_seconds = block_timeout_seconds
+        self.store_text = store_text
+
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()  # serializa gravações (thread x flush final)
+        self._queue: deque = deque()
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._batches = 0
+        self._last_flush_ms: Optional[float] = None
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._prepare()
+
+    # --
+    # Caminho do request
+    # --
+    @property
+    def may_block(self) -> bool:
+        """`submit` pode esperar (política `block` com a fila cheia)."""
+        return self.backpressure == "block"
+
+    def submit(self, record: PredictionRecord) -> bool:
+        """Enfileira um registro; False se descartado pela política de backpressure."""
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                if self.backpressure == "drop_oldest":
+                    self._queue.popleft()
+                    self._dropped += 1
+                elif self.backpressure == "block":
+                    self._wake.set()
+                    if not self._not_full.wait_for(
+                            lambda: len(self._queue) < self.max_queue, self.block_timeout_seconds):
+                        self._dropped += 1
+                        return False
+                else:
+                    self._dropped += 1
+                    return False
+            self._queue.append(record)
+            self._enqueued += 1
+            pending = len(self._queue)
+
+        if pending >= self.batch_size:
+            self._wake.set()
+        return True
+
+    # --
+    # Gravação
+    # --
+    def flush(self) -> int:
+        """Grava tudo o que está na fila (em lotes de `batch_size`). Retorna linhas gravadas."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._queue.popleft()
+                             for _ in range(min(self.batch_size, len(self._queue)))]
+                    self._not_full.notify_all()
+                if not batch:
+                    return written
+                start = time.perf_counter()
+                try:
+                    self._write(batch)
+                except Exception:
+                    with self._lock:
+                        self._failed += len(batch)
+                    logger.exception(f"Falha ao gravar {len(batch)} predições; lote descartado.")
+                    continue
+                with self._lock:
+                    self._written += len(batch)
+                    self._batches += 1
+                    self._last_flush_ms = (time.perf_counter() - start) * 1000
+                written += len(batch)
+
+    def _row(self, r: PredictionRecord) -> tuple:
+        return (
+            datetime.fromtimestamp(r.ts, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            texto_hash(r.texto),
+            r.texto if self.store_text else None,
+            r.categoria,
+            max(r.probas.values()) if r.probas else None,
+            json.dumps(r.probas) if r.probas else None,
+            r.model_version,
+            r.resposta_origem,
+            json.dumps({k: round(v, 3) for k, v in r.stages_ms.items()}),
+            round(sum(r.stages_ms.values()), 3),
+        )
+
+    def _prepare(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.backend == "sqlite":
+            with connection(self.path, mode="write") as conn:
+                conn.execute(_CREATE_TABLE_SQL)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_ts ON predictions(ts)")
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def _write(self, batch: List[PredictionRecord]) -> None:
+        rows = [self._row(r) for r in batch]
+        if self.backend == "sqlite":
+            with connection(self.path, mode="write") as conn:
+                conn.executemany(
+                    f"INSERT INTO predictions ({', '.join(_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    rows,
+                )
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Um arquivo por lote e dia (lote que cruza a meia-noite vira dois), escrita
+        # atômica via rename
+        by_day: Dict[str, list] = {}
+        for row in rows:
+            by_day.setdefault(row[0][:10], []).append(dict(zip(_COLUMNS, row)))
+        schema = _parquet_schema()
+        for day, day_rows in by_day.items():
+            table = pa.Table.from_pylist(day_rows, schema=schema)
+            day_dir = self.path / f"dia={day}"
+            day_dir.mkdir(parents=True, exist_ok=True)
+            target = day_dir / f"{time.strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}.parquet"
+            tmp = target.with_name(target.name + ".tmp")
+            pq.write_table(table, tmp)
+            os.replace(tmp, target)
+
+    # --
+    # Thread de background
+    # --
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="prediction-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush: bool = True) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if flush:
+            self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.flush_interval_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Erro no writer do log de predições.")
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "path": str(self.path),
+                "backpressure": self.backpressure,
+                "pending": len(self._queue),
+                "max_queue": self.max_queue,
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "batches": self._batches,
+                "last_flush_ms": self._last_flush_ms,
+            }
+
+
+def load_predictions(path: Path = DEFAULT_PREDICTION_LOG_PATH, since: Optional[str] = None):
+    """
+    Lê o log (SQLite ou diretório Parquet) como DataFrame, com `data_criacao`
+    (= ts) para os mesmos filtros/janelas usados com a tabela de tickets.
+    `since`: "YYYY-MM-DD[ HH:MM:SS]" em UTC (ex.: "2026-10-01"), inclusivo.
+    """
+    import pandas as pd
+
+    path = Path(path)
+    if path.is_dir():
+        df = pd.read_parquet(path)
+        if "dia" in df.columns:
+            df = df.drop(columns="dia")
+        if since is not None:
+            df = df[df["ts"] >= since]
+        df = df.sort_values("ts", kind="stable").reset_index(drop=True)
+    else:
+        with connection(path, mode="read") as conn:
+            query = f"SELECT {', '.join(_COLUMNS)} FROM predictions"
+            params: tuple = ()
+            if since is not None:
+                query += " WHERE ts >= ?"
+                params = (since,)
+            df = pd.read_sql_query(query + " ORDER BY id", conn, params=params)
+    df["data_criacao"] = df["ts"]
+    return df
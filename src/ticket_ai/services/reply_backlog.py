@@ -0,0 +1,265 @@
+import asyncio
+import functools
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ticket_ai.data import storage
+from ticket_ai.services import llm
+
+DEFAULT_CONCURRENCY = int(os.getenv("TICKET_AI_BACKLOG_CONCURRENCY", "32"))
+# Chamadas/s ao provedor (0 = sem limite além da concorrência)
+DEFAULT_RATE_LIMIT = float(os.getenv("TICKET_AI_BACKLOG_RATE_LIMIT", "0"))
+DEFAULT_CLASSIFY_BATCH_SIZE = 512
+DEFAULT_WRITE_BATCH_SIZE = 200
+
+_FLUSH = object()
+
+logger = logging.getLogger("ticket_ai_reply_backlog")
+
+_INSERT_SQL = (
+    "INSERT OR IGNORE INTO ticket_replies (ticket_id, categoria_prevista, confidence, "
+    "resposta, resposta_origem, model_version, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class RateLimiter:
+    """Token bucket assíncrono: até `rate` aquisições/s, com rajadas de até `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:  # FIFO: quem chegou primeiro sai primeiro
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class BacklogTicket:
+    id: int
+    texto: str
+    categoria: str
+    confidence: float
+
+
+@dataclass
+class BacklogReport:
+    """Progresso do backlog (atualizado a cada checkpoint gravado)."""
+    pending_at_start: int = 0
+    classified: int = 0
+    written: int = 0
+    failed: int = 0
+    checkpoints: int = 0
+    origens: Dict[str, int] = field(default_factory=dict)
+    elapsed_s: float = 0.0
+    custo_usd: float = 0.0
+
+    @property
+    def tickets_per_s(self) -> Optional[float]:
+        return self.written / self.elapsed_s if self.elapsed_s > 0 else None
+
+    @property
+    def custo_por_ticket_usd(self) -> Optional[float]:
+        return self.custo_usd / self.written if self.written else None
+
+    @property
+    def custo_restante_usd(self) -> Optional[float]:
+        """Projeção para o que falta, pelo custo médio (template/cache custam 0) até aqui."""
+        per_ticket = self.custo_por_ticket_usd
+        if per_ticket is None:
+            return None
+        return per_ticket * max(0, self.pending_at_start - self.written - self.failed)
+
+
+def _unanswered_filter(status: Optional[str]) -> Tuple[str, tuple]:
+    where = "NOT EXISTS (SELECT 1 FROM ticket_replies r WHERE r.ticket_id = t.id)"
+    return (where + " AND t.status = ?", (status,)) if status is not None else (where, ())
+
+
+def count_unanswered(db_path: Path, status: Optional[str] = None) -> int:
+    where, params = _unanswered_filter(status)
+    with storage.connection(db_path, mode="read") as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM tickets t WHERE {where}", params).fetchone()[0]
+
+
+def fetch_unanswered(
+    db_path: Path,
+    after_id: int,
+    limit: int,
+    status: Optional[str] = None,
+) -> List[Tuple[int, str]]:
+    """Próxima página (keyset por id) de tickets sem resposta: [(id, texto)]."""
+    where, params = _unanswered_filter(status)
+    with storage.connection(db_path, mode="read") as conn:
+        return conn.execute(
+            f"SELECT t.id, t.texto FROM tickets t WHERE t.id > ? AND {where} ORDER BY t.id LIMIT ?",
+            (after_id, *params, limit),
+        ).fetchall()
+
+
+def write_replies(db_path: Path, rows: List[tuple]) -> int:
+    """Um lote de respostas numa transação (checkpoint). Reexecutável: INSERT OR IGNORE."""
+    with storage.connection(db_path, mode="write") as conn:
+        return conn.executemany(_INSERT_SQL, rows).rowcount
+
+
+async def generate_backlog(
+    db_path: Path,
+    classifier,
+    policy=None,
+    gerar: Optional[Callable[[str, str], Awaitable[str]]] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate_limit: float = DEFAULT_RATE_LIMIT,
+    classify_batch_size: int = DEFAULT_CLASSIFY_BATCH_SIZE,
+    write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+    flush_interval_seconds: float = 2.0,
+    limit: Optional[int] = None,
+    status: Optional[str] = None,
+    model_version: Optional[str] = None,
+    on_checkpoint: Optional[Callable[[BacklogReport], None]] = None,
+) -> BacklogReport:
+    """
+    Gera respostas para os tickets sem resposta em `ticket_replies`.
+
+    - Leitura por páginas (keyset por id) e classificação em lote (`classify_batch`)
+    - Política de respostas (opcional): template/cache não passam pelo provedor
+    - `concurrency` workers assíncronos chamam `gerar` (padrão: o LLM, com o limite
+      de concorrência do provedor igual a `concurrency`), limitados a `rate_limit`/s;
+      a fila entre leitura e workers é limitada (não classifica o banco inteiro adiantado)
+    - Falha em um ticket (qualquer exceção de `gerar`) conta em `failed` e não para
+      os workers; leitura, workers e gravação rodam num mesmo TaskGroup (erro
+      inesperado em um, ex.: checkpoint falhando, cancela os outros: nenhuma
+      chamada ao LLM é paga sem ter onde gravar a resposta)
+    - Respostas gravadas em lotes de `write_batch_size` (ou a cada
+      `flush_interval_seconds`): cada lote é um checkpoint. Uma nova execução só
+      vê o que ainda não foi gravado; falhas do LLM ficam para a próxima.
+    """
+    if gerar is None:
+        gerar = functools.partial(llm.gerar_resposta_async, semaphore=asyncio.Semaphore(concurrency))
+    await asyncio.to_thread(storage.ensure_schema, db_path)
+    pending = await asyncio.to_thread(count_unanswered, db_path, status)
+    report = BacklogReport(pending_at_start=min(pending, limit) if limit is not None else pending)
+    limiter = RateLimiter(rate_limit)
+    work: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+    # Limitada: se a gravação travar, os workers param de chamar o LLM
+    results: asyncio.Queue = asyncio.Queue(maxsize=write_batch_size * 2)
+    usage_start = llm.usage_stats()
+    estimated_cost = 0.0
+    started = time.perf_counter()
+
+    def _result(ticket: BacklogTicket, resposta: str, origem: str) -> tuple:
+        return (ticket.id, ticket.categoria, ticket.confidence, resposta, origem, model_version,
+                datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+
+    async def produce() -> None:
+        last_id = 0
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = classify_batch_size if remaining is None else min(classify_batch_size, remaining)
+            rows = await asyncio.to_thread(fetch_unanswered, db_path, last_id, size, status)
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+            categorias, confidences = await asyncio.to_thread(
+                classifier.classify_batch, [texto for _, texto in rows])
+            report.classified += len(rows)
+            for (id_, texto), categoria, confidence in zip(rows, categorias, confidences):
+                ticket = BacklogTicket(id_, texto, categoria, confidence)
+                decision = policy.decide(texto, categoria, confidence) if policy is not None else None
+                if decision is not None and decision.resposta is not None:
+                    policy.record(decision, decision.tier, decision.resposta, 0.0)
+                    await results.put(_result(ticket, decision.resposta, decision.tier))
+                else:
+                    await work.put((ticket, decision))
+
+    async def worker() -> None:
+        nonlocal estimated_cost
+        while (item := await work.get()) is not None:
+            ticket, decision = item
+            await limiter.acquire()
+            t0 = time.perf_counter()
+            try:
+                resposta = await gerar(ticket.texto, ticket.categoria)
+            except Exception as e:
+                # Fica sem resposta: a próxima execução tenta de novo
+                logger.warning(f"Falha ao gerar resposta do ticket {ticket.id}: {type(e).__name__}: {e}")
+                report.failed += 1
+                if decision is not None:
+                    policy.record(decision, "llm_error", "", time.perf_counter() - t0)
+                continue
+            if decision is not None:
+                policy.record(decision, "llm", resposta, time.perf_counter() - t0)
+            estimated_cost += llm.custo_usd(
+                llm.estimar_tokens_prompt(ticket.texto, ticket.categoria), len(resposta) / 4)
+            await results.put(_result(ticket, resposta, "llm"))
+
+    def checkpoint(batch: List[tuple]) -> None:
+        write_replies(db_path, batch)
+        report.written += len(batch)
+        report.checkpoints += 1
+        for row in batch:
+            report.origens[row[4]] = report.origens.get(row[4], 0) + 1
+        report.elapsed_s = time.perf_counter() - started
+        # Custo real (tokens reportados pelo provedor) quando houver; senão, estimado
+        usage = llm.usage_stats()
+        real = usage["calls"] > usage_start["calls"]
+        report.custo_usd = usage["custo_usd"] - usage_start["custo_usd"] if real else estimated_cost
+        if on_checkpoint is not None:
+            on_checkpoint(report)
+
+    async def write() -> None:
+        batch: List[tuple] = []
+        deadline: Optional[float] = None  # flush por tempo, contado a partir da 1ª linha do lote
+        try:
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    row = await asyncio.wait_for(results.get(), timeout)
+                except asyncio.TimeoutError:
+                    row = _FLUSH
+                if row is None:
+                    break
+                if row is not _FLUSH:
+                    batch.append(row)
+                    deadline = deadline or time.monotonic() + flush_interval_seconds
+                if batch and (row is _FLUSH or len(batch) >= write_batch_size):
+                    pending_batch, batch, deadline = batch, [], None
+                    await asyncio.to_thread(checkpoint, pending_batch)
+        finally:
+            # Fim normal ou interrupção: o que já foi gerado não é perdido
+            if batch:
+                checkpoint(batch)
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(write())
+            workers = [group.create_task(worker()) for _ in range(concurrency)]
+            await produce()
+            for _ in workers:
+                await work.put(None)
+            await asyncio.wait(workers)
+            await results.put(None)
+    except ExceptionGroup as eg:
+        # A primeira falha (ex.: checkpoint) é a causa; as demais tarefas só foram canceladas
+        raise eg.exceptions[0]
+    report.elapsed_s = time.perf_counter() - started
+    return report
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Opt-in: sem caminho configurado tudo vai ao LLM (exemplo em config/reply_policy.example.json)
+DEFAULT_REPLY_POLICY_PATH = os.getenv("TICKET_AI_REPLY_POLICY_PATH", "")
+TIERS = ("template", "cache", "llm")
+# Origens da resposta contabilizadas em `status()` (mesmos valores do log de predições)
+ORIGENS = ("template", "cache", "llm", "fallback", "llm_error")
+
+
+def normalize_texto(texto: str) -> str:
+    """Minúsculas e espaços colapsados: mesma chave para o mesmo ticket reenviado."""
+    return " ".join(texto.lower().split())
+
+
+class _SafeParams(dict):
+    def __missing__(self, key: str) -> str:
+        raise ValueError(f"Parâmetro '{key}' não definido na política de respostas.")
+
+
+@dataclass(frozen=True)
+class ReplyTemplate:
+    """Variante já renderizada; `quando`: trechos (minúsculos) que a selecionam (vazio = padrão)."""
+    texto: str
+    quando: Tuple[str, ...] = ()
+
+    def matches(self, texto_norm: str) -> bool:
+        return not self.quando or any(k in texto_norm for k in self.quando)
+
+
+@dataclass(frozen=True)
+class CategoryRule:
+    """
+    Limiares de confiança por categoria (None desliga o nível):
+    - `template_min_confidence`: resposta pré-renderizada, sem LLM
+    - `cache_min_confidence`: reaproveita a resposta do LLM para o mesmo texto
+    Abaixo dos dois, `gerar_resposta` completo.
+    """
+    template_min_confidence: Optional[float] = None
+    cache_min_confidence: Optional[float] = None
+    templates: Tuple[ReplyTemplate, ...] = ()
+
+    def template_for(self, texto_norm: str) -> Optional[ReplyTemplate]:
+        for t in self.templates:
+            if t.matches(texto_norm):
+                return t
+        return None
+
+
+@dataclass
+class ReplyDecision:
+    tier: str  # "template", "cache" ou "llm"
+    texto: str
+    categoria: str
+    resposta: Optional[str] = None  # preenchida quando o LLM não é necessário
+    cache_key: Optional[str] = None  # nível cache: onde guardar a resposta do LLM (miss)
+
+
+@dataclass
+class _Counters:
+    origens: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(ORIGENS, 0))
+    cache_misses: int = 0
+    llm_seconds: float = 0.0
+    llm_calls: int = 0
+    evitadas: int = 0
+    custo_evitado_usd: float = 0.0
+
+
+class ReplyPolicy:
+    """
+    Escolhe, por categoria e confiança do classificador, como responder o ticket:
+
+    1. `template`: variante pré-renderizada (no load) escolhida por palavras-chave
+    2. `cache`: resposta do LLM já gerada para o mesmo texto normalizado (LRU + TTL)
+    3. `llm`: `gerar_resposta` completo (em miss do cache, a resposta é guardada)
+
+    Contabiliza os níveis e a latência/custo economizados: chamadas evitadas x
+    latência média observada do LLM e x custo estimado do prompt que seria enviado.
+    """
+
+    def __init__(
+        self,
+        rules: Dict[str, CategoryRule],
+        default: CategoryRule = CategoryRule(),
+        cache_size: int = int(os.getenv("TICKET_AI_REPLY_CACHE_SIZE", "10000")),
+        cache_ttl_seconds: float = float(os.getenv("TICKET_AI_REPLY_CACHE_TTL_SECONDS", "86400")),
+    ):
+        self.rules = rules
+        self.default = default
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._counters = _Counters()
+
+    @classmethod
+    def from_dict(cls, config: dict, **kwargs) -> "ReplyPolicy":
+        """
+        Formato (ver `config/reply_policy.example.json`): `params` globais, regra `default`
+        e `categorias` com limiares, `params` próprios e `templates`
+        (`{"texto": ..., "quando": [...]}`). Placeholders `{param}` e `{categoria}`
+        são resolvidos aqui, uma vez; parâmetro ausente é erro de configuração.
+        """
+        global_params = config.get("params", {})
+
+        def rule(name: str, spec: dict) -> CategoryRule:
+            params = _SafeParams({**global_params, "categoria": name, **spec.get("params", {})})
+            templates = tuple(
+                ReplyTemplate(
+                    texto=t["texto"].format_map(params),
+                    quando=tuple(normalize_texto(k) for k in t.get("quando", ())),
+                )
+                for t in spec.get("templates", ())
+            )
+            return CategoryRule(
+                template_min_confidence=spec.get("template_min_confidence"),
+                cache_min_confidence=spec.get("cache_min_confidence"),
+                # Variantes com palavras-chave primeiro; a padrão (sem `quando`) por último
+                templates=tuple(sorted(templates, key=lambda t: not t.quando)),
+            )
+
+        default_spec = config.get("default", {})
+        rules = {
+            name.strip().lower(): rule(name, {**default_spec, **spec})
+            for name, spec in config.get("categorias", {}).items()
+        }
+        return cls(rules, default=rule("", {**default_spec, "templates": ()}), **kwargs)
+
+    @classmethod
+    def from_file(cls, path: Path, **kwargs) -> "ReplyPolicy":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")), **kwargs)
+
+    # --
+    # Caminho do request
+    # --
+    def decide(self, texto: str, categoria: str, confidence: Optional[float]) -> ReplyDecision:
+        rule = self.rules.get(categoria, self.default)
+        conf = confidence if confidence is not None else 0.0
+        texto_norm = normalize_texto(texto)
+
+        if rule.template_min_confidence is not None and conf >= rule.template_min_confidence:
+            template = rule.template_for(texto_norm)
+            if template is not None:
+                return ReplyDecision("template", texto, categoria, resposta=template.texto)
+
+        if rule.cache_min_confidence is not None and conf >= rule.cache_min_confidence:
+            key = f"{categoria}:{hashlib.blake2b(texto_norm.encode('utf-8'), digest_size=16).hexdigest()}"
+            return ReplyDecision("cache", texto, categoria, resposta=self._cache_get(key), cache_key=key)
+
+        return ReplyDecision("llm", texto, categoria)
+
+    def record(self, decision: ReplyDecision, origem: str, resposta: str,
+               reply_seconds: float) -> None:
+        """
+        Resultado do request: `origem` é o que de fato respondeu (template, cache,
+        llm, fallback ou llm_error). Respostas do LLM no nível cache são guardadas.
+        """
+        if origem == "llm" and decision.cache_key is not None:
+            self._cache_put(decision.cache_key, resposta)
+        custo_evitado = self._custo_evitado(decision) if origem in ("template", "cache") else 0.0
+
+        with self._lock:
+            c = self._counters
+            c.origens[origem] = c.origens.get(origem, 0) + 1
+            if decision.tier == "cache" and origem != "cache":
+                c.cache_misses += 1
+            if origem == "llm":
+                c.llm_calls += 1
+                c.llm_seconds += reply_seconds
+            elif origem in ("template", "cache"):
+                c.evitadas += 1
+                c.custo_evitado_usd += custo_evitado
+
+    @staticmethod
+    def _custo_evitado(decision: ReplyDecision) -> float:
+        from ticket_ai.services.llm import (
+            DEFAULT_COMPLETION_TOKENS,
+            custo_usd,
+            estimar_tokens_prompt,
+            usage_stats,
+        )
+
+        completion = usage_stats()["completion_tokens_avg"] or DEFAULT_COMPLETION_TOKENS
+        return custo_usd(estimar_tokens_prompt(decision.texto, decision.categoria), completion)
+
+    # --
+    # Cache LRU com TTL
+    # --
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._cache.get(key)
+            if item is None:
+                return None
+            stored_at, resposta = item
+            if time.monotonic() - stored_at > self.cache_ttl_seconds:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return resposta
+
+    def _cache_put(self, key: str, resposta: str) -> None:
+        if self.cache_size <= 0 or not resposta:
+            return
+        with self._lock:
+            self._cache[key] = (time.monotonic(), resposta)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def status(self) -> dict:
+        with self._lock:
+            c = self._counters
+            total = sum(c.origens.values())
+            llm_avg_s = c.llm_seconds / c.llm_calls if c.llm_calls else None
+            return {
+                "categorias": {
+                    name: {"template_min_confidence": r.template_min_confidence,
+                           "cache_min_confidence": r.cache_min_confidence,
+                           "templates": len(r.templates)}
+                    for name, r in self.rules.items()
+                },
+                "origens": dict(c.origens),
+                "cache": {"entries": len(self._cache), "max_entries": self.cache_size,
+                          "hits": c.origens["cache"], "misses": c.cache_misses},
+                "sem_llm_rate": c.evitadas / total if total else None,
+                "llm_latency_ms_avg": llm_avg_s * 1000 if llm_avg_s is not None else None,
+                "latencia_economizada_s": c.evitadas * llm_avg_s if llm_avg_s is not None else None,
+                "custo_economizado_usd": c.custo_evitado_usd,
+            }
+
+
+def load_reply_policy(path: Optional[str] = DEFAULT_REPLY_POLICY_PATH) -> Optional[ReplyPolicy]:
+    """Política do arquivo configurado; None (tudo via LLM, como antes) se vazio ou ausente."""
+    if not path or not Path(path).exists():
+        return None
+    return ReplyPolicy.from_file(Path(path))
+
@@ -1,6 +1,13 @@
+import threading
+import time
+import pandas as pd
 import pytest
 from fastapi.testclient import TestClient
+from joblib import dump
 from ticket_ai.api.main import app
+from ticket_ai.pipelines.train import train
+from ticket_ai.services import inference_pool
+from ticket_ai.services.classifier import TicketClassifier
 
 client = TestClient(app)
 
@@ -38,4 +45,63 @@ def test_predict_endpoint_contract():
 def test_predict_rejects_too_short_text():
     payload = {"texto": "  a "}
     response = client.post("/predict", json=payload)
-    assert response.status_code == 422  # validação Pydantic
\ No newline at end of file
+    assert response.status_code == 422  # validação Pydantic
+
+
+@pytest.fixture
+def tiny_model_path(tmp_path):
+    textos = {"logistica": ["meu pedido não chegou", "pedido atrasado na entrega"],
+              "financeiro": ["cobrança duplicada no cartão", "estorno da cobrança"]}
+    df = pd.DataFrame([(t, c) for c, ts in textos.items() for t in ts] * 10, columns=["texto", "categoria"])
+    path = tmp_path / "ticket_clf.joblib"
+    dump(train(df), path)
+    return path
+
+def _wait_ready(c, timeout=60):
+    deadline = time.monotonic() + timeout
+    while (ready := c.get("/health/ready")).json()["status"] == "starting":
+        assert time.monotonic() < deadline, "inicialização não terminou"
+        time.sleep(0.05)
+    return ready
+
+@pytest.mark.parametrize("model_available", [True, False])
+def test_liveness_before_readiness(monkeypatch, tiny_model_path, model_available):
+    def load_model(app):
+        app.state.serving_mode = "thread"
+        if model_available:
+            app.state.clf = TicketClassifier(model_path=tiny_model_path)
+
+    monkeypatch.setattr("ticket_ai.api.main._load_model", load_model)
+    monkeypatch.setattr("ticket_ai.services.llm.warm_up_connection", lambda timeout=2.0: True)
+    # o lifespan não limpa o estado: restaurado no teardown do teste
+    monkeypatch.setattr(app.state, "clf", None, raising=False)
+    monkeypatch.setattr(app.state, "reply_policy", None, raising=False)
+    with TestClient(app) as c:
+        assert c.get("/health/live").status_code == 200
+        ready = _wait_ready(c)
+
+    if model_available:
+        assert ready.status_code == 200
+        assert {"model", "drift", "model_warmup", "llm_warmup"} <= set(ready.json()["steps"])
+        assert ready.json()["ready_s"] is not None
+    else:
+        assert ready.status_code == 503 and ready.json()["status"] == "model_not_loaded"
+
+def test_pool_created_after_shutdown_is_closed(monkeypatch):
+    release, closed = threading.Event(), threading.Event()
+
+    class SlowPool:
+        def __init__(self):
+            release.wait(10)  # modelo ainda carregando quando o app encerra
+
+        def shutdown(self):
+            closed.set()
+
+    monkeypatch.setenv("TICKET_AI_SERVING_MODE", "process")
+    monkeypatch.setattr(inference_pool, "InferencePool", SlowPool)
+    monkeypatch.setattr(app.state, "inference_pool", None, raising=False)
+    with TestClient(app) as c:
+        assert c.get("/health/live").status_code == 200
+    release.set()
+    assert closed.wait(10)
+    assert app.state.inference_pool is None
@@ -0,0 +1,47 @@
+import pandas as pd
+from ticket_ai.data import storage
+from ticket_ai.data.bulk_import import _prepare_file, bulk_import, expand_paths
+
+COLS = ["texto", "categoria", "origem", "data_criacao", "status", "prioridade", "cliente_id"]
+
+def _write_csv(path, textos):
+    pd.DataFrame(
+        [(t, "financeiro", "email", "2025-01-01 10:00:00", "aberto", "alta", i) for i, t in enumerate(textos)],
+        columns=COLS,
+    ).to_csv(path, sep=";", index=False)
+
+def test_bulk_import_keeps_file_order_and_resumes(tmp_path):
+    _write_csv(tmp_path / "tickets_01.csv", ["Cobrança duplicada no cartão", "Boleto não chegou ainda"])
+    _write_csv(tmp_path / "tickets_02.csv", ["Boleto não chegou ainda", "Reembolso não caiu na conta"])
+    (tmp_path / "tickets_03.csv").write_text("foo;bar\n1;2\n", encoding="utf-8")
+    db_path = tmp_path / "tickets.db"
+
+    paths = expand_paths([str(tmp_path / "tickets_0[12].csv")])
+    first = bulk_import(paths[:1], db_path=db_path, workers=2)
+    assert [r.inserted for r in first.completed] == [2]
+
+    # "Interrompido" após o 1º arquivo: a nova execução pula o que já foi concluído
+    result = bulk_import(expand_paths([str(tmp_path / "*.csv")]), db_path=db_path, workers=2,
+                         defer_indexes=True)
+    assert result.skipped == [str(paths[0])]
+    assert [(r.inserted, r.duplicates) for r in result.completed] == [(1, 1)]
+    assert list(result.failed) == [str(tmp_path / "tickets_03.csv")]
+
+    with storage.connection(db_path) as conn:
+        textos = [r[0] for r in conn.execute("SELECT texto FROM tickets ORDER BY id")]
+        indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        completed = conn.execute("SELECT COUNT(*) FROM import_files").fetchone()[0]
+    assert textos == ["Cobrança duplicada no cartão", "Boleto não chegou ainda", "Reembolso não caiu na conta"]
+    assert {name for name, _ in storage.SECONDARY_INDEXES} <= indexes
+    assert completed == 2
+
+def test_bulk_import_reports_same_content_and_vanished_files(tmp_path):
+    _write_csv(tmp_path / "a.csv", ["Cobrança duplicada no cartão"])
+    (tmp_path / "b.csv").write_bytes((tmp_path / "a.csv").read_bytes())
+    result = bulk_import([tmp_path / "a.csv", tmp_path / "b.csv"], db_path=tmp_path / "tickets.db", workers=1)
+    assert [r.source for r in result.completed] == [str(tmp_path / "a.csv")]
+    assert result.same_content == {str(tmp_path / "b.csv"): str(tmp_path / "a.csv")}
+
+    # Arquivo removido entre o hash e o parse: vira falha do arquivo, não aborta a importação
+    prepared = _prepare_file(str(tmp_path / "removido.csv"), 10)
+    assert prepared["error"].startswith("FileNotFoundError")
@@ -1,5 +1,7 @@
+import sqlite3
 import pandas as pd
-from ticket_ai.data.quality import DataQualityChecker
+from ticket_ai.data.loader import TicketDataLoader
+from ticket_ai.data.quality import DataQualityChecker, IncrementalQualityGate, QualityAccumulator
 
 def test_quality_checker_detects_empty_dataframe():
     df = pd.DataFrame(columns=["texto", "categoria"])
@@ -22,4 +24,91 @@ def test_quality_checker_valid_dataset():
     checker = DataQualityChecker(df)
     result = checker.run_all_checks()
     assert result["is_valid"] is True
-    assert result["issues"] == []
\ No newline at end of file
+    assert result["issues"] == []
+
+
+def _messy_df():
+    return pd.DataFrame({
+        "texto": [
+            "Fui cobrado duas vezes!!! financeiro???",
+            " Fui cobrado duas vezes!!! financeiro??? ",
+            None,
+            "curto",
+            "Quero cancelar minha assinatura",
+            "Quero cancelar minha assinatura",
+        ],
+        "categoria": ["Financeiro", "financeiro ", "suporte", " ", "assinatura", "Assinatura"],
+    })
+
+def test_chunked_and_merged_results_match_single_pass():
+    df = _messy_df()
+    expected = DataQualityChecker(df, expected_categories=["financeiro", "assinatura"]).run_all_checks()
+    assert expected["is_valid"] is False
+    assert "2 duplicatas exatas (texto+categoria)." in expected["warnings"]
+
+    chunks = [df.iloc[i:i + 2] for i in range(0, len(df), 2)]
+    streamed = DataQualityChecker.from_chunks(chunks, expected_categories=["financeiro", "assinatura"])
+    assert streamed.run_all_checks() == expected
+
+    left = QualityAccumulator().update(df.iloc[:3])
+    right = QualityAccumulator().update(df.iloc[3:])
+    assert left.merge(right).results(["financeiro", "assinatura"]) == expected
+
+def test_checker_does_not_copy_or_mutate_input():
+    df = _messy_df()
+    before = df.copy()
+    checker = DataQualityChecker(df)
+    checker.print_report()
+    assert checker.df is df
+    pd.testing.assert_frame_equal(df, before)
+
+
+def _create_db(path, rows):
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, texto TEXT NOT NULL, "
+            "categoria TEXT NOT NULL, origem TEXT, data_criacao TEXT, status TEXT, "
+            "prioridade TEXT, cliente_id INTEGER)"
+        )
+        _insert(conn, rows)
+
+def _insert(conn, rows):
+    conn.executemany("INSERT INTO tickets (texto, categoria) VALUES (?, ?)", rows)
+
+def test_incremental_gate_matches_full_recheck(tmp_path):
+    db_path, state_path = tmp_path / "tickets.db", tmp_path / "quality_state.joblib"
+    _create_db(db_path, [("Quero cancelar minha assinatura", "assinatura"),
+                         ("Produto chegou com defeito", "logistica")])
+    loader = TicketDataLoader(db_path=str(db_path))
+    gate = IncrementalQualityGate(loader, state_path=state_path)
+    assert gate.run().run_all_checks()["is_valid"] is True
+    assert gate.last_run["mode"] == "full"
+
+    with sqlite3.connect(db_path) as conn:
+        _insert(conn, [("Quero cancelar minha assinatura", "Assinatura"), ("curto", "logistica")])
+    incremental = gate.run()
+    assert gate.last_run["mode"] == "incremental"
+    assert gate.last_run["new_rows"] == 2
+    full = IncrementalQualityGate(loader, state_path=tmp_path / "outro.joblib").run()
+    assert incremental.run_all_checks() == full.run_all_checks()
+    assert "1 duplicatas exatas (texto+categoria)." in full.run_all_checks()["warnings"]
+
+def test_incremental_gate_rechecks_after_delete_and_keeps_state_on_failure(tmp_path):
+    db_path, state_path = tmp_path / "tickets.db", tmp_path / "quality_state.joblib"
+    _create_db(db_path, [("Quero cancelar minha assinatura", "assinatura"),
+                         ("Produto chegou com defeito", "logistica")])
+    loader = TicketDataLoader(db_path=str(db_path))
+    gate = IncrementalQualityGate(loader, state_path=state_path, expected_categories=["assinatura", "logistica"])
+    gate.run()
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM tickets WHERE id = 1")
+    assert gate.run().run_all_checks()["total_rows"] == 1
+    assert gate.last_run["mode"] == "full"
+
+    with sqlite3.connect(db_path) as conn:
+        _insert(conn, [("Dúvida sobre o plano anual", "outra")])
+    assert gate.run().run_all_checks()["is_valid"] is False
+    # Gate reprovado não avança a marca d'água: a linha ruim é relida no próximo run
+    assert gate.run().run_all_checks()["is_valid"] is False
+    assert gate.last_run["new_rows"] == 1
@@ -0,0 +1,168 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from ticket_ai.api.main import app
+from ticket_ai.data.loader import TicketDataLoader
+from ticket_ai.monitoring.drift_monitoring import _psi, compare_baseline_vs_current, compare_profiles
+from ticket_ai.monitoring.drift_sweep import drift_sweep
+from ticket_ai.monitoring.reference_profile import ReferenceProfile
+from ticket_ai.monitoring.sketches import DriftSketch, SlidingWindowSketches
+from ticket_ai.pipelines.train import train
+
+REF = pd.DataFrame({
+    "texto": ["Quero cancelar minha assinatura agora", "Meu pedido não chegou até hoje"] * 50,
+    "categoria": ["assinatura", " Logistica"] * 50,
+})
+
+def test_sketch_add_update_and_merge_agree():
+    one_by_one = DriftSketch()
+    for texto, categoria in zip(REF["texto"], REF["categoria"]):
+        one_by_one.add(texto, categoria, confidence=0.8)
+    left = DriftSketch().update(REF.iloc[:30].assign(conf=0.8), confidence_col="conf")
+    right = DriftSketch().update(REF.iloc[30:].assign(conf=0.8), confidence_col="conf")
+    merged = left.merge(right)
+
+    assert merged.rows == one_by_one.rows == 100
+    assert merged.category_counts == one_by_one.category_counts == {"assinatura": 50, "logistica": 50}
+    assert np.array_equal(merged.length_hist, one_by_one.length_hist)
+    assert np.array_equal(merged.confidence_hist, one_by_one.confidence_hist)
+    assert merged.token_counts == one_by_one.token_counts
+    assert 0.75 <= merged.confidence_quantiles()["p50"] <= 0.85
+
+def test_compare_baseline_vs_current_keeps_contract():
+    cur = pd.DataFrame({"texto": ["Pix não caiu na conta"] * 30, "categoria": ["financeiro"] * 30})
+    result = compare_baseline_vs_current(REF, cur)
+    assert result["ref_rows"] == 100 and result["cur_rows"] == 30
+    assert result["ref_category_dist"] == {"assinatura": 50, "logistica": 50}
+    expected_psi = _psi(pd.Series({"assinatura": 50, "logistica": 50}), pd.Series({"financeiro": 30}))
+    assert result["psi_category"] == expected_psi
+    assert "pix" in result["new_top_tokens"]
+
+def test_sliding_windows_expire_old_buckets():
+    now = [1_000.0]
+    windows = SlidingWindowSketches(windows=["1m", "5m"], bucket_seconds=10, clock=lambda: now[0])
+    windows.observe("Meu pedido não chegou", "logistica", 0.9)
+    now[0] += 120
+    windows.observe("Pix não caiu na conta", "financeiro", 0.6)
+    assert windows.window("1m").category_counts == {"financeiro": 1}
+    assert windows.window("5m").rows == 2
+    now[0] += 400
+    windows.observe("Quero cancelar", "assinatura")
+    assert windows.window("5m").rows == 1
+
+def test_window_merge_does_not_block_observe(monkeypatch):
+    now = [0.0]
+    windows = SlidingWindowSketches(windows=["5m"], bucket_seconds=10, clock=lambda: now[0])
+    windows.observe("Meu pedido não chegou", "logistica", 0.9)
+    now[0] = 30.0
+    merging, release = threading.Event(), threading.Event()
+    original = DriftSketch.merge
+
+    def slow_merge(self, other):
+        merging.set()
+        release.wait(5)
+        return original(self, other)
+
+    monkeypatch.setattr(DriftSketch, "merge", slow_merge)
+    query = threading.Thread(target=windows.window, args=("5m",))
+    query.start()
+    assert merging.wait(5)
+    start = time.perf_counter()
+    windows.observe("Pix não caiu na conta", "financeiro", 0.6)  # durante a fusão dos fechados
+    elapsed = time.perf_counter() - start
+    release.set()
+    query.join()
+    assert elapsed < 1.0
+    monkeypatch.setattr(DriftSketch, "merge", original)
+    assert windows.window("5m").rows == 2
+
+def test_drift_endpoint_compares_live_window_with_baseline(monkeypatch):
+    drift = SlidingWindowSketches(windows=["1h"])
+    for _ in range(20):
+        drift.observe("Pix não caiu na conta", "financeiro", 0.55)
+    monkeypatch.setattr(app.state, "drift", drift, raising=False)
+    monkeypatch.setattr(app.state, "drift_baseline", DriftSketch().update(REF), raising=False)
+
+    client = TestClient(app)
+    data = client.get("/drift", params={"window": "1h"}).json()
+    assert data["cur_rows"] == 20
+    assert data["drift_detected"] is True
+    assert data["cur_confidence_quantiles"]["p50"] < 0.6
+    assert client.get("/drift", params={"window": "2d"}).status_code == 422
+
+def _train_df():
+    textos = {
+        "assinatura": ["quero cancelar minha assinatura mensal", "cancelar assinatura do plano anual"],
+        "logistica": ["meu pedido não chegou ainda", "pedido atrasado na entrega"],
+        "financeiro": ["cobrança duplicada no cartão", "estorno da cobrança no cartão"],
+    }
+    rows = [(t, c) for c, ts in textos.items() for t in ts] * 10
+    return pd.DataFrame(rows, columns=["texto", "categoria"])
+
+def test_reference_profile_roundtrip_and_vocabulary_drift(tmp_path):
+    df = _train_df()
+    model = train(df)
+    path = ReferenceProfile.from_frame(df, model).save(tmp_path / "profile.joblib")
+    ref = ReferenceProfile.load(path)
+    assert ref.rows == 60 and ref.sketch.confidence_rows == 60
+    assert ref.document_frequency.sum() > 0 and ref.oov_rate == 0.0
+
+    same = compare_profiles(ref, ReferenceProfile.from_frame(df, model))
+    assert same["vocab_js_divergence"] < 1e-9
+    assert same["top_vocab_shifts"] == []
+
+    shifted_df = pd.DataFrame({
+        "texto": ["pix não caiu na conta digital"] * 10 + ["cobrança duplicada no cartão"] * 10,
+        "categoria": ["financeiro"] * 20,
+    })
+    names = model.named_steps["tfidf"].get_feature_names_out()
+    shifted = compare_profiles(ref, ReferenceProfile.from_frame(shifted_df, model), feature_names=names)
+    assert shifted["vocab_js_divergence"] > 0.3
+    assert shifted["cur_oov_rate"] > 0.3
+    assert shifted["top_vocab_shifts"][0]["term"] in names
+
+def test_drift_sweep_matches_loader_per_window(tmp_path):
+    db_path = tmp_path / "tickets.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, texto TEXT NOT NULL, "
+            "categoria TEXT NOT NULL, origem TEXT, data_criacao TEXT, status TEXT, "
+            "prioridade TEXT, cliente_id INTEGER)"
+        )
+        conn.executemany("INSERT INTO tickets (texto, categoria, data_criacao) VALUES (?, ?, ?)", [
+            ("Quero cancelar minha assinatura agora", " Assinatura ", "2025-01-01 10:00:00"),
+            ("Quero cancelar minha assinatura agora", "assinatura", "2025-01-02 10:00:00"),
+            ("curto", "financeiro", "2025-01-03 10:00:00"),
+            ("Fui cobrado duas vezes na fatura", "Financeiro", "2025-01-31 23:00:00"),
+            ("  Produto chegou com defeito  ", "logistica", "2025-02-01 10:00:00"),
+            ("Produto chegou com defeito", "logistica", "2025-02-02 10:00:00"),
+            ("Meu pedido não chegou até hoje", "logistica", "2025-02-03 10:00:00"),
+            ("Sem data de criação registrada", "logistica", None),
+        ])
+
+    ref = DriftSketch().update(REF)
+    sweep = drift_sweep(db_path, reference=ref, granularity="month", workers=1)
+    assert sweep["janela"].tolist() == ["2025-01", "2025-02"]
+    assert sweep["raw_rows"].tolist() == [4, 3]
+    assert sweep["retention_pct"].round(1).tolist() == [50.0, 66.7]
+    assert sweep["alerta"].tolist() == [True, True]
+    assert sweep["psi_prev"].isna().tolist() == [True, False]
+
+    loader = TicketDataLoader(db_path=str(db_path))
+    for row, (month, last_day) in zip(sweep.itertuples(), [(1, 31), (2, 28)]):
+        df = loader.load_training_data(
+            min_samples_per_category=1,
+            date_from=datetime(2025, month, 1), date_to=datetime(2025, month, last_day, 23, 59, 59))
+        assert row.rows == len(df)
+        assert row.avg_text_len == df["texto"].str.len().mean()
+        cur = pd.Series(df["categoria"].astype(str).value_counts())
+        assert np.isclose(row.psi_category, _psi(pd.Series(ref.category_counts), cur))
+
+    parallel = drift_sweep(db_path, reference=ref, granularity="month", workers=3)
+    pd.testing.assert_frame_equal(parallel, sweep)
+    weekly = drift_sweep(db_path, granularity="week", workers=1)
+    assert weekly["janela"].tolist() == ["2024-12-30", "2025-01-27", "2025-02-03"]
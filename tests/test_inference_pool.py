@@ -0,0 +1,89 @@
+import asyncio
+import os
+import signal
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from joblib import dump
+from ticket_ai.api.main import app
+from ticket_ai.pipelines.train import train
+from ticket_ai.services import llm
+from ticket_ai.services.classifier import TicketClassifier
+from ticket_ai.services.inference_pool import InferencePool
+
+TEXTOS = {
+    "assinatura": ["quero cancelar minha assinatura mensal", "cancelar assinatura do plano anual"],
+    "logistica": ["meu pedido não chegou ainda", "pedido atrasado na entrega"],
+    "financeiro": ["cobrança duplicada no cartão", "estorno da cobrança no cartão"],
+}
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    df = pd.DataFrame([(t, c) for c, ts in TEXTOS.items() for t in ts] * 10, columns=["texto", "categoria"])
+    path = tmp_path_factory.mktemp("model") / "ticket_clf.joblib"
+    dump(train(df), path)
+    return path
+
+@pytest.fixture(scope="module")
+def pool(model_path):
+    pool = InferencePool(model_path=model_path, workers=2)
+    yield pool
+    pool.shutdown()
+
+def test_pool_matches_in_process_classifier(pool, model_path):
+    reference = TicketClassifier(model_path=model_path)
+    assert sorted(pool.classes) == sorted(TEXTOS)
+    textos = ["meu pedido atrasou", "cobrança errada no cartão", "cancelar o plano"]
+
+    async def classify_all():
+        return await asyncio.gather(*(pool.classify(t) for t in textos))
+
+    for texto, (categoria, probas) in zip(textos, asyncio.run(classify_all())):
+        assert categoria == reference.predict(texto)
+        assert probas == pytest.approx(reference.predict_proba(texto))
+
+    stats = pool.stats()
+    assert stats["completed"] >= 3 and stats["queue_depth"] == 0 and stats["in_flight"] == 0
+    assert 0.0 < stats["utilization"] <= 1.0
+
+def test_predict_endpoint_in_process_mode(pool, monkeypatch):
+    async def fake_llm(texto, categoria):
+        return "Resposta assíncrona"
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("ticket_ai.api.main.gerar_resposta_async", fake_llm)
+    monkeypatch.setattr(app.state, "clf", None, raising=False)
+    monkeypatch.setattr(app.state, "inference_pool", pool, raising=False)
+    monkeypatch.setattr(app.state, "serving_mode", "process", raising=False)
+    monkeypatch.setattr(app.state, "reply_policy", None, raising=False)
+
+    client = TestClient(app)
+    response = client.post("/predict", json={"texto": "meu pedido não chegou ainda"})
+    assert response.status_code == 200
+    assert response.json()["categoria"] == "logistica"
+    assert response.json()["resposta"] == "Resposta assíncrona"
+
+    status = client.get("/serving/status").json()
+    assert status["mode"] == "process"
+    assert status["inference"]["workers"] == 2
+
+def test_pool_recovers_from_dead_worker(model_path):
+    pool = InferencePool(model_path=model_path, workers=1)
+    try:
+        for pid in list(pool._executor._processes):
+            os.kill(pid, signal.SIGKILL)  # ex.: OOM killer
+        categoria, _ = asyncio.run(pool.classify("meu pedido não chegou ainda"))
+        assert categoria == "logistica"
+        assert pool.stats()["restarts"] == 1 and pool.stats()["failed"] == 0
+    finally:
+        pool.shutdown()
+
+def test_async_llm_client_is_recreated_per_event_loop(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    async def client_and_semaphore():
+        return llm._get_async_client(), llm._async_semaphore
+
+    first = asyncio.run(client_and_semaphore())
+    second = asyncio.run(client_and_semaphore())
+    assert first[0] is not second[0] and first[1] is not second[1]
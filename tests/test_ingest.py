@@ -0,0 +1,71 @@
+import sqlite3
+import pandas as pd
+from ticket_ai.data import storage
+from ticket_ai.data.ingest import ingest_csv
+
+def _write_csv(path, rows):
+    pd.DataFrame(rows, columns=[
+        "texto", "categoria", "origem", "data_criacao", "status", "prioridade", "cliente_id",
+    ]).to_csv(path, sep=";", index=False)
+
+def test_ingest_dedups_against_csv_and_db_and_is_rerunnable(tmp_path):
+    db_path = tmp_path / "tickets.db"
+    with storage.connection(db_path, mode="write", migrate=True):
+        pass
+
+    csv_path = tmp_path / "lote.csv"
+    _write_csv(csv_path, [
+        ("Quero cancelar minha assinatura", "Assinatura", "email", "2026-01-01 10:00:00", "aberto", "alta", 1),
+        ("  Quero cancelar minha assinatura ", " assinatura", "chat", "2026-01-02 10:00:00", "aberto", "alta", 2),
+        ("Fui cobrado duas vezes", "financeiro", "email", "2026-01-03 10:00:00", "fechado", "media", None),
+        ("", "financeiro", "email", "2026-01-04 10:00:00", "aberto", "baixa", 3),
+    ])
+
+    first = ingest_csv(csv_path, db_path=db_path, chunksize=2)
+    assert (first.read_rows, first.invalid_rows, first.inserted, first.duplicates) == (4, 1, 2, 1)
+
+    again = ingest_csv(csv_path, db_path=db_path)
+    assert (again.inserted, again.duplicates) == (0, 3)
+
+    with storage.connection(db_path) as conn:
+        rows = conn.execute("SELECT texto, categoria, cliente_id FROM tickets ORDER BY id").fetchall()
+    assert rows == [
+        ("Quero cancelar minha assinatura", "assinatura", 1),
+        ("Fui cobrado duas vezes", "financeiro", None),
+    ]
+
+def test_ingest_counts_missing_origem_as_invalid_not_duplicate(tmp_path):
+    db_path = tmp_path / "tickets.db"
+    csv_path = tmp_path / "lote.csv"
+    _write_csv(csv_path, [
+        ("App não abre", "tecnico", None, "2026-01-01 10:00:00", "aberto", "alta", 1),
+        ("Boleto não chegou", "financeiro", "  ", "2026-01-01 10:00:00", "aberto", "alta", 2),
+        ("Entrega atrasada", "logistica", "chat", "2026-01-01 10:00:00", "aberto", "alta", 3),
+    ])
+    with storage.connection(db_path, mode="write", migrate=True):
+        pass
+
+    report = ingest_csv(csv_path, db_path=db_path)
+    assert (report.invalid_rows, report.inserted, report.duplicates) == (2, 1, 0)
+
+def test_backfill_migration_keeps_first_occurrence(tmp_path):
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, texto TEXT NOT NULL, "
+            "categoria TEXT NOT NULL, origem TEXT NOT NULL, data_criacao TEXT, status TEXT, "
+            "prioridade TEXT, cliente_id INTEGER)"
+        )
+        conn.executemany(
+            "INSERT INTO tickets (texto, categoria, origem) VALUES (?, ?, ?)",
+            [("Produto com defeito", "logistica", "email"),
+             (" Produto com defeito ", "Logistica", "chat"),
+             ("Outro problema qualquer", "logistica", "email")],
+        )
+    assert storage.ensure_schema(path) == storage.LATEST_VERSION
+
+    with storage.connection(path) as conn:
+        hashes = [r[0] for r in conn.execute("SELECT content_hash FROM tickets ORDER BY id")]
+    assert hashes[0] == storage.content_hash("Produto com defeito", "logistica")
+    assert hashes[1] is None
+    assert hashes[2] is not None
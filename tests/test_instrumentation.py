@@ -0,0 +1,29 @@
+import pandas as pd
+from ticket_ai.pipelines.instrumentation import StageTimer, fit_pipeline_with_stages
+from ticket_ai.pipelines.train import build_pipeline
+
+TEXTOS = pd.Series([
+    "fui cobrado duas vezes na fatura",
+    "cobrança duplicada no cartão de crédito",
+    "meu pedido não chegou ainda",
+    "pedido atrasado na entrega",
+] * 5)
+CATEGORIAS = pd.Series(["financeiro", "financeiro", "logistica", "logistica"] * 5)
+
+def test_stage_timer_records_metrics():
+    timer = StageTimer()
+    with timer.stage("load") as stage:
+        stage["rows"] = 100
+
+    metrics = timer.as_metrics()
+    assert metrics["stage_load_rows"] == 100.0
+    assert "stage_load_wall_s" in metrics
+    assert "stage_load_cpu_s" in metrics
+
+def test_fit_with_stages_matches_pipeline_fit():
+    timer = StageTimer()
+    staged = fit_pipeline_with_stages(build_pipeline(), TEXTOS, CATEGORIAS, timer=timer)
+    plain = build_pipeline().fit(TEXTOS, CATEGORIAS)
+
+    assert [r["stage"] for r in timer.stages] == ["fit_tfidf", "fit_clf"]
+    assert list(staged.predict(TEXTOS)) == list(plain.predict(TEXTOS))
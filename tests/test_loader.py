@@ -0,0 +1,144 @@
+import sqlite3
+import pandas as pd
+import pytest
+from ticket_ai.data.loader import TicketDataLoader
+
+ROWS = [
+    ("Quero cancelar minha assinatura agora", " Assinatura ", "2025-01-01 10:00:00", "aberto", "alta", 1),
+    ("Quero cancelar minha assinatura agora", "assinatura", "2025-01-02 10:00:00", "fechado", "alta", 2),
+    ("curto", "financeiro", "2025-01-03 10:00:00", "aberto", "baixa", 3),
+    ("Fui cobrado duas vezes na fatura", "Financeiro", "2025-01-04 10:00:00", "fechado", "media", 4),
+    ("  Produto chegou com defeito  ", "logistica", "2025-02-01 10:00:00", "aberto", "alta", None),
+    ("Produto chegou com defeito", "logistica", "2025-02-02 10:00:00", "aberto", "alta", 5),
+]
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "tickets.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, texto TEXT NOT NULL, "
+            "categoria TEXT NOT NULL, origem TEXT, data_criacao TEXT, status TEXT, "
+            "prioridade TEXT, cliente_id INTEGER)"
+        )
+        conn.executemany(
+            "INSERT INTO tickets (texto, categoria, data_criacao, status, prioridade, cliente_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ROWS,
+        )
+    return path
+
+def test_iter_chunks_dedups_across_chunks(db_path):
+    loader = TicketDataLoader(db_path=str(db_path))
+    chunks = list(loader.iter_chunks(chunksize=2))
+    df = pd.concat(chunks, ignore_index=True)
+
+    assert df["texto"].tolist() == [
+        "Quero cancelar minha assinatura agora",
+        "Fui cobrado duas vezes na fatura",
+        "Produto chegou com defeito",
+    ]
+    assert df["categoria"].astype(str).tolist() == ["assinatura", "financeiro", "logistica"]
+
+def test_streaming_matches_prepare_training_data(db_path):
+    loader = TicketDataLoader(db_path=str(db_path))
+    expected = loader.prepare_training_data(loader.load_raw_data(), min_samples_per_category=1)
+    stats = {}
+    streamed = loader.load_training_data(min_samples_per_category=1, stats=stats)
+
+    assert stats["raw_rows"] == len(ROWS)
+    assert list(streamed.columns) == ["texto", "categoria"]
+    assert streamed["texto"].tolist() == expected["texto"].tolist()
+    assert streamed["categoria"].astype(str).tolist() == expected["categoria"].astype(str).tolist()
+
+def test_raw_data_is_raw_and_cleaning_compacts_dtypes(db_path):
+    loader = TicketDataLoader(db_path=str(db_path))
+    df = loader.load_raw_data()
+    # Sem conversão: datas como texto do SQLite (data inválida não vira NaT)
+    assert df["status"].dtype == object and df["data_criacao"].dtype == object
+    assert isinstance(df["data_criacao"].dropna().iloc[0], str)
+
+    clean = loader.prepare_training_data(df, min_samples_per_category=1, return_full=True)
+    assert isinstance(clean["status"].dtype, pd.CategoricalDtype)
+    assert str(clean["cliente_id"].dtype) == "Int32"
+    assert pd.api.types.is_datetime64_any_dtype(clean["data_criacao"])
+
+    projected = loader.load_raw_data(columns=["texto"])
+    assert list(projected.columns) == ["texto"]
+
+def _as_plain(df: pd.DataFrame) -> pd.DataFrame:
+    # ordem das categorias depende dos chunks; compara valores
+    return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+@pytest.mark.parametrize("min_samples", [1, 2])
+def test_pushdown_matches_pandas_path(db_path, min_samples):
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO tickets (texto, categoria, data_criacao, status, prioridade, cliente_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (" Não consigo acessar o aplicativo\t", " ACESSO ", "2025-03-01 10:00:00", "aberto", "alta", 6),
+                ("Não consigo acessar o aplicativo", "acesso", "2025-03-02 10:00:00", "fechado", "baixa", 7),
+                ("Senha expirou e não recebo e-mail", "Ácesso", "2025-03-03 10:00:00", "aberto", "media", 8),
+                ("   1234567   ", "acesso", "2025-03-04 10:00:00", "aberto", "media", 9),
+                ("Meu login foi bloqueado hoje", "Acesso", "2025-03-05 10:00:00", None, None, None),
+            ],
+        )
+    loader = TicketDataLoader(db_path=str(db_path))
+
+    expected = loader.prepare_training_data(
+        loader.load_raw_data(), min_samples_per_category=min_samples, return_full=True)
+    stats = {}
+    pushed = loader.load_training_data(
+        min_samples_per_category=min_samples, columns=list(expected.columns), stats=stats, pushdown=True)
+
+    assert stats["raw_rows"] == len(ROWS) + 5
+    assert not pushed.empty
+    pd.testing.assert_frame_equal(_as_plain(pushed), _as_plain(expected))
+
+def test_pushdown_respects_date_filter(db_path):
+    from datetime import datetime
+    loader = TicketDataLoader(db_path=str(db_path))
+    kwargs = dict(min_samples_per_category=1, date_from=datetime(2025, 2, 1))
+    assert (
+        loader.load_training_data(pushdown=True, **kwargs)["texto"].tolist()
+        == loader.load_training_data(**kwargs)["texto"].tolist()
+        == ["Produto chegou com defeito"]
+    )
+
+
+def test_prepare_training_data_drops_near_duplicates(db_path):
+    loader = TicketDataLoader(db_path=str(db_path))
+    df_raw = pd.DataFrame({
+        "texto": [f"Meu pedido {n} ainda não foi entregue e o prazo já passou faz tempo" for n in (1, 22, 333)]
+                 + ["Quero cancelar minha assinatura porque ficou caro demais"],
+        "categoria": ["logistica", "logistica", "logistica", "assinatura"],
+    })
+    df = loader.prepare_training_data(df_raw, min_samples_per_category=1, near_dup_threshold=0.8)
+    assert df["texto"].tolist() == [df_raw["texto"][0], df_raw["texto"][3]]
+    assert len(loader.prepare_training_data(df_raw, min_samples_per_category=1)) == 4
+
+def test_ticket_frame_flows_without_renormalizing(db_path):
+    from ticket_ai.data.frame import TEXT_DTYPE, TicketFrame, normalize_categoria, text_and_labels
+    from ticket_ai.monitoring.sketches import DriftSketch
+    from ticket_ai.pipelines.cache import fingerprint_dataframe
+
+    loader = TicketDataLoader(db_path=str(db_path))
+    raw = loader.load_raw_data()
+    legacy = loader.prepare_training_data(raw, min_samples_per_category=1, return_full=True)
+    frame = loader.prepare_training_data(raw, min_samples_per_category=1, return_full=True, as_frame=True)
+
+    assert isinstance(frame, TicketFrame) and frame.texto.dtype == TEXT_DTYPE
+    assert frame.texto.tolist() == legacy["texto"].tolist()
+    assert fingerprint_dataframe(frame.df) == fingerprint_dataframe(legacy)
+    texto, categoria = text_and_labels(frame)
+    assert texto is frame.texto and categoria is frame.categoria
+    assert list(frame.select().df.columns) == ["texto", "categoria"]
+
+    sketch_frame, sketch_df = DriftSketch().update(frame), DriftSketch().update(legacy)
+    assert sketch_frame.category_counts == sketch_df.category_counts
+    assert sketch_frame.token_counts == sketch_df.token_counts
+
+    categoria = normalize_categoria(pd.Series([" Financeiro", "financeiro ", None, "LOGISTICA"], dtype="category"))
+    assert list(categoria.cat.categories) == ["financeiro", "logistica"]
+    assert categoria.isna().tolist() == [False, False, True, False]
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from ticket_ai.data.near_duplicates import NearDuplicateIndex, lsh_params, minhash_signatures
+from ticket_ai.data.quality import DataQualityChecker
+
+TEMPLATE = "Olá, meu pedido número {} ainda não foi entregue e já passou muito do prazo informado na compra"
+
+def _df():
+    return pd.DataFrame({
+        "id": [10, 11, 12, 13, 14],
+        "texto": [
+            TEMPLATE.format(123),
+            "Quero cancelar minha assinatura porque o valor ficou alto demais para mim",
+            TEMPLATE.format(98765),
+            TEMPLATE.format(555) + " urgente",
+            "Meu aplicativo trava na tela de login desde a última atualização do sistema",
+        ],
+        "categoria": ["logistica", "assinatura", "logistica", "suporte", "suporte"],
+    })
+
+def test_signatures_are_deterministic_and_estimate_similarity():
+    texts = _df()["texto"].tolist()
+    sig = minhash_signatures(texts, num_perm=128)
+    assert np.array_equal(sig, minhash_signatures(texts, num_perm=128))
+    assert (sig[0] == sig[2]).mean() == 1.0  # só o número muda
+    assert (sig[0] == sig[3]).mean() > 0.7
+    assert (sig[0] == sig[1]).mean() < 0.1
+
+def test_lsh_params_use_all_permutations_near_threshold():
+    bands, rows = lsh_params(0.8, 64)
+    assert bands * rows <= 64
+    assert abs((1 / bands) ** (1 / rows) - 0.8) < 0.1
+
+def test_index_clusters_templated_tickets_in_chunks():
+    df = _df()
+    index = NearDuplicateIndex(threshold=0.8)
+    for i in range(0, len(df), 2):
+        index.update(df.iloc[i:i + 2])
+    report = index.report()
+
+    assert report.cluster_of.tolist() == [0, 1, 0, 0, 4]
+    assert report.keep_mask().tolist() == [True, True, False, False, True]
+    assert [report.ids[c].tolist() for c in report.clusters()] == [[10, 12, 13]]
+    assert report.conflicting_clusters() == 1
+
+    strict = NearDuplicateIndex(threshold=1.0).update(df).report()
+    assert strict.duplicate_rows == 1
+
+def test_quality_report_includes_near_duplicate_clusters():
+    df = _df()
+    checker = DataQualityChecker(df)
+    checker.detect_near_duplicates(threshold=0.8)
+    results = checker.run_all_checks()
+    assert results["near_duplicates"]["duplicate_rows"] == 2
+    assert any("quase-duplicatas" in w for w in results["warnings"])
+    assert any("categorias diferentes" in w for w in results["warnings"])
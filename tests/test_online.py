@@ -0,0 +1,92 @@
+import pytest
+from ticket_ai.services.online import OnlineTicketClassifier
+
+CLASSES = ["financeiro", "logistica"]
+
+EXEMPLOS = [
+    ("Fui cobrado duas vezes na fatura do cartão", "financeiro"),
+    ("Meu pedido não chegou e a entrega está atrasada", "logistica"),
+    ("Quero estorno da cobrança indevida no boleto", "financeiro"),
+    ("A transportadora não entregou minha encomenda", "logistica"),
+]
+
+def _learner(tmp_path, **kwargs):
+    return OnlineTicketClassifier(
+        classes=CLASSES,
+        model_path=tmp_path / "online.joblib",
+        batch_size=8,
+        **kwargs,
+    )
+
+def test_predict_returns_none_before_first_update(tmp_path):
+    learner = _learner(tmp_path)
+    assert learner.predict("Fui cobrado duas vezes") is None
+
+def test_apply_pending_publishes_and_persists(tmp_path):
+    learner = _learner(tmp_path, holdout_every=1_000)
+    for _ in range(5):
+        for texto, categoria in EXEMPLOS:
+            learner.submit(texto, categoria)
+
+    result = learner.apply_pending()
+    assert result["published"] is True
+    assert learner.version == 1
+    assert learner.predict("cobrança indevida na fatura") == "financeiro"
+    assert (tmp_path / "online.joblib").exists()
+
+    # Reinício: carrega a versão publicada
+    reloaded = _learner(tmp_path)
+    assert reloaded.version == 1
+    assert reloaded.is_fitted
+
+def test_submit_rejects_unknown_category(tmp_path):
+    learner = _learner(tmp_path)
+    with pytest.raises(ValueError, match="inexistente"):
+        learner.submit("texto qualquer do ticket", "inexistente")
+
+def test_holdout_rejects_degrading_update(tmp_path):
+    learner = _learner(tmp_path, holdout_every=2, min_holdout=4, max_accuracy_drop=0.0)
+    for _ in range(10):
+        for texto, categoria in EXEMPLOS:
+            learner.submit(texto, categoria)
+    assert learner.apply_pending()["published"] is True
+    version = learner.version
+
+    # Rótulos invertidos degradam o holdout → candidato não é publicado
+    invertido = {"financeiro": "logistica", "logistica": "financeiro"}
+    for _ in range(50):
+        for texto, categoria in EXEMPLOS:
+            learner.submit(texto, invertido[categoria])
+            learner._holdout.append((texto, categoria))
+
+    result = learner.apply_pending()
+    assert result["published"] is False
+    assert learner.version == version
+    # Lote rejeitado continua pendente, mas não é retreinado nem acorda a thread
+    assert learner.status()["pending"] == result["samples"] == 100
+    assert learner.apply_pending() is None
+    learner._wake.clear()
+    learner.submit(*EXEMPLOS[0])
+    assert not learner._wake.is_set()
+
+def test_rejected_batch_is_discarded_after_max_rejections(tmp_path):
+    learner = _learner(tmp_path, holdout_every=1_000, min_holdout=4,
+                       max_accuracy_drop=0.0, max_rejections=2)
+    for _ in range(10):
+        for texto, categoria in EXEMPLOS:
+            learner.submit(texto, categoria)
+            learner._holdout.append((texto, categoria))
+    assert learner.apply_pending()["published"] is True
+
+    invertido = {"financeiro": "logistica", "logistica": "financeiro"}
+    for rodada in range(2):
+        for _ in range(25):
+            for texto, categoria in EXEMPLOS:
+                learner.submit(texto, invertido[categoria])
+        result = learner.apply_pending()
+        assert result["published"] is False and result["samples"] == 100  # só as novas
+
+    status = learner.status()
+    assert result["discarded"] == 200
+    assert (status["pending"], status["discarded"], status["rejected_batches"]) == (0, 200, 2)
+    assert learner.version == 1
@@ -0,0 +1,105 @@
+import json
+import re
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+import pandas as pd
+from fastapi.testclient import TestClient
+from joblib import dump
+from ticket_ai.api.main import app
+from ticket_ai.pipelines.train import train
+from ticket_ai.services.classifier import TicketClassifier
+from ticket_ai.services.prediction_log import PredictionLogSink, PredictionRecord, load_predictions, texto_hash
+
+def _record(texto="meu pedido não chegou", categoria="logistica"):
+    return PredictionRecord(
+        ts=time.time(), texto=texto, categoria=categoria,
+        probas={"logistica": 0.8, "financeiro": 0.2}, model_version="abc.def",
+        resposta_origem="llm", stages_ms={"classify": 1.5, "llm": 10.0},
+    )
+
+def test_sqlite_sink_writes_batches_and_flushes_on_stop(tmp_path):
+    sink = PredictionLogSink(path=tmp_path / "predictions.db", batch_size=2, flush_interval_seconds=60)
+    sink.start()
+    for i in range(5):
+        assert sink.submit(_record(texto=f"ticket {i}"))
+    sink.stop(flush=True)
+
+    df = load_predictions(tmp_path / "predictions.db")
+    assert len(df) == 5 and df["texto"].isna().all()  # texto só com store_text
+    assert df.loc[0, "texto_hash"] == texto_hash("ticket 0")
+    assert df.loc[0, "confidence"] == 0.8 and df.loc[0, "total_ms"] == 11.5
+    assert json.loads(df.loc[0, "stages_ms"]) == {"classify": 1.5, "llm": 10.0}
+    status = sink.status()
+    assert status["written"] == 5 and status["batches"] == 3 and status["pending"] == 0
+
+def test_backpressure_policies(tmp_path):
+    newest = PredictionLogSink(path=tmp_path / "a.db", max_queue=2)
+    assert newest.submit(_record("a")) and newest.submit(_record("b"))
+    assert not newest.submit(_record("c"))
+    oldest = PredictionLogSink(path=tmp_path / "b.db", max_queue=2, backpressure="drop_oldest",
+                               store_text=True)
+    for texto in ("a", "b", "c"):
+        assert oldest.submit(_record(texto))
+    blocked = PredictionLogSink(path=tmp_path / "c.db", max_queue=1, backpressure="block",
+                                block_timeout_seconds=0.01)
+    assert blocked.submit(_record("a")) and not blocked.submit(_record("b"))
+
+    assert newest.status()["dropped"] == oldest.status()["dropped"] == blocked.status()["dropped"] == 1
+    oldest.flush()
+    assert load_predictions(tmp_path / "b.db")["texto"].tolist() == ["b", "c"]
+
+def test_parquet_sink_roundtrip(tmp_path):
+    sink = PredictionLogSink(path=tmp_path / "predictions", backend="parquet", store_text=True)
+    sink.submit(_record("a"))
+    sink.submit(_record("b", categoria="financeiro"))
+    assert sink.flush() == 2
+
+    df = load_predictions(tmp_path / "predictions")
+    assert df["texto"].tolist() == ["a", "b"] and df["categoria"].tolist() == ["logistica", "financeiro"]
+    assert (df["data_criacao"] == df["ts"]).all()
+
+def test_parquet_sink_keeps_schema_and_splits_batch_by_day(tmp_path):
+    sink = PredictionLogSink(path=tmp_path / "predictions", backend="parquet")
+    fallback = PredictionRecord(
+        ts=datetime(2026, 3, 1, 23, 59, 59, tzinfo=timezone.utc).timestamp(), texto="a",
+        categoria="logistica", probas={}, model_version=None, resposta_origem="fallback",
+        stages_ms={"classify": 1.0},
+    )
+    sink.submit(fallback)
+    assert sink.flush() == 1  # lote só com confidence/probas/model_version nulos
+
+    sink.submit(_record("b"))
+    sink.submit(replace(fallback, ts=fallback.ts + 2))  # já no dia seguinte
+    sink.submit(replace(fallback, ts=fallback.ts - 1))
+    assert sink.flush() == 3
+
+    files = lambda dia: len(list((tmp_path / "predictions" / f"dia={dia}").glob("*.parquet")))
+    assert files("2026-03-01") == 2 and files("2026-03-02") == 1
+    df = load_predictions(tmp_path / "predictions")
+    assert len(df) == 4 and df["confidence"].isna().sum() == 3
+
+def test_predict_enqueues_prediction(tmp_path, monkeypatch):
+    textos = {"assinatura": ["quero cancelar minha assinatura", "cancelar assinatura do plano"],
+              "logistica": ["meu pedido não chegou", "pedido atrasado na entrega"]}
+    df = pd.DataFrame([(t, c) for c, ts in textos.items() for t in ts] * 10, columns=["texto", "categoria"])
+    dump(train(df), tmp_path / "ticket_clf.joblib")
+
+    sink = PredictionLogSink(path=tmp_path / "predictions.db")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("ticket_ai.api.main.gerar_resposta", lambda texto, categoria: "ok")
+    monkeypatch.setattr(app.state, "clf", TicketClassifier(model_path=tmp_path / "ticket_clf.joblib"),
+                        raising=False)
+    monkeypatch.setattr(app.state, "inference_pool", None, raising=False)
+    monkeypatch.setattr(app.state, "prediction_log", sink, raising=False)
+    monkeypatch.setattr(app.state, "reply_policy", None, raising=False)
+
+    response = TestClient(app).post("/predict", json={"texto": "Quero cancelar minha assinatura"})
+    assert response.status_code == 200
+    sink.flush()
+    row = load_predictions(tmp_path / "predictions.db").iloc[0]
+    assert row["categoria"] == response.json()["categoria"] == "assinatura"
+    assert row["resposta_origem"] == "llm"
+    assert set(json.loads(row["stages_ms"])) == {"classify", "online_drift", "llm"}
+    # mesmo formato de tickets.data_criacao
+    assert re.fullmatch(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d", row["data_criacao"])
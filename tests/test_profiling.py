@@ -0,0 +1,43 @@
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from ticket_ai.api.profiling import ProfilingConfig, ProfilingMiddleware, capture, stage
+
+def _client(config: ProfilingConfig) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/work")
+    def work(ms: float = 0.0):
+        with capture():
+            with stage("sleep"):
+                time.sleep(ms / 1000)
+            with stage("alloc"):
+                data = [str(i) for i in range(2_000)]
+        return {"n": len(data)}
+
+    app.add_middleware(ProfilingMiddleware, config=config)
+    return TestClient(app)
+
+def test_server_timing_only_for_allowed_debug_clients():
+    client = _client(ProfilingConfig(allowed_clients=frozenset({"testclient"})))
+    debug = client.get("/work", headers={"X-Debug-Profile": "1"})
+    timing = debug.headers["server-timing"]
+    assert timing.startswith("sleep;dur=") and "alloc;dur=" in timing and "total;dur=" in timing
+    assert "server-timing" not in client.get("/work").headers
+
+    other = _client(ProfilingConfig(allowed_clients=frozenset({"10.0.0.1"})))
+    assert "server-timing" not in other.get("/work", headers={"X-Debug-Profile": "1"}).headers
+    with stage("fora"):  # fora de requisição amostrada: no-op
+        pass
+
+def test_keeps_profiles_of_slowest_sampled_requests(tmp_path):
+    config = ProfilingConfig(sample_rate=1.0, capture=frozenset({"cpu", "alloc"}),
+                             output_dir=tmp_path, keep_slowest=2)
+    client = _client(config)
+    for ms in (1, 60, 5, 30):
+        assert "server-timing" in client.get("/work", params={"ms": ms}).headers
+
+    profiles = sorted(tmp_path.glob("*.prof"))
+    assert len(profiles) == 2 and len(list(tmp_path.glob("*.alloc.txt"))) == 2
+    kept_ms = sorted(int(p.name.split("_")[1].removesuffix("ms")) for p in profiles)
+    assert kept_ms[0] >= 30
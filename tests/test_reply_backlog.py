@@ -0,0 +1,103 @@
+import asyncio
+import sqlite3
+import time
+import pytest
+from ticket_ai.data import storage
+from ticket_ai.services.reply_backlog import RateLimiter, count_unanswered, generate_backlog
+from ticket_ai.services.reply_policy import ReplyPolicy
+
+class FakeClassifier:
+    def classify_batch(self, textos):
+        categorias = ["logistica" if "pedido" in t else "suporte" for t in textos]
+        return categorias, [0.95 if "pedido" in t else 0.5 for t in textos]
+
+def _db(tmp_path, textos):
+    db_path = tmp_path / "tickets.db"
+    with storage.connection(db_path, mode="write", migrate=True) as conn:
+        conn.executemany(
+            "INSERT INTO tickets (texto, categoria, origem, status) VALUES (?, 'suporte', 'email', 'aberto')",
+            [(t,) for t in textos],
+        )
+    return db_path
+
+def test_backlog_generates_in_batches_and_resumes(tmp_path):
+    db_path = _db(tmp_path, [f"meu pedido {i} atrasou" for i in range(5)] + [f"erro {i} no app" for i in range(20)])
+    policy = ReplyPolicy.from_dict({"categorias": {"logistica": {
+        "template_min_confidence": 0.9, "templates": [{"texto": "Seu pedido está a caminho."}]}}})
+    calls = []
+
+    async def flaky_llm(texto, categoria):
+        calls.append(texto)
+        await asyncio.sleep(0.001)
+        if texto == "erro 3 no app":
+            raise RuntimeError("provedor fora")
+        return f"Resposta para {texto}"
+
+    checkpoints = []
+    report = asyncio.run(generate_backlog(
+        db_path, FakeClassifier(), policy=policy, gerar=flaky_llm, concurrency=4,
+        classify_batch_size=7, write_batch_size=6, on_checkpoint=lambda r: checkpoints.append(r.written),
+    ))
+    assert report.pending_at_start == 25 and report.classified == 25
+    assert report.origens == {"template": 5, "llm": 19} and report.failed == 1
+    assert len(calls) == 20 and report.checkpoints == len(checkpoints) >= 4
+    assert report.custo_usd > 0 and report.custo_restante_usd == 0
+    assert count_unanswered(db_path) == 1
+
+    # Nova execução: só o ticket que falhou volta ao LLM
+    calls.clear()
+    again = asyncio.run(generate_backlog(db_path, FakeClassifier(), gerar=lambda t, c: asyncio.sleep(0, "ok")))
+    assert again.pending_at_start == 1 and again.written == 1 and count_unanswered(db_path) == 0
+    with storage.connection(db_path) as conn:
+        rows = dict(conn.execute("SELECT resposta_origem, COUNT(*) FROM ticket_replies GROUP BY 1").fetchall())
+    assert rows == {"template": 5, "llm": 20}
+
+def test_backlog_respects_limit_and_status(tmp_path):
+    db_path = _db(tmp_path, [f"erro {i} no app" for i in range(10)])
+    with storage.connection(db_path, mode="write") as conn:
+        conn.execute("UPDATE tickets SET status = 'fechado' WHERE id <= 4")
+    report = asyncio.run(generate_backlog(
+        db_path, FakeClassifier(), gerar=lambda t, c: asyncio.sleep(0, "ok"), limit=3, status="aberto"))
+    assert report.written == 3 and count_unanswered(db_path, status="aberto") == 3
+
+def test_backlog_survives_unexpected_errors_and_limits_llm_concurrency(tmp_path, monkeypatch):
+    db_path = _db(tmp_path, [f"erro {i} no app" for i in range(30)])
+    semaphores = set()
+
+    async def llm_com_bug(texto, categoria, semaphore=None):
+        semaphores.add((id(semaphore), semaphore._value))
+        if texto.endswith("7 no app"):
+            raise KeyError("bug fora do RuntimeError")
+        return "ok"
+
+    monkeypatch.setattr("ticket_ai.services.llm.gerar_resposta_async", llm_com_bug)
+    # concorrência 2 e fila de 8: sem workers vivos, a leitura travaria no put
+    report = asyncio.run(asyncio.wait_for(
+        generate_backlog(db_path, FakeClassifier(), concurrency=2, classify_batch_size=5), timeout=10))
+    assert report.failed == 3 and report.written == 27 and count_unanswered(db_path) == 3
+    assert len(semaphores) == 1 and next(iter(semaphores))[1] == 2  # do backlog, não do env
+
+def test_failed_checkpoint_stops_llm_calls(tmp_path, monkeypatch):
+    db_path = _db(tmp_path, [f"erro {i} no app" for i in range(300)])
+    calls = []
+
+    async def llm_ok(texto, categoria):
+        calls.append(texto)
+        return "ok"
+
+    def locked(db_path, rows):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr("ticket_ai.services.reply_backlog.write_replies", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        asyncio.run(asyncio.wait_for(generate_backlog(
+            db_path, FakeClassifier(), gerar=llm_ok, concurrency=4, write_batch_size=10), timeout=10))
+    assert len(calls) < 100 and count_unanswered(db_path) == 300
+
+def test_rate_limiter_spaces_calls():
+    async def run():
+        limiter = RateLimiter(rate=50, burst=1)
+        start = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire() for _ in range(6)))
+        return time.perf_counter() - start
+    assert asyncio.run(run()) >= 0.09  # 5 intervalos de 20ms após o 1º token
@@ -0,0 +1,86 @@
+import time
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from ticket_ai.api.main import app
+from ticket_ai.services.reply_policy import ReplyPolicy, load_reply_policy
+
+CONFIG = {
+    "params": {"prazo": "1 dia útil"},
+    "default": {"template_min_confidence": 0.9, "cache_min_confidence": 0.7},
+    "categorias": {
+        "financeiro": {
+            "params": {"secao": "Pagamentos"},
+            "templates": [
+                {"quando": ["Duplic"], "texto": "Estorno da duplicidade em {prazo} ({categoria})."},
+                {"texto": "Veja {secao}; retorno em {prazo}."},
+            ],
+        },
+        "feedback": {"template_min_confidence": None},
+    },
+}
+
+def test_tiers_by_confidence_and_keywords():
+    policy = ReplyPolicy.from_dict(CONFIG)
+    d = policy.decide("Fui cobrado em DUPLICIDADE", "financeiro", 0.95)
+    assert d.tier == "template" and d.resposta == "Estorno da duplicidade em 1 dia útil (financeiro)."
+    assert policy.decide("quero a segunda via", "financeiro", 0.95).resposta == "Veja Pagamentos; retorno em 1 dia útil."
+    assert policy.decide("quero a segunda via", "financeiro", 0.8).tier == "cache"
+    assert policy.decide("quero a segunda via", "financeiro", 0.5).tier == "llm"
+    assert policy.decide("amei o atendimento", "feedback", 0.99).tier == "cache"  # sem templates
+    assert policy.decide("categoria nova", "outra", None).tier == "llm"
+
+def test_cache_stores_llm_replies_and_counts_savings():
+    policy = ReplyPolicy.from_dict(CONFIG, cache_size=1)
+    miss = policy.decide("meu boleto  venceu", "financeiro", 0.8)
+    assert miss.tier == "cache" and miss.resposta is None
+    policy.record(miss, "llm", "Resposta do LLM", 0.5)
+    hit = policy.decide("Meu boleto venceu", "financeiro", 0.8)  # mesmo texto normalizado
+    assert hit.resposta == "Resposta do LLM"
+    policy.record(hit, "cache", hit.resposta, 0.0)
+    template = policy.decide("cobrança em duplicidade", "financeiro", 0.99)
+    policy.record(template, "template", template.resposta, 0.0)
+
+    # LRU com 1 entrada: a nova resposta expulsa a anterior
+    other = policy.decide("outro ticket", "financeiro", 0.8)
+    policy.record(other, "llm", "Outra resposta", 1.5)
+    assert policy.decide("meu boleto venceu", "financeiro", 0.8).resposta is None
+
+    status = policy.status()
+    assert status["origens"] == {"template": 1, "cache": 1, "llm": 2, "fallback": 0, "llm_error": 0}
+    assert status["cache"]["misses"] == 2 and status["cache"]["entries"] == 1
+    assert status["llm_latency_ms_avg"] == pytest.approx(1000.0)
+    assert status["latencia_economizada_s"] == pytest.approx(2.0)
+    assert status["custo_economizado_usd"] > 0 and status["sem_llm_rate"] == 0.5
+
+def test_missing_template_param_fails_on_load():
+    config = {"categorias": {"suporte": {"templates": [{"texto": "Prazo: {inexistente}"}]}}}
+    with pytest.raises(ValueError, match="inexistente"):
+        ReplyPolicy.from_dict(config)
+
+def test_example_policy_renders_and_skips_llm(monkeypatch):
+    policy = load_reply_policy(str(Path(__file__).resolve().parents[1] / "config/reply_policy.example.json"))
+    assert all(r.templates for name, r in policy.rules.items() if name != "feedback")
+    assert "{" not in "".join(t.texto for r in policy.rules.values() for t in r.templates)
+
+    def llm_nao_deveria_ser_chamado(texto, categoria):
+        raise AssertionError("LLM chamado para ticket de alta confiança")
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("ticket_ai.api.main.gerar_resposta", llm_nao_deveria_ser_chamado)
+    monkeypatch.setattr("ticket_ai.services.llm.warm_up_connection", lambda timeout=2.0: True)
+    monkeypatch.setattr("ticket_ai.api.main._load_reply_policy",
+                        lambda app: setattr(app.state, "reply_policy", policy))
+    # o lifespan deixa modelo e política em app.state: restaurados no teardown do teste
+    monkeypatch.setattr(app.state, "clf", None, raising=False)
+    monkeypatch.setattr(app.state, "reply_policy", None, raising=False)
+    with TestClient(app) as c:
+        deadline = time.monotonic() + 60
+        while c.get("/health/ready").json()["status"] == "starting":
+            assert time.monotonic() < deadline, "inicialização não terminou"
+            time.sleep(0.05)
+        r = c.post("/predict", json={"texto": "Meu pedido não chegou e o prazo já venceu"})
+        if r.status_code == 503:
+            pytest.skip("Modelo não disponível no ambiente de testes.")
+        assert r.json()["resposta_origem"] == "template"
+        assert c.get("/serving/status").json()["reply_policy"]["origens"]["template"] == 1
@@ -0,0 +1,117 @@
+import sqlite3
+import pytest
+from ticket_ai.data import storage
+from ticket_ai.data.loader import TicketDataLoader
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "tickets.db"
+    with storage.connection(path, mode="write", migrate=True) as conn:
+        conn.executemany(
+            "INSERT INTO tickets (texto, categoria, origem, data_criacao) VALUES (?, ?, ?, ?)",
+            [(f"ticket número {i} sobre cobrança", "financeiro", "email", f"2025-01-{i % 28 + 1:02d} 10:00:00")
+             for i in range(200)],
+        )
+    return path
+
+def test_migrations_are_versioned_and_idempotent(db_path):
+    with storage.connection(db_path, mode="write") as conn:
+        assert storage.schema_version(conn) == storage.LATEST_VERSION
+        assert storage.apply_migrations(conn) == storage.LATEST_VERSION
+        indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_tickets_data_criacao", "idx_tickets_categoria", "idx_tickets_cliente_id"} <= indexes
+
+def test_legacy_database_is_migrated_explicitly(tmp_path):
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, texto TEXT NOT NULL, "
+            "categoria TEXT NOT NULL, origem TEXT NOT NULL, data_criacao TEXT, status TEXT, "
+            "prioridade TEXT, cliente_id INTEGER)"
+        )
+    TicketDataLoader(db_path=str(path))  # leitura não migra
+    with storage.connection(path) as conn:
+        assert storage.schema_version(conn) == 0
+    assert storage.ensure_schema(path) == storage.LATEST_VERSION
+    with storage.connection(path) as conn:
+        assert storage.schema_version(conn) == storage.LATEST_VERSION
+
+def test_wal_mode_and_read_only_connection(db_path):
+    with storage.connection(db_path, mode="read") as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM tickets")
+
+def test_date_filter_uses_index(db_path):
+    query = (
+        "SELECT texto, categoria FROM tickets WHERE 1=1 "
+        "AND data_criacao >= ? AND data_criacao <= ? ORDER BY id"
+    )
+    with storage.connection(db_path) as conn:
+        plan = " | ".join(storage.explain_query_plan(
+            conn, query, ["2025-01-01 00:00:00", "2025-01-02 00:00:00"]))
+    assert "USING INDEX idx_tickets_data_criacao" in plan
+
+def test_category_stats_group_by_uses_index(db_path):
+    query = (
+        "SELECT categoria, COUNT(*) FROM tickets GROUP BY categoria"
+    )
+    with storage.connection(db_path) as conn:
+        plan = " | ".join(storage.explain_query_plan(conn, query))
+    assert "idx_tickets_categoria" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_category_stats_triggers_track_inserts_updates_and_deletes(db_path):
+    with storage.connection(db_path, mode="write") as conn:
+        conn.executemany(
+            "INSERT INTO tickets (texto, categoria, origem, data_criacao) VALUES (?, ?, ?, ?)",
+            [("Pedido atrasado há uma semana", "logistica", "chat", "2025-02-10 08:00:00"),
+             ("Pedido sem data registrada", "logistica", "chat", None)],
+        )
+        conn.execute("UPDATE tickets SET categoria = 'suporte' WHERE id = 1")
+        conn.execute("UPDATE tickets SET data_criacao = '2025-03-01 00:00:00' WHERE id = 2")
+        conn.execute("DELETE FROM tickets WHERE data_criacao = (SELECT MAX(data_criacao) FROM tickets "
+                     "WHERE categoria = 'financeiro')")
+        assert storage.verify_category_stats(conn) == []
+
+        conn.execute("UPDATE category_stats SET total = total + 1 WHERE categoria = 'suporte'")
+        assert storage.verify_category_stats(conn) != []
+        storage.rebuild_category_stats(conn)
+        assert storage.verify_category_stats(conn) == []
+
+def test_category_stats_delete_recomputes_extremes_with_index(db_path):
+    with storage.connection(db_path, mode="write") as conn:
+        conn.executemany(
+            "INSERT INTO tickets (texto, categoria, origem, data_criacao) VALUES (?, ?, ?, ?)",
+            [("Boleto de fevereiro", "financeiro", "email", "2025-02-01 09:00:00"),
+             ("Boleto de março", "financeiro", "email", "2025-03-05 09:00:00")],
+        )
+        # extremos de janeiro (vizinhos em dezembro/fevereiro não contam) e mês de uma linha só
+        conn.execute("DELETE FROM tickets WHERE data_criacao IN "
+                     "('2025-01-01 10:00:00', '2025-01-28 10:00:00', '2025-02-01 09:00:00')")
+        assert storage.verify_category_stats(conn) == []
+        plan = " | ".join(storage.explain_query_plan(
+            conn,
+            "SELECT t.data_criacao FROM tickets t WHERE t.categoria = ? AND t.data_criacao >= ? "
+            "ORDER BY t.data_criacao LIMIT 1",
+            ["financeiro", "2025-01-01 10:00:00"],
+        ))
+    assert "idx_tickets_categoria_data" in plan and "TEMP B-TREE" not in plan
+
+def test_get_category_stats_reads_materialized_table(db_path):
+    loader = TicketDataLoader(db_path=str(db_path))
+    stats = loader.get_category_stats()
+    with storage.connection(db_path) as conn:
+        live = conn.execute(
+            "SELECT categoria, COUNT(*), AVG(LENGTH(texto)), MIN(data_criacao), MAX(data_criacao) "
+            "FROM tickets GROUP BY categoria"
+        ).fetchall()
+        plan = storage.explain_query_plan(conn, "SELECT SUM(total) FROM category_stats GROUP BY categoria")
+    assert [tuple(r) for r in stats.itertuples(index=False)] == live
+    assert not any("tickets" in step for step in plan)
+    assert set(loader.get_category_stats(by_month=True)["mes"]) == {"2025-01"}
+
+def test_published_migrations_are_not_rewritten():
+    migration_2 = next(m for m in storage.MIGRATIONS if m.version == 2)
+    assert len(migration_2.statements) == 3
+    assert not any("idx_tickets_categoria_data" in sql for sql in migration_2.statements)
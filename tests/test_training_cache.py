@@ -0,0 +1,81 @@
+import json
+import pandas as pd
+from ticket_ai.pipelines.cache import ModelStore, fingerprint_config, fingerprint_dataframe
+from ticket_ai.pipelines.train import build_pipeline
+
+def _df():
+    return pd.DataFrame({
+        "texto": ["Quero cancelar minha assinatura", "Produto chegou com defeito"],
+        "categoria": ["assinatura", "logistica"],
+    })
+
+def test_data_fingerprint_is_stable_and_content_sensitive():
+    df = _df()
+    assert fingerprint_dataframe(df) == fingerprint_dataframe(df.copy())
+    # chunking não altera o conteúdo considerado, só a granularidade
+    assert fingerprint_dataframe(df, chunk_size=1) == fingerprint_dataframe(df)
+
+    changed = df.copy()
+    changed.loc[0, "categoria"] = "financeiro"
+    assert fingerprint_dataframe(changed) != fingerprint_dataframe(df)
+
+def test_config_fingerprint_tracks_params_and_trainer():
+    base = fingerprint_config(build_pipeline(), trainer="train")
+    assert base == fingerprint_config(build_pipeline(), trainer="train")
+    assert base != fingerprint_config(build_pipeline(), trainer="train_with_tracking")
+
+    pipeline = build_pipeline()
+    pipeline.set_params(clf__C=1.0)
+    assert base != fingerprint_config(pipeline, trainer="train")
+
+def test_model_store_roundtrip_and_publish(tmp_path):
+    store = ModelStore(tmp_path / "store")
+    assert store.get("a" * 64, "b" * 64) is None
+
+    entry = store.put("a" * 64, "b" * 64, {"fake": "model"}, _df(), metadata={"trainer": "test"})
+    assert store.get("a" * 64, "b" * 64) == entry
+    assert store.get("a" * 64, "c" * 64) is None
+    (entry / "reference_data.parquet").unlink()
+    assert store.get("a" * 64, "b" * 64) is None  # entrada incompleta não é hit
+    entry = store.put("a" * 64, "b" * 64, {"fake": "model"}, _df(), metadata={"trainer": "test"})
+
+    paths = ModelStore.publish(entry, tmp_path / "models")
+    assert paths["model"].exists()
+    assert paths["reference"].exists()
+    assert '"data_fingerprint"' in paths["metadata"].read_text(encoding="utf-8")
+
+def test_model_store_keeps_only_profile_as_baseline(tmp_path):
+    store = ModelStore(tmp_path / "store")
+    old = store.put("c" * 64, "b" * 64, {"fake": "old"}, _df())
+    ModelStore.publish(old, tmp_path / "models")
+
+    entry = store.put("a" * 64, "b" * 64, {"fake": "model"}, _df(), profile=_FakeProfile())
+    assert not (entry / "reference_data.parquet").exists()
+    assert store.get("a" * 64, "b" * 64) == entry
+    paths = ModelStore.publish(entry, tmp_path / "models")
+    assert "reference" not in paths and paths["profile"].exists()
+    assert not (tmp_path / "models" / "reference_data.parquet").exists()  # baseline de outro modelo
+
+class _FakeProfile:
+    def save(self, path):
+        path.write_bytes(b"profile")
+
+def test_model_store_publishes_profile_when_present(tmp_path):
+    store = ModelStore(tmp_path / "store")
+    entry = store.put("a" * 64, "b" * 64, {"fake": "model"}, _df(), profile=_FakeProfile())
+    paths = ModelStore.publish(entry, tmp_path / "models")
+    assert paths["profile"].read_bytes() == b"profile"
+
+    old = store.put("c" * 64, "b" * 64, {"fake": "model"}, _df())
+    assert "profile" not in ModelStore.publish(old, tmp_path / "old_models")
+
+def test_publish_without_profile_removes_stale_profile(tmp_path):
+    store = ModelStore(tmp_path / "store")
+    a = store.put("a" * 64, "b" * 64, {"fake": "A"}, _df(), profile=_FakeProfile())
+    b = store.put("c" * 64, "b" * 64, {"fake": "B"}, _df())
+    stale = ModelStore.publish(a, tmp_path / "models")["profile"]
+
+    paths = ModelStore.publish(b, tmp_path / "models")
+    assert "profile" not in paths and not stale.exists()  # drift não pareia B com o perfil de A
+    assert json.loads(paths["metadata"].read_text(encoding="utf-8"))["data_fingerprint"] == "c" * 64
+    assert ModelStore.publish(a, tmp_path / "models")["profile"].exists()